@@ -1,31 +1,10 @@
 # This file makes the `statbot_common` directory a Python package.
+#
+# Public names are imported lazily (PEP 562): a submodule is only loaded the
+# first time one of its names is accessed, so e.g. `from statbot_common import
+# SlidingWindow` does not pull in the markout, queue imbalance or AVCI code.
 
-from .sliding_window import SlidingWindow
-from .volatility import compute_volatility
-from .timestamp import normalize_timestamp_to_ms
-from .protocols import HasPrice, HasSize, HasLogPrice, Trade, L3Trade, MidPrice, L3Fill
-from .size import compute_total_size
-from .vmf import compute_vmf
-from .markout_skew import (
-    MarkoutSkewCalculator, 
-    MarkoutObservation, 
-    MarkoutConfig,
-    coalesce_l3_trades_by_timestamp,
-    compute_mid_price,
-    validate_l2_consistency
-)
-from .queue_imbalance import (
-    compute_exponential_weights,
-    sizes_on_tick_grid,
-    compute_ib,
-    compute_queue_diff,
-    QueueImbalanceConfig,
-    QueueImbalanceCalculator,
-)
-from .avci import (
-    AvciConfig,
-    AvciCalculator,
-)
+from importlib import import_module
 from importlib.metadata import PackageNotFoundError, version
 
 # Attempt to grab the installed package version.  When the project is
@@ -39,33 +18,61 @@ try:
 except PackageNotFoundError:  # pragma: no cover - exercised in tests
     __version__ = "0.0.0"
 
+# Public name -> submodule that defines it.
+_MODULE_MAP = {
+    "SlidingWindow": "sliding_window",
+    "AggregateOp": "sliding_window",
+    "MeanOp": "sliding_window",
+    "SumOp": "sliding_window",
+    "compute_volatility": "volatility",
+    "normalize_timestamp_to_ms": "timestamp",
+    "normalize_timestamps_to_ms": "timestamp",
+    "HasPrice": "protocols",
+    "HasSize": "protocols",
+    "HasLogPrice": "protocols",
+    "Trade": "protocols",
+    "L3Trade": "protocols",
+    "MidPrice": "protocols",
+    "L3Fill": "protocols",
+    "compute_total_size": "size",
+    "compute_vmf": "vmf",
+    "VmfCalculator": "vmf",
+    "MarkoutSkewCalculator": "markout_skew",
+    "MarkoutObservation": "markout_skew",
+    "MarkoutConfig": "markout_skew",
+    "coalesce_l3_trades_by_timestamp": "markout_skew",
+    "compute_mid_price": "markout_skew",
+    "compute_mid_prices": "markout_skew",
+    "validate_l2_consistency": "markout_skew",
+    "validate_l2_consistency_batch": "markout_skew",
+    "compute_exponential_weights": "queue_imbalance",
+    "sizes_on_tick_grid": "queue_imbalance",
+    "sizes_on_tick_index_grid": "queue_imbalance",
+    "price_to_tick": "queue_imbalance",
+    "tick_book_from_decimal": "queue_imbalance",
+    "compute_ib": "queue_imbalance",
+    "compute_queue_diff": "queue_imbalance",
+    "QueueImbalanceConfig": "queue_imbalance",
+    "QueueImbalanceCalculator": "queue_imbalance",
+    "AvciConfig": "avci",
+    "AvciCalculator": "avci",
+    "AvciMetrics": "avci",
+}
+
 # This defines the public API for the package.
 # When a user does `from statbot_common import *`, only these names will be imported.
-__all__ = [
-    "SlidingWindow",
-    "compute_volatility",
-    "normalize_timestamp_to_ms",
-    "HasPrice",
-    "HasSize",
-    "HasLogPrice",
-    "Trade",
-    "L3Trade",
-    "MidPrice",
-    "L3Fill",
-    "compute_total_size",
-    "compute_vmf",
-    "MarkoutSkewCalculator",
-    "MarkoutObservation",
-    "MarkoutConfig",
-    "coalesce_l3_trades_by_timestamp",
-    "compute_mid_price",
-    "validate_l2_consistency",
-    "compute_exponential_weights",
-    "sizes_on_tick_grid",
-    "compute_ib",
-    "compute_queue_diff",
-    "QueueImbalanceConfig",
-    "QueueImbalanceCalculator",
-    "AvciConfig",
-    "AvciCalculator",
-] 
\ No newline at end of file
+__all__ = list(_MODULE_MAP)
+
+
+def __getattr__(name):
+    module_name = _MODULE_MAP.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    # Cache on the package so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
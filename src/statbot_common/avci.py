@@ -17,148 +17,479 @@ Range: AVCI ∈ [1/N, 1]
     - = 1/N when volume is split equally across N takers
 """
 
-from collections import deque
+import json
+import math
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter
 from dataclasses import dataclass
-from decimal import Decimal
-from typing import Any, Deque, Dict, Tuple
+from types import MappingProxyType
+from typing import Any, BinaryIO, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
 
 from .timestamp import normalize_timestamp_to_ms
 
+# Integer timestamps in [_MS_MIN, _MS_MAX) have 11-13 digits, which
+# normalize_timestamp_to_ms already treats as milliseconds.
+_MS_MIN = 10_000_000_000
+_MS_MAX = 10_000_000_000_000
 
-@dataclass
+# Binary state layout (little-endian): magic, format version and JSON header
+# length, then the JSON header (config and taker table), then each side
+# bucket as a fixed header followed by its raw columns.
+_BINARY_MAGIC = b"AVCI"
+_BINARY_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sII")
+_BUCKET_HEADER = struct.Struct("<qqddq")
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+def _write_array(fp: BinaryIO, arr: array) -> None:
+    if _SWAP_BYTES:
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    arr.tofile(fp)
+
+
+def _read_array(fp: BinaryIO, typecode: str, n: int) -> array:
+    arr = array(typecode)
+    try:
+        arr.fromfile(fp, n)
+    except EOFError as e:
+        raise ValueError("truncated AVCI binary state") from e
+    if _SWAP_BYTES:
+        arr.byteswap()
+    return arr
+
+
+@dataclass(frozen=True)
 class AvciConfig:
-    """Configuration for AVCI calculator."""
+    """Configuration for AVCI calculator.
+
+    Validated once on construction and immutable afterwards, so calculators
+    can take it as is.
+    """
     window_ms: int  # Sliding window width in milliseconds
+    # Evict relative to the latest fill inside get_metrics, so callers need
+    # not call evict_to on every tick
+    evict_on_read: bool = False
+
+    def __post_init__(self) -> None:
+        if self.window_ms <= 0:
+            raise ValueError("window_ms must be positive")
+
+
+@dataclass(frozen=True)
+class AvciMetrics:
+    """AVCI metrics for one bucket (combined, buy or sell).
+
+    Immutable, so instances can be cached and shared between get_metrics()
+    calls. Fields can also be read dict-style (``m["avci"]``) for code
+    written against the earlier dict return type.
+    """
+    __slots__ = ("avci", "avci_excess", "avci_norm", "N", "V")
+
+    avci: Optional[float]         # Σ_2 / V² (None if V=0)
+    avci_excess: Optional[float]  # N * AVCI - 1 (None if V=0)
+    avci_norm: Optional[float]    # Normalized AVCI in [0, 1] (None if V=0)
+    N: int                        # Active taker count
+    V: float                      # Total volume
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __reduce__(self):
+        # Frozen + __slots__ cannot be unpickled through setattr
+        return (AvciMetrics, (self.avci, self.avci_excess, self.avci_norm, self.N, self.V))
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a plain dict (e.g. for serialization)."""
+        return {
+            "avci": self.avci,
+            "avci_excess": self.avci_excess,
+            "avci_norm": self.avci_norm,
+            "N": self.N,
+            "V": self.V,
+        }
+
+
+_EMPTY_METRICS = AvciMetrics(avci=None, avci_excess=None, avci_norm=None, N=0, V=0.0)
+
+
+def _metrics(V: float, sigma_2: float, N: int) -> AvciMetrics:
+    """Build the metrics record from the running totals of a bucket."""
+    if V <= 0:
+        return _EMPTY_METRICS
+
+    avci = sigma_2 / (V * V)
+    avci_excess = N * avci - 1.0
+
+    # Normalized AVCI in [0, 1]
+    # Spikes to 1 when concentrated, 0 when distributed
+    if N > 1:
+        avci_norm = avci_excess / (N - 1)
+    else:
+        # If N=1, it is maximally concentrated -> 1.0
+        avci_norm = 1.0
+
+    return AvciMetrics(avci=avci, avci_excess=avci_excess, avci_norm=avci_norm, N=N, V=V)
 
 
 class _AvciBucket:
-    """Internal bucket maintaining AVCI state for one side (combined/buy/sell).
+    """Internal bucket maintaining AVCI state for one side (buy or sell).
 
     Maintains O(1) incremental updates using:
-        - deque of fills (timestamp, taker_id, qty) in timestamp order
-        - vol_by_taker dict for per-taker volume
+        - parallel arrays of fill timestamps, interned taker ids and
+          quantities in timestamp order, consumed from a moving head index
+        - vol_by_taker dict for per-taker volume, and fills_by_taker for
+          the number of live fills behind it
         - Running scalars: V (total), sigma_2 (sum of squared volumes), N (count)
+
+    V and sigma_2 are kept with Neumaier compensated summation: the
+    low-order bits lost when adding a small update to a large total are
+    collected in _V_c / _sigma_2_c, so long insert/evict streams do not
+    drift.
+
+    All arithmetic is plain float; quantities are serialized as strings in
+    get_state so the state stays JSON-friendly.
     """
 
+    # Evicted slots are physically dropped once the dead prefix reaches this
+    # size and makes up at least half of the storage.
+    _COMPACT_MIN = 1024
+
     def __init__(self) -> None:
-        # Deque of (timestamp_ms, taker_id, qty) in arrival order
-        self._fills: Deque[Tuple[int, str, Decimal]] = deque()
-        # Per-taker accumulated volume
-        self._vol_by_taker: Dict[str, Decimal] = {}
+        # Fills in arrival order, stored column-wise; live rows are [head, len)
+        self._ts: array = array("q")
+        self._tid: array = array("q")
+        self._qty: array = array("d")
+        self._head: int = 0
+        # Per-taker accumulated volume and live fill count; a taker leaves
+        # the bucket when its count reaches zero, whatever float residue its
+        # volume is left with
+        self._vol_by_taker: Dict[int, float] = {}
+        self._fills_by_taker: Dict[int, int] = {}
         # Running totals
-        self._V: Decimal = Decimal("0")  # Total volume
-        self._sigma_2: Decimal = Decimal("0")  # Sum of squared per-taker volumes
+        self._V: float = 0.0  # Total volume
+        self._sigma_2: float = 0.0  # Sum of squared per-taker volumes
+        self._V_c: float = 0.0  # Compensation terms for V and sigma_2
+        self._sigma_2_c: float = 0.0
         self._N: int = 0  # Count of active takers
+        # Bumped on every state change; keys the metrics caches
+        self._version: int = 0
+        self._metrics_cache: Optional[AvciMetrics] = None
+        self._metrics_version: int = -1
 
-    def insert(self, timestamp_ms: int, taker_id: str, qty: Decimal) -> None:
-        """Insert a fill into the bucket with O(1) update."""
-        self._fills.append((timestamp_ms, taker_id, qty))
-
-        # Get old volume for this taker
-        old_vol = self._vol_by_taker.get(taker_id, Decimal("0"))
-        new_vol = old_vol + qty
+    def __len__(self) -> int:
+        """Number of fills currently in the window."""
+        return len(self._ts) - self._head
 
-        # Update running totals
-        self._V += qty
-        # Σ_2 = Σ_2 - x² + (x+q)²
-        self._sigma_2 = self._sigma_2 - (old_vol * old_vol) + (new_vol * new_vol)
-
-        # Update taker count if new taker
-        if old_vol == 0:
+    def insert(self, timestamp_ms: int, taker_id: int, qty: float) -> None:
+        """Insert a fill into the bucket with O(1) update."""
+        self._ts.append(timestamp_ms)
+        self._tid.append(taker_id)
+        self._qty.append(qty)
+        self._version += 1
+
+        # Get old volume for this taker; a missing entry means a new taker
+        vbt = self._vol_by_taker
+        fbt = self._fills_by_taker
+        old_vol = vbt.get(taker_id)
+        if old_vol is None:
+            old_vol = 0.0
+            fbt[taker_id] = 1
             self._N += 1
+        else:
+            fbt[taker_id] += 1
+        new_vol = old_vol + qty
 
-        self._vol_by_taker[taker_id] = new_vol
+        # Update running totals (Neumaier steps)
+        V = self._V
+        t = V + qty
+        if abs(V) >= abs(qty):
+            self._V_c += (V - t) + qty
+        else:
+            self._V_c += (qty - t) + V
+        self._V = t
+
+        # Σ_2 = Σ_2 - x² + (x+q)² = Σ_2 + q(2x+q), without forming the
+        # two large squares whose difference would cancel
+        delta = qty * (old_vol + new_vol)
+        sigma_2 = self._sigma_2
+        t = sigma_2 + delta
+        if abs(sigma_2) >= abs(delta):
+            self._sigma_2_c += (sigma_2 - t) + delta
+        else:
+            self._sigma_2_c += (delta - t) + sigma_2
+        self._sigma_2 = t
 
-    def evict_before(self, cutoff_ms: int) -> None:
-        """Evict fills with timestamp < cutoff_ms with O(k) where k = evicted count."""
-        while self._fills and self._fills[0][0] < cutoff_ms:
-            _, taker_id, qty = self._fills.popleft()
+        vbt[taker_id] = new_vol
 
-            old_vol = self._vol_by_taker.get(taker_id, Decimal("0"))
-            new_vol = old_vol - qty
+    def evict_before(self, cutoff_ms: int) -> List[int]:
+        """Evict fills with timestamp < cutoff_ms.
 
-            # Update running totals
-            self._V -= qty
-            # Σ_2 = Σ_2 - x² + (x-q)²
-            self._sigma_2 = self._sigma_2 - (old_vol * old_vol) + (new_vol * new_vol)
+        Returns immediately when the oldest live fill is still inside the
+        window; otherwise the cutoff is located by binary search over the
+        sorted timestamps.
+        Evicted quantities are first summed per taker, so the running totals
+        and the per-taker dict are touched once per distinct taker rather
+        than once per evicted fill.
 
-            if new_vol <= 0:
-                # Taker fully evicted
-                self._vol_by_taker.pop(taker_id, None)
-                self._N -= 1
+        Returns:
+            Interned ids of the takers that left the bucket entirely.
+        """
+        ts = self._ts
+        head = self._head
+        # Most calls evict nothing: check the oldest live fill before searching
+        if head == len(ts) or ts[head] >= cutoff_ms:
+            return []
+        # Fills arrive in timestamp order, so the live slice is sorted
+        stop = bisect_left(ts, cutoff_ms, head + 1)
+
+        # Per-taker decrement and evicted fill count over the evicted slice
+        dec: Dict[int, float] = {}
+        dec_get = dec.get
+        cnt: Dict[int, int] = {}
+        cnt_get = cnt.get
+        for taker_id, qty in zip(self._tid[head:stop], self._qty[head:stop]):
+            dec[taker_id] = dec_get(taker_id, 0.0) + qty
+            cnt[taker_id] = cnt_get(taker_id, 0) + 1
+
+        vbt = self._vol_by_taker
+        fbt = self._fills_by_taker
+        dV = 0.0
+        dsigma_2 = 0.0
+        N = self._N
+        released: List[int] = []
+
+        for taker_id, d in dec.items():
+            # Every evicted fill was inserted, so its taker is present
+            old_vol = vbt[taker_id]
+            left = fbt[taker_id] - cnt[taker_id]
+
+            if not left:
+                # Taker fully evicted: drop its whole volume, float residue
+                # included
+                dV -= old_vol
+                dsigma_2 -= old_vol * old_vol
+                del vbt[taker_id], fbt[taker_id]
+                N -= 1
+                released.append(taker_id)
             else:
-                self._vol_by_taker[taker_id] = new_vol
-
-    def get_metrics(self) -> Dict[str, Any]:
-        """Compute and return current metrics."""
-        if self._V <= 0:
-            return {
-                "avci": None,
-                "avci_excess": None,
-                "avci_norm": None,
-                "N": 0,
-                "V": Decimal("0"),
-            }
-
-        avci = self._sigma_2 / (self._V * self._V)
-        avci_excess = Decimal(self._N) * avci - Decimal("1")
-
-        # Normalized AVCI in [0, 1]
-        # Spikes to 1 when concentrated, 0 when distributed
-        if self._N > 1:
-            avci_norm = avci_excess / Decimal(self._N - 1)
+                # Live fills remain; clamp a residue that went negative
+                new_vol = max(old_vol - d, 0.0)
+                d = old_vol - new_vol
+                dV -= d
+                # Σ_2 = Σ_2 - x² + (x-d)² = Σ_2 - d(2x-d)
+                dsigma_2 -= d * (old_vol + new_vol)
+                vbt[taker_id] = new_vol
+                fbt[taker_id] = left
+
+        if not vbt:
+            # Window drained: clear accumulated float roundoff
+            self._V = self._V_c = 0.0
+            self._sigma_2 = self._sigma_2_c = 0.0
+            N = 0
         else:
-            # If N=1, it is maximally concentrated -> 1.0
-            avci_norm = Decimal("1")
+            # Apply the batched deltas with one Neumaier step each
+            V = self._V
+            t = V + dV
+            if abs(V) >= abs(dV):
+                self._V_c += (V - t) + dV
+            else:
+                self._V_c += (dV - t) + V
+            self._V = t
 
-        return {
-            "avci": avci,
-            "avci_excess": avci_excess,
-            "avci_norm": avci_norm,
-            "N": self._N,
-            "V": self._V,
-        }
+            sigma_2 = self._sigma_2
+            t = sigma_2 + dsigma_2
+            if abs(sigma_2) >= abs(dsigma_2):
+                self._sigma_2_c += (sigma_2 - t) + dsigma_2
+            else:
+                self._sigma_2_c += (dsigma_2 - t) + sigma_2
+            self._sigma_2 = t
+
+        self._N = N
+        self._head = stop
+        self._version += 1
+        self._compact()
+        return released
+
+    def _compact(self) -> None:
+        """Drop the evicted prefix once it dominates the storage."""
+        head = self._head
+        if head == len(self._ts):
+            del self._ts[:], self._tid[:], self._qty[:]
+            self._head = 0
+        elif head >= self._COMPACT_MIN and 2 * head >= len(self._ts):
+            del self._ts[:head], self._tid[:head], self._qty[:head]
+            self._head = 0
+
+    def totals(self) -> Tuple[float, float]:
+        """Return the compensated (V, sigma_2) running totals."""
+        return self._V + self._V_c, self._sigma_2 + self._sigma_2_c
+
+    def get_metrics(self) -> AvciMetrics:
+        """Compute and return current metrics, cached until the next insert/evict."""
+        if self._metrics_version != self._version:
+            V, sigma_2 = self.totals()
+            self._metrics_cache = _metrics(V, sigma_2, self._N)
+            self._metrics_version = self._version
+        return self._metrics_cache
+
+    def live_volumes(self) -> Dict[int, float]:
+        """Per-taker volume summed from scratch over the live fills.
+
+        Independent of the running totals, for verification (see
+        AvciCalculator.recompute_metrics).
+        """
+        vols: Dict[int, float] = {}
+        vols_get = vols.get
+        head = self._head
+        for taker_id, qty in zip(self._tid[head:], self._qty[head:]):
+            vols[taker_id] = vols_get(taker_id, 0.0) + qty
+        return vols
 
     def get_state(self) -> Dict[str, Any]:
-        """Return serializable state for persistence."""
+        """Return serializable state for persistence.
+
+        Fills and per-taker volumes are written as flat columns of plain
+        numbers (floats round-trip exactly through JSON), so both directions
+        are bulk list conversions.
+        """
+        head = self._head
+        vbt = self._vol_by_taker
+        V, sigma_2 = self.totals()
         return {
-            "fills": [(ts, tid, str(q)) for (ts, tid, q) in self._fills],
-            "vol_by_taker": {k: str(v) for k, v in self._vol_by_taker.items()},
-            "V": str(self._V),
-            "sigma_2": str(self._sigma_2),
+            "ts": self._ts[head:].tolist(),
+            "tid": self._tid[head:].tolist(),
+            "qty": self._qty[head:].tolist(),
+            "takers": list(vbt),
+            "vols": list(vbt.values()),
+            "V": str(V),
+            "sigma_2": str(sigma_2),
             "N": self._N,
         }
 
-    def restore_from_state(self, state: Dict[str, Any]) -> None:
-        """Restore state from serialized dict."""
-        self._fills = deque(
-            (int(ts), str(tid), Decimal(str(q))) for ts, tid, q in state.get("fills", [])
-        )
-        self._vol_by_taker = {
-            k: Decimal(str(v)) for k, v in state.get("vol_by_taker", {}).items()
-        }
-        self._V = Decimal(str(state.get("V", "0")))
-        self._sigma_2 = Decimal(str(state.get("sigma_2", "0")))
+    def restore_from_state(
+        self, state: Dict[str, Any], intern: Callable[[Any], int] = int
+    ) -> None:
+        """Restore state from serialized dict.
+
+        Also accepts the older row-wise layout ("fills" triples and a
+        "vol_by_taker" dict, with float or legacy Decimal strings). ``intern``
+        maps the serialized taker keys to interned ids; the default handles
+        ids written by get_state (including JSON-stringified dict keys).
+        """
+        if "ts" in state:
+            self._ts = array("q", state["ts"])
+            self._tid = array("q", map(intern, state["tid"]))
+            self._qty = array("d", map(float, state["qty"]))
+            self._vol_by_taker = dict(
+                zip(map(intern, state["takers"]), map(float, state["vols"]))
+            )
+        else:
+            fills = state.get("fills", [])
+            self._ts = array("q", (int(ts) for ts, _, _ in fills))
+            self._tid = array("q", (intern(tid) for _, tid, _ in fills))
+            self._qty = array("d", (float(q) for _, _, q in fills))
+            self._vol_by_taker = {
+                intern(k): float(v) for k, v in state.get("vol_by_taker", {}).items()
+            }
+        self._head = 0
+        self._fills_by_taker = dict(Counter(self._tid))
+        self._V = float(state.get("V", "0"))
+        self._sigma_2 = float(state.get("sigma_2", "0"))
+        self._V_c = 0.0
+        self._sigma_2_c = 0.0
         self._N = int(state.get("N", 0))
+        self._version += 1
+
+    def dump_binary(self, fp: BinaryIO) -> None:
+        """Write state to a binary stream as raw little-endian columns."""
+        head = self._head
+        vbt = self._vol_by_taker
+        V, sigma_2 = self.totals()
+        fp.write(_BUCKET_HEADER.pack(len(self._ts) - head, len(vbt), V, sigma_2, self._N))
+        _write_array(fp, self._ts[head:])
+        _write_array(fp, self._tid[head:])
+        _write_array(fp, self._qty[head:])
+        _write_array(fp, array("q", vbt.keys()))
+        _write_array(fp, array("d", vbt.values()))
+
+    def restore_from_binary(self, fp: BinaryIO) -> None:
+        """Restore state written by dump_binary."""
+        raw = fp.read(_BUCKET_HEADER.size)
+        if len(raw) != _BUCKET_HEADER.size:
+            raise ValueError("truncated AVCI binary state")
+        n_fills, n_takers, V, sigma_2, N = _BUCKET_HEADER.unpack(raw)
+        self._ts = _read_array(fp, "q", n_fills)
+        self._tid = _read_array(fp, "q", n_fills)
+        self._qty = _read_array(fp, "d", n_fills)
+        keys = _read_array(fp, "q", n_takers)
+        self._vol_by_taker = dict(zip(keys, _read_array(fp, "d", n_takers)))
+        self._head = 0
+        self._fills_by_taker = dict(Counter(self._tid))
+        self._V = V
+        self._sigma_2 = sigma_2
+        self._V_c = 0.0
+        self._sigma_2_c = 0.0
+        self._N = N
+        self._version += 1
 
 
 class AvciCalculator:
     """Calculator for Aggressive Volume Concentration Index with side variants.
 
-    Maintains three buckets:
-        - combined: all fills regardless of side
+    Maintains two buckets:
         - buy: only buy fills (side = +1)
         - sell: only sell fills (side = -1)
+
+    The combined variant is derived from the two side buckets on demand
+    (see _combined_metrics), so each fill is stored and evicted once.
     """
 
     def __init__(self, config: AvciConfig) -> None:
-        if config.window_ms <= 0:
-            raise ValueError("window_ms must be positive")
-
         self.config = config
-        self._combined = _AvciBucket()
         self._buy = _AvciBucket()
         self._sell = _AvciBucket()
+        # Side -> bucket lookup; sides other than +1/-1 are absent
+        self._side_buckets: Dict[int, _AvciBucket] = {1: self._buy, -1: self._sell}
+        # Taker order ids are interned to ints once at the boundary; buckets
+        # only ever see the int ids. Entries are released when a taker leaves
+        # both side buckets, so the table stays bounded by the window.
+        self._taker_ids: Dict[Hashable, int] = {}
+        self._taker_names: Dict[int, Hashable] = {}
+        self._next_taker_id: int = 0
+        # Derived combined metrics, keyed by the (buy, sell) bucket versions
+        self._combined_cache: Optional[AvciMetrics] = None
+        self._combined_versions: Tuple[int, int] = (-1, -1)
+        # get_metrics() result, keyed the same way
+        self._metrics_view: Optional[Mapping[str, AvciMetrics]] = None
+        self._metrics_versions: Tuple[int, int] = (-1, -1)
+
+    def _intern(self, taker_order_id: Hashable) -> int:
+        """Return the int id for a taker order id, allocating one if new.
+
+        Ids are keyed as given, so 1 and "1" are different takers.
+        """
+        taker_id = self._taker_ids.get(taker_order_id)
+        if taker_id is None:
+            taker_id = self._next_taker_id
+            self._next_taker_id += 1
+            self._taker_ids[taker_order_id] = taker_id
+            self._taker_names[taker_id] = taker_order_id
+        return taker_id
+
+    def _release(self, taker_ids: List[int]) -> None:
+        """Forget interned ids of takers that have left the window."""
+        for taker_id in taker_ids:
+            name = self._taker_names.pop(taker_id, None)
+            if name is not None:
+                del self._taker_ids[name]
 
     def add_fill(self, fill: Any) -> None:
         """Add an L3 fill to the calculator.
@@ -166,19 +497,62 @@ class AvciCalculator:
         Args:
             fill: Object with timestamp, taker_order_id, side (+1/-1), qty attributes.
         """
-        ts_ms = normalize_timestamp_to_ms(fill.timestamp)
-        taker_id = fill.taker_order_id
-        qty = Decimal(str(fill.qty))
-        side = fill.side
-
-        # Always add to combined bucket
-        self._combined.insert(ts_ms, taker_id, qty)
+        bucket = self._side_buckets.get(fill.side)
+        if bucket is None:
+            # Fills with a side other than +1/-1 are ignored
+            return
+
+        ts = fill.timestamp
+        if type(ts) is int and _MS_MIN <= ts < _MS_MAX:
+            ts_ms = ts
+        else:
+            ts_ms = normalize_timestamp_to_ms(ts)
+        taker_id = self._taker_ids.get(fill.taker_order_id)
+        if taker_id is None:
+            taker_id = self._intern(fill.taker_order_id)
+        bucket.insert(ts_ms, taker_id, float(fill.qty))
+
+    def add_fills(
+        self,
+        timestamps: Sequence[int],
+        taker_order_ids: Sequence[Hashable],
+        sides: Sequence[int],
+        qtys: Sequence[float],
+    ) -> None:
+        """Add a batch of L3 fills given as parallel columns.
+
+        Equivalent to calling add_fill once per row, but resolves the bucket
+        methods and lookup tables once for the whole batch. Any sequences
+        work, including numpy arrays.
 
-        # Add to side-specific bucket
-        if side == 1:
-            self._buy.insert(ts_ms, taker_id, qty)
-        elif side == -1:
-            self._sell.insert(ts_ms, taker_id, qty)
+        Args:
+            timestamps: Fill timestamps (s, ms, us, or ns), in arrival order.
+            taker_order_ids: Aggressor order ID per fill.
+            sides: +1 (buy) or -1 (sell) per fill; other values are ignored.
+            qtys: Fill quantity per fill.
+        """
+        n = len(timestamps)
+        if len(taker_order_ids) != n or len(sides) != n or len(qtys) != n:
+            raise ValueError("timestamps, taker_order_ids, sides and qtys must have equal length")
+
+        inserts = {side: bucket.insert for side, bucket in self._side_buckets.items()}
+        insert_for = inserts.get
+        taker_ids_get = self._taker_ids.get
+        intern = self._intern
+
+        for ts, name, side, qty in zip(timestamps, taker_order_ids, sides, qtys):
+            insert = insert_for(side)
+            if insert is None:
+                continue
+
+            if type(ts) is int and _MS_MIN <= ts < _MS_MAX:
+                ts_ms = ts
+            else:
+                ts_ms = normalize_timestamp_to_ms(ts)
+            taker_id = taker_ids_get(name)
+            if taker_id is None:
+                taker_id = intern(name)
+            insert(ts_ms, taker_id, float(qty))
 
     def evict_to(self, current_time_ms: int) -> None:
         """Evict fills older than window from current time.
@@ -186,53 +560,263 @@ class AvciCalculator:
         Args:
             current_time_ms: Current timestamp (window end).
         """
-        ts_ms = normalize_timestamp_to_ms(current_time_ms)
-        cutoff_ms = ts_ms - self.config.window_ms
+        self.evict_to_ms(normalize_timestamp_to_ms(current_time_ms))
+
+    def evict_to_ms(self, current_time_ms: int) -> None:
+        """Evict fills older than window from a timestamp already in milliseconds.
 
-        self._combined.evict_before(cutoff_ms)
-        self._buy.evict_before(cutoff_ms)
-        self._sell.evict_before(cutoff_ms)
+        Same as evict_to without timestamp normalization, for callers that
+        normalize once at the edge of their event loop.
 
-    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        Args:
+            current_time_ms: Current timestamp in milliseconds (window end).
+        """
+        cutoff_ms = current_time_ms - self.config.window_ms
+
+        released = self._buy.evict_before(cutoff_ms)
+        released += self._sell.evict_before(cutoff_ms)
+        if released:
+            # A taker is gone only once it has left both sides
+            buy_vols = self._buy._vol_by_taker
+            sell_vols = self._sell._vol_by_taker
+            self._release(
+                [t for t in released if t not in buy_vols and t not in sell_vols]
+            )
+
+    def _evict_to_latest(self) -> None:
+        """Evict relative to the latest fill timestamp seen by either side."""
+        buy_ts = self._buy._ts
+        sell_ts = self._sell._ts
+        # Fills arrive in timestamp order, so each side's latest is its last
+        if buy_ts and sell_ts:
+            latest = max(buy_ts[-1], sell_ts[-1])
+        elif buy_ts or sell_ts:
+            latest = (buy_ts or sell_ts)[-1]
+        else:
+            return
+        self.evict_to_ms(latest)
+
+    def _combined_metrics(self) -> AvciMetrics:
+        """Derive combined-bucket metrics from the buy and sell buckets.
+
+        With v_j = b_j + s_j per taker:
+            V   = V_buy + V_sell
+            Σ_2 = Σ_2,buy + Σ_2,sell + 2 Σ_j b_j s_j
+            N   = N_buy + N_sell - |takers on both sides|
+        The cross term only involves takers active on both sides, found by
+        walking the smaller of the two per-taker dicts. The result is cached
+        until either side bucket changes.
+        """
+        buy = self._buy
+        sell = self._sell
+        versions = (buy._version, sell._version)
+        if versions == self._combined_versions:
+            return self._combined_cache
+        small = buy._vol_by_taker
+        large = sell._vol_by_taker
+        if len(small) > len(large):
+            small, large = large, small
+
+        cross = 0.0
+        both = 0
+        for taker_id, vol in small.items():
+            other = large.get(taker_id)
+            if other is not None:
+                cross += vol * other
+                both += 1
+
+        buy_V, buy_sigma_2 = buy.totals()
+        sell_V, sell_sigma_2 = sell.totals()
+        self._combined_cache = _metrics(
+            buy_V + sell_V,
+            buy_sigma_2 + sell_sigma_2 + 2.0 * cross,
+            buy._N + sell._N - both,
+        )
+        self._combined_versions = versions
+        return self._combined_cache
+
+    def get_metrics(self) -> Mapping[str, AvciMetrics]:
         """Return metrics for all three buckets.
 
+        The result is cached between state changes, so repeated polls
+        return the same read-only mapping without rebuilding anything.
+
         Returns:
-            Dict with keys 'combined', 'buy', 'sell', each containing:
+            Read-only mapping with keys 'combined', 'buy', 'sell', each an
+            AvciMetrics with:
                 - avci: AVCI value (None if V=0)
                 - avci_excess: N * AVCI - 1 (None if V=0)
+                - avci_norm: normalized AVCI in [0, 1] (None if V=0)
                 - N: active taker count
                 - V: total volume
         """
-        return {
-            "combined": self._combined.get_metrics(),
-            "buy": self._buy.get_metrics(),
-            "sell": self._sell.get_metrics(),
-        }
+        if self.config.evict_on_read:
+            self._evict_to_latest()
+        versions = (self._buy._version, self._sell._version)
+        if versions != self._metrics_versions:
+            self._metrics_view = MappingProxyType({
+                "combined": self._combined_metrics(),
+                "buy": self._buy.get_metrics(),
+                "sell": self._sell.get_metrics(),
+            })
+            self._metrics_versions = versions
+        return self._metrics_view
+
+    def _side_metrics(self, side: Optional[int]) -> AvciMetrics:
+        """Metrics for one bucket: None = combined, +1 = buy, -1 = sell."""
+        if self.config.evict_on_read:
+            self._evict_to_latest()
+        if side is None:
+            return self._combined_metrics()
+        bucket = self._side_buckets.get(side)
+        if bucket is None:
+            raise ValueError(f"side must be 1, -1 or None, got {side!r}")
+        return bucket.get_metrics()
+
+    def avci_combined(self) -> Optional[float]:
+        """AVCI over both sides (None if V=0), without building get_metrics()."""
+        return self._side_metrics(None).avci
+
+    def avci_buy(self) -> Optional[float]:
+        """AVCI over buy fills (None if V=0)."""
+        return self._side_metrics(1).avci
+
+    def avci_sell(self) -> Optional[float]:
+        """AVCI over sell fills (None if V=0)."""
+        return self._side_metrics(-1).avci
+
+    def volume(self, side: Optional[int] = None) -> float:
+        """Total volume in the window: None = combined, +1 = buy, -1 = sell."""
+        return self._side_metrics(side).V
+
+    def recompute_metrics(self) -> Dict[str, AvciMetrics]:
+        """Return metrics for all three buckets recomputed from the live fills.
+
+        Groups the fills in the window by taker and sums from scratch,
+        bypassing the incremental totals. O(fills) per call: meant for
+        checking the incremental path (e.g. in tests or after a restore),
+        not for polling.
+        """
+        buy = self._buy.live_volumes()
+        sell = self._sell.live_volumes()
+        combined = dict(buy)
+        for taker_id, vol in sell.items():
+            combined[taker_id] = combined.get(taker_id, 0.0) + vol
+
+        def metrics(vols: Dict[int, float]) -> AvciMetrics:
+            return _metrics(
+                math.fsum(vols.values()), math.fsum(v * v for v in vols.values()), len(vols)
+            )
+
+        return {"combined": metrics(combined), "buy": metrics(buy), "sell": metrics(sell)}
 
     def get_state(self) -> Dict[str, Any]:
-        """Return serializable state for persistence."""
+        """Return serializable state for persistence.
+
+        Buckets reference takers by interned id; ``taker_ids`` maps the
+        original taker order ids to those ids. JSON turns non-str ids into
+        strings, so restored takers are then matched by their str form.
+        """
         return {
             "config": {
                 "window_ms": self.config.window_ms,
+                "evict_on_read": self.config.evict_on_read,
             },
-            "combined": self._combined.get_state(),
+            "taker_ids": dict(self._taker_ids),
             "buy": self._buy.get_state(),
             "sell": self._sell.get_state(),
         }
 
     def restore_from_state(self, state: Dict[str, Any]) -> None:
-        """Restore state from serialized dict."""
+        """Restore state from serialized dict.
+
+        States written before taker interning (raw taker order ids in the
+        buckets) are interned on the fly. A 'combined' entry from older
+        states is ignored, since combined metrics are derived from the side
+        buckets.
+        """
         cfg = state.get("config", {})
-        window_ms = int(cfg.get("window_ms", 10000))
-        if window_ms <= 0:
-            raise ValueError("window_ms must be positive")
-        self.config = AvciConfig(window_ms=window_ms)
+        self.config = AvciConfig(
+            window_ms=int(cfg.get("window_ms", 10000)),
+            evict_on_read=bool(cfg.get("evict_on_read", False)),
+        )
 
-        self._combined = _AvciBucket()
-        self._combined.restore_from_state(state.get("combined", {}))
+        taker_ids = state.get("taker_ids")
+        if taker_ids is None:
+            self._taker_ids = {}
+            self._taker_names = {}
+            self._next_taker_id = 0
+            intern: Callable[[Any], int] = self._intern
+        else:
+            self._taker_ids = {k: int(v) for k, v in taker_ids.items()}
+            self._taker_names = {v: k for k, v in self._taker_ids.items()}
+            self._next_taker_id = max(self._taker_names, default=-1) + 1
+            intern = int
 
         self._buy = _AvciBucket()
-        self._buy.restore_from_state(state.get("buy", {}))
+        self._buy.restore_from_state(state.get("buy", {}), intern)
 
         self._sell = _AvciBucket()
-        self._sell.restore_from_state(state.get("sell", {}))
+        self._sell.restore_from_state(state.get("sell", {}), intern)
+        self._side_buckets = {1: self._buy, -1: self._sell}
+        self._combined_cache = None
+        self._combined_versions = (-1, -1)
+        self._metrics_view = None
+        self._metrics_versions = (-1, -1)
+
+    def dump_binary(self, fp: BinaryIO) -> None:
+        """Write state to a binary stream.
+
+        Fill columns are written as raw arrays rather than per-fill strings,
+        which is much faster and smaller than get_state for large windows.
+        get_state remains the JSON-friendly option.
+        """
+        header = json.dumps(
+            {
+                "config": {
+                    "window_ms": self.config.window_ms,
+                    "evict_on_read": self.config.evict_on_read,
+                },
+                # JSON object keys must be strings
+                "taker_ids": {str(k): v for k, v in self._taker_ids.items()},
+            }
+        ).encode()
+        fp.write(_FILE_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, len(header)))
+        fp.write(header)
+        self._buy.dump_binary(fp)
+        self._sell.dump_binary(fp)
+
+    def restore_from_binary(self, fp: BinaryIO) -> None:
+        """Restore state written by dump_binary."""
+        raw = fp.read(_FILE_HEADER.size)
+        if len(raw) != _FILE_HEADER.size:
+            raise ValueError("truncated AVCI binary state")
+        magic, version, header_len = _FILE_HEADER.unpack(raw)
+        if magic != _BINARY_MAGIC:
+            raise ValueError("not an AVCI binary state")
+        if version != _BINARY_VERSION:
+            raise ValueError(f"unsupported AVCI binary state version: {version}")
+        header = json.loads(fp.read(header_len))
+
+        cfg = header["config"]
+        config = AvciConfig(
+            window_ms=int(cfg["window_ms"]),
+            evict_on_read=bool(cfg.get("evict_on_read", False)),
+        )
+
+        buy = _AvciBucket()
+        buy.restore_from_binary(fp)
+        sell = _AvciBucket()
+        sell.restore_from_binary(fp)
+
+        self.config = config
+        self._taker_ids = header["taker_ids"]
+        self._taker_names = {v: k for k, v in self._taker_ids.items()}
+        self._next_taker_id = max(self._taker_names, default=-1) + 1
+        self._buy = buy
+        self._sell = sell
+        self._side_buckets = {1: buy, -1: sell}
+        self._combined_cache = None
+        self._combined_versions = (-1, -1)
+        self._metrics_view = None
+        self._metrics_versions = (-1, -1)
@@ -2,8 +2,9 @@
 Markout Skew (Information Content) — Sliding Window Implementation
 
 This module implements the markout skew calculation as specified in the markout.md spec.
-It leverages the existing SlidingWindow infrastructure and follows the established patterns
-in statbot_common for windowed calculations.
+Completed observations are kept in a column-wise completion-time window with running
+per-side sums, following the established patterns in statbot_common for windowed
+calculations.
 
 Key features:
 - Completion-time sliding windows (§4 from spec)
@@ -13,26 +14,65 @@ Key features:
 - NaN handling for zero counts (§7 from spec)
 """
 
+import heapq
 import logging
-from typing import List, Dict, Optional, NamedTuple, Literal, Tuple
-from collections import defaultdict
-from .sliding_window import SlidingWindow
+from array import array
+from typing import Any, Callable, Deque, List, Dict, Optional, NamedTuple, Literal, Sequence, Tuple
+from collections import deque
 from .protocols import L3Trade, MidPrice
 from .timestamp import normalize_timestamp_to_ms
 
+# Version tag written by MarkoutSkewCalculator.get_state
+_STATE_VERSION = 2
 
-class MarkoutObservation(NamedTuple):
+
+class MarkoutObservation:
     """
     A single markout observation representing an aggregated trade at a timestamp.
     
     This corresponds to one side (buy or sell) of coalesced L3 trades sharing 
     the same timestamp, as described in §2 of the spec.
+    
+    A slotted class rather than a NamedTuple: the calculator completes an
+    observation in place (setting markout, and horizon_time_ms for event-time
+    horizons) instead of allocating a copy. Iteration yields the fields in
+    declaration order, and _replace/_asdict are kept for compatibility.
     """
-    start_time_ms: int      # Trade timestamp (t)
-    horizon_time_ms: int    # When markout should be evaluated (u = t + τ)
-    side: Literal[1, -1]    # +1 = buy aggressor, -1 = sell aggressor
-    pre_trade_mid: float    # Mid-price just before trade execution m(t^-)
-    markout: Optional[float] = None  # Δm = m(u) - m(t^-), set when completed
+    __slots__ = ("start_time_ms", "horizon_time_ms", "side", "pre_trade_mid", "markout")
+    
+    def __init__(self,
+                 start_time_ms: int,
+                 horizon_time_ms: int,
+                 side: Literal[1, -1],
+                 pre_trade_mid: float,
+                 markout: Optional[float] = None):
+        self.start_time_ms = start_time_ms      # Trade timestamp (t)
+        self.horizon_time_ms = horizon_time_ms  # When markout should be evaluated (u = t + τ)
+        self.side = side                        # +1 = buy aggressor, -1 = sell aggressor
+        self.pre_trade_mid = pre_trade_mid      # Mid-price just before trade execution m(t^-)
+        self.markout = markout                  # Δm = m(u) - m(t^-), set when completed
+    
+    def __iter__(self):
+        return iter((self.start_time_ms, self.horizon_time_ms, self.side, self.pre_trade_mid, self.markout))
+    
+    def __eq__(self, other):
+        if not isinstance(other, MarkoutObservation):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+    
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"MarkoutObservation({fields})"
+    
+    def _replace(self, **changes) -> "MarkoutObservation":
+        """Return a copy with the given fields replaced."""
+        fields = self._asdict()
+        fields.update(changes)
+        return MarkoutObservation(**fields)
+    
+    def _asdict(self) -> Dict[str, object]:
+        """Return the fields as a dict."""
+        return {name: getattr(self, name) for name in self.__slots__}
 
 
 class MarkoutConfig(NamedTuple):
@@ -41,6 +81,196 @@ class MarkoutConfig(NamedTuple):
     tau_ms: Optional[int] = None             # Clock-time horizon in milliseconds
     k_trades: Optional[int] = None           # Event-time horizon in number of trades
     window_ms: int = 300000                  # Completion-time window (default 5 minutes)
+    precision: Literal["f32", "f64"] = "f64"  # Storage precision of windowed mids and markouts
+
+
+class _MarkoutBuffer:
+    """
+    Completion-time window of completed observations, stored column-wise.
+
+    Both sides share one ring buffer of parallel arrays (completion time,
+    start time, horizon time, side, pre-trade mid, markout) in completion
+    order. Capacity is a power of two so slots are found with a mask, and it
+    doubles only when the ring is full; eviction just advances the head.
+    Running per-side markout sums and counts are kept in step on add and
+    evict, so side-conditional means are read in O(1) without materializing
+    the window.
+
+    With precision "f32" the mid and markout columns are stored as 32-bit
+    floats, halving their footprint; the running sums are still accumulated
+    in double precision from the stored values.
+    """
+
+    _INITIAL_CAPACITY = 1 << 10
+    # State key per column, in storage order
+    _KEYS = ('ts', 'start_time_ms', 'horizon_time_ms', 'side', 'pre_trade_mid', 'markout')
+    _FLOAT_TYPECODES = {'f32': 'f', 'f64': 'd'}
+
+    def __init__(self, window_duration_ms: int, precision: str = "f64"):
+        if window_duration_ms <= 0:
+            raise ValueError("Window duration must be positive.")
+        if precision not in self._FLOAT_TYPECODES:
+            raise ValueError(f"Unsupported precision: {precision!r}")
+
+        self.window_duration_ms = window_duration_ms
+        float_typecode = self._FLOAT_TYPECODES[precision]
+        self._typecodes = ('q', 'q', 'q', 'b', float_typecode, float_typecode)
+        self._allocate(self._INITIAL_CAPACITY)
+        # Running per-side aggregates over the live rows
+        self.buy_sum = 0.0
+        self.n_buys = 0
+        self.sell_sum = 0.0
+        self.n_sells = 0
+
+    def _allocate(self, capacity: int) -> None:
+        """Allocate empty columns of the given power-of-two capacity."""
+        self._cap = capacity
+        self._mask = capacity - 1
+        self._columns = [array(typecode, [0]) * capacity for typecode in self._typecodes]
+        (self._ts, self._start, self._horizon,
+         self._side, self._mid, self._markout) = self._columns
+        # Live rows are the slots of [head, tail) taken modulo capacity
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self) -> int:
+        """Number of observations currently in the window."""
+        return self._tail - self._head
+
+    def _live(self, column: array) -> array:
+        """Return the live rows of a column in completion order."""
+        start = self._head & self._mask
+        stop = start + len(self)
+        if stop <= self._cap:
+            return column[start:stop]
+        return column[start:] + column[:stop - self._cap]
+
+    def _grow(self, needed: int) -> None:
+        """Double the capacity until `needed` rows fit, keeping live rows in order."""
+        capacity = self._cap
+        while capacity < needed:
+            capacity <<= 1
+        live = [self._live(column) for column in self._columns]
+        self._allocate(capacity)
+        for column, rows in zip(self._columns, live):
+            column[:len(rows)] = rows
+        self._tail = len(live[0])
+
+    def extend(self, timestamps_ms: List[int], observations: List[MarkoutObservation]) -> None:
+        """Append completed observations in completion order, then evict once.
+
+        The batch is split into columns once and each column is written with
+        at most two slice assignments, so a burst of completions costs one
+        pass for the per-side sums and a single purge.
+        """
+        n = len(observations)
+        if not n:
+            return
+        if len(self) + n > self._cap:
+            self._grow(len(self) + n)
+        values = [
+            array(typecode, column_values)
+            for typecode, column_values in zip(self._typecodes, (
+                timestamps_ms,
+                [obs.start_time_ms for obs in observations],
+                [obs.horizon_time_ms for obs in observations],
+                [obs.side for obs in observations],
+                [obs.pre_trade_mid for obs in observations],
+                [obs.markout for obs in observations],
+            ))
+        ]
+        start = self._tail & self._mask
+        first = min(n, self._cap - start)
+        for column, column_values in zip(self._columns, values):
+            if first < n:
+                column[start:] = column_values[:first]
+                column[:n - first] = column_values[first:]
+            else:
+                column[start:start + n] = column_values
+        self._tail += n
+
+        # Sum the stored (possibly quantized) markouts so eviction subtracts
+        # exactly what was added
+        sides = values[3]
+        markouts = values[5]
+
+        # Each side is summed on its own, as purge subtracts it; deriving one
+        # side from the total would lose precision to cancellation
+        buy_sum = sell_sum = 0.0
+        n_buys = 0
+        for side, markout in zip(sides, markouts):
+            if side == 1:
+                buy_sum += markout
+                n_buys += 1
+            else:
+                sell_sum += markout
+        self.buy_sum += buy_sum
+        self.n_buys += n_buys
+        self.sell_sum += sell_sum
+        self.n_sells += n - n_buys
+        self.purge(max(timestamps_ms))
+
+    def purge(self, window_end_ms: int) -> None:
+        """Evict rows older than (window_end_ms - window_duration_ms)."""
+        cutoff_ms = window_end_ms - self.window_duration_ms
+        ts = self._ts
+        mask = self._mask
+        head = self._head
+        tail = self._tail
+        if head == tail or ts[head & mask] >= cutoff_ms:
+            return
+
+        side = self._side
+        markout = self._markout
+        buy_sum, n_buys = self.buy_sum, self.n_buys
+        sell_sum, n_sells = self.sell_sum, self.n_sells
+        while head < tail:
+            slot = head & mask
+            if ts[slot] >= cutoff_ms:
+                break
+            if side[slot] == 1:
+                buy_sum -= markout[slot]
+                n_buys -= 1
+            else:
+                sell_sum -= markout[slot]
+                n_sells -= 1
+            head += 1
+
+        # Drop accumulated roundoff once a side is empty
+        self.buy_sum = buy_sum if n_buys else 0.0
+        self.n_buys = n_buys
+        self.sell_sum = sell_sum if n_sells else 0.0
+        self.n_sells = n_sells
+        self._head = head
+
+    def get_state(self) -> Dict[str, List]:
+        """Return the live rows as plain column lists."""
+        return {
+            key: self._live(column).tolist()
+            for key, column in zip(self._KEYS, self._columns)
+        }
+
+    def restore_from_state(self, state: Dict[str, List]) -> None:
+        """Restore rows written by get_state and recompute the per-side sums."""
+        n = len(state['ts'])
+        capacity = self._INITIAL_CAPACITY
+        while capacity < n:
+            capacity <<= 1
+        self._allocate(capacity)
+        for column, key, typecode in zip(self._columns, self._KEYS, self._typecodes):
+            column[:n] = array(typecode, state[key])
+        self._tail = n
+
+        buy_sum = sell_sum = 0.0
+        n_buys = 0
+        for side, markout in zip(self._side[:n], self._markout[:n]):
+            if side == 1:
+                buy_sum += markout
+                n_buys += 1
+            else:
+                sell_sum += markout
+        self.buy_sum, self.n_buys = buy_sum, n_buys
+        self.sell_sum, self.n_sells = sell_sum, n - n_buys
 
 
 class MarkoutSkewCalculator:
@@ -53,7 +283,14 @@ class MarkoutSkewCalculator:
     3. Maintains completion-time windows for buy/sell observations (§4, §5)
     4. Computes side-conditional means and skew (§5)
     
-    Uses existing SlidingWindow infrastructure for O(1) window operations.
+    Completed observations live in a single column-wise window with running
+    per-side sums, so queries are O(1) and eviction is amortized O(1).
+    
+    Pending observations are scheduled by a private horizon object picked
+    from config.horizon_type (a min-heap for clock time, a FIFO queue for
+    event time), so the per-call paths do not branch on the horizon type.
+    The completion method of the other horizon type always returns an
+    empty list.
     """
     
     def __init__(self, config: MarkoutConfig):
@@ -71,19 +308,30 @@ class MarkoutSkewCalculator:
         if config.horizon_type == "event" and config.k_trades is None:
             raise ValueError("Event-time horizon requires k_trades parameter")
         
-        # Use existing SlidingWindow for completed observations (completion-time windows)
-        self.buy_window = SlidingWindow(config.window_ms)
-        self.sell_window = SlidingWindow(config.window_ms)
+        self.reset()
+    
+    def reset(self) -> None:
+        """Drop all pending and completed observations, keeping the config.
         
-        # Pending observations awaiting horizon completion
-        self.pending_observations: List[MarkoutObservation] = []
+        Leaves the calculator in the same state as a freshly constructed one,
+        so a long-lived instance can be reused across sessions.
+        """
+        # Completion-time window of completed buy and sell observations
+        self._completed = _MarkoutBuffer(self.config.window_ms, self.config.precision)
         # Track last input timestamp for order diagnostics
         self._last_input_time_ms: Optional[int] = None
-        
-        # Event-time horizon state
-        if config.horizon_type == "event":
-            self.trade_counter = 0
-            self.event_horizon_queue: List[Tuple[int, MarkoutObservation]] = []  # (target_trade_index, obs)
+        # Pending observations, scheduled per horizon type
+        self._horizon = _horizon_class(self.config.horizon_type)(self.config)
+    
+    @property
+    def trade_counter(self) -> int:
+        """Number of trades added so far (event-time horizons only)."""
+        return self._horizon.trade_counter
+    
+    @property
+    def event_horizon_queue(self) -> Deque[Tuple[int, MarkoutObservation]]:
+        """Pending (target_trade_index, observation) pairs (event-time horizons only)."""
+        return self._horizon.event_horizon_queue
     
     def add_coalesced_l3_trades(self, 
                                timestamp_ms: int, 
@@ -101,7 +349,9 @@ class MarkoutSkewCalculator:
             pre_trade_mid: Mid-price m(t^-) just before these trades
             
         Returns:
-            List of created observations (0-2 observations)
+            List of created observations (0-2 observations), the buy observation
+            before the sell one, so callers can unpack by side without a
+            search; they are completed in place once their horizon is reached
         """
         if not trades:
             return []
@@ -118,59 +368,83 @@ class MarkoutSkewCalculator:
             )
         self._last_input_time_ms = normalized_timestamp_ms
         
-        # Group trades by aggressor side (§2)
-        buy_trades = [t for t in trades if t.aggressor_sign == 1]
-        sell_trades = [t for t in trades if t.aggressor_sign == -1]
-        
-        created_observations = []
-        
-        # Create buy observation if buy-aggressor trades exist
-        if buy_trades:
-            obs = self._create_observation(normalized_timestamp_ms, 1, pre_trade_mid)
-            created_observations.append(obs)
-            self.pending_observations.append(obs)
-        
-        # Create sell observation if sell-aggressor trades exist  
-        if sell_trades:
-            obs = self._create_observation(normalized_timestamp_ms, -1, pre_trade_mid)
-            created_observations.append(obs)
-            self.pending_observations.append(obs)
+        # Find which aggressor sides are present (§2); observations carry the
+        # side only, so one pass that stops once both are seen is enough
+        has_buy = has_sell = False
+        for trade in trades:
+            sign = trade.aggressor_sign
+            if sign == 1:
+                has_buy = True
+            elif sign == -1:
+                has_sell = True
+            else:
+                continue
+            if has_buy and has_sell:
+                break
         
-        # Update trade counter for event-time horizons AFTER creating observations
-        if self.config.horizon_type == "event":
-            self.trade_counter += len(trades)
+        # Create the buy observation, then the sell one, for the sides present
+        created_observations = self._horizon.add_group(
+            normalized_timestamp_ms, pre_trade_mid, has_buy, has_sell, len(trades)
+        )
         
-        logging.debug(f"Created {len(created_observations)} observations at t={timestamp_ms}, "
-                     f"pre_trade_mid={pre_trade_mid:.6f}")
+        logging.debug("Created %d observations at t=%s, pre_trade_mid=%.6f",
+                      len(created_observations), timestamp_ms, pre_trade_mid)
         
         return created_observations
     
-    def _create_observation(self, timestamp_ms: int, side: Literal[1, -1], pre_trade_mid: float) -> MarkoutObservation:
-        """Create a single markout observation with appropriate horizon scheduling.
+    def add_coalesced_l3_trades_batch(self,
+                                     timestamps_ms: Sequence[int],
+                                     pre_trade_mids: Sequence[float],
+                                     has_buy: Sequence[bool],
+                                     has_sell: Sequence[bool],
+                                     trade_counts: Optional[Sequence[int]] = None) -> None:
+        """
+        Add many coalesced trade groups at once.
+        
+        Equivalent to calling add_coalesced_l3_trades once per group, in order,
+        but without building trade lists or per-group return values. Callers
+        pass the sides present in each group, which they already know after
+        coalescing.
         
-        Note: timestamp_ms is expected to already be normalized by the caller.
+        Args:
+            timestamps_ms: Timestamp of each coalesced group
+            pre_trade_mids: Mid-price m(t^-) just before each group
+            has_buy: Whether each group contains buy-aggressor trades
+            has_sell: Whether each group contains sell-aggressor trades
+            trade_counts: Number of trades in each group (required for
+                event-time horizons, ignored for clock-time horizons)
         """
-        if self.config.horizon_type == "clock":
-            # Clock-time horizon: u = t + τ
-            horizon_time_ms = timestamp_ms + self.config.tau_ms
-            return MarkoutObservation(
-                start_time_ms=timestamp_ms,
-                horizon_time_ms=horizon_time_ms,
-                side=side,
-                pre_trade_mid=pre_trade_mid
-            )
-        else:
-            # Event-time horizon: u = timestamp of (i+K)th trade
-            # Use current trade counter + K (counter will be updated after all observations are created)
-            target_trade_index = self.trade_counter + self.config.k_trades
-            obs = MarkoutObservation(
-                start_time_ms=timestamp_ms,
-                horizon_time_ms=-1,  # Placeholder, will be set when target trade occurs
-                side=side,
-                pre_trade_mid=pre_trade_mid
+        n = len(timestamps_ms)
+        if (len(pre_trade_mids) != n or len(has_buy) != n or len(has_sell) != n
+                or (trade_counts is not None and len(trade_counts) != n)):
+            raise ValueError(
+                "timestamps_ms, pre_trade_mids, has_buy, has_sell and trade_counts must have equal length"
             )
-            self.event_horizon_queue.append((target_trade_index, obs))
-            return obs
+        self._horizon.check_batch(trade_counts)
+        self._horizon.add_batch(self._normalize_batch(timestamps_ms), pre_trade_mids,
+                                has_buy, has_sell, trade_counts)
+    
+    def _normalize_batch(self, timestamps_ms: Sequence[int]) -> List[int]:
+        """Normalize batch timestamps and run the out-of-order diagnostic once."""
+        normalized = [normalize_timestamp_to_ms(ts) for ts in timestamps_ms]
+        if not normalized:
+            return normalized
+        previous = self._last_input_time_ms
+        for ts in normalized:
+            if previous is not None and ts < previous:
+                logging.warning(
+                    "MarkoutSkew received out-of-order timestamp: %s < last %s",
+                    ts,
+                    previous,
+                )
+            previous = ts
+        self._last_input_time_ms = previous
+        return normalized
+    
+    @property
+    def pending_observations(self) -> List[MarkoutObservation]:
+        """Observations awaiting horizon completion, in completion order."""
+        return self._horizon.pending()
     
     def complete_horizons_clock_time(self, current_time_ms: int, current_mid: float) -> List[MarkoutObservation]:
         """
@@ -181,38 +455,12 @@ class MarkoutSkewCalculator:
             current_mid: Current mid-price m(u)
             
         Returns:
-            List of completed observations
+            List of completed observations in horizon order (ties in insertion
+            order)
         """
-        if self.config.horizon_type != "clock":
+        if self._horizon.horizon_type != "clock":
             return []
-        
-        # Normalize current time
-        normalized_current_time_ms = normalize_timestamp_to_ms(current_time_ms)
-        
-        completed = []
-        remaining = []
-        
-        for obs in self.pending_observations:
-            if obs.horizon_time_ms <= normalized_current_time_ms:
-                # Complete this observation: Δm = m(u) - m(t^-)
-                markout = current_mid - obs.pre_trade_mid
-                completed_obs = obs._replace(markout=markout)
-                completed.append(completed_obs)
-                
-                # Add to appropriate completion-time window
-                # Note: horizon_time_ms is already in milliseconds, don't normalize again
-                if obs.side == 1:
-                    self.buy_window.add(obs.horizon_time_ms, completed_obs)
-                else:
-                    self.sell_window.add(obs.horizon_time_ms, completed_obs)
-                    
-                logging.debug(f"Completed observation: side={obs.side}, markout={markout:.6f}, "
-                             f"horizon_time={obs.horizon_time_ms}")
-            else:
-                remaining.append(obs)
-        
-        self.pending_observations = remaining
-        return completed
+        return self._complete_due(current_time_ms, normalize_timestamp_to_ms(current_time_ms), current_mid)
     
     def complete_horizons_event_time(self, current_time_ms: int, current_mid: float) -> List[MarkoutObservation]:
         """
@@ -223,44 +471,11 @@ class MarkoutSkewCalculator:
             current_mid: Current mid-price m(u)
             
         Returns:
-            List of completed observations
+            List of completed observations in insertion order
         """
-        if self.config.horizon_type != "event":
+        if self._horizon.horizon_type != "event":
             return []
-        
-        completed = []
-        remaining_queue = []
-        remaining_pending = []
-        
-        # Check event horizon queue
-        for target_index, obs in self.event_horizon_queue:
-            if self.trade_counter >= target_index:
-                # This observation's horizon has been reached
-                # Update horizon time to current timestamp and complete
-                obs_with_horizon = obs._replace(horizon_time_ms=current_time_ms)
-                markout = current_mid - obs.pre_trade_mid
-                completed_obs = obs_with_horizon._replace(markout=markout)
-                completed.append(completed_obs)
-                
-                # Add to appropriate completion-time window
-                if obs.side == 1:
-                    self.buy_window.add(current_time_ms, completed_obs)
-                else:
-                    self.sell_window.add(current_time_ms, completed_obs)
-                    
-                logging.debug(f"Completed event-time observation: side={obs.side}, markout={markout:.6f}, "
-                             f"trade_count={self.trade_counter}")
-            else:
-                remaining_queue.append((target_index, obs))
-        
-        # Update pending observations (remove completed ones)
-        for obs in self.pending_observations:
-            if not any(obs is queue_obs for _, queue_obs in self.event_horizon_queue):
-                remaining_pending.append(obs)
-        
-        self.event_horizon_queue = remaining_queue
-        self.pending_observations = remaining_pending
-        return completed
+        return self._complete_due(current_time_ms, normalize_timestamp_to_ms(current_time_ms), current_mid)
     
     def get_markout_skew(self, current_time_ms: int) -> Dict[str, Optional[float]]:
         """
@@ -276,26 +491,49 @@ class MarkoutSkewCalculator:
             Dictionary with keys: 'mplus', 'mminus', 'skew', 'n_buys', 'n_sells'
             NaN values returned when counts are zero (§7 from spec)
         """
-        # Normalize current time and purge windows to maintain completion-time boundary [T-W, T]
-        normalized_current_time_ms = normalize_timestamp_to_ms(current_time_ms)
-        self.buy_window.purge(normalized_current_time_ms)
-        self.sell_window.purge(normalized_current_time_ms)
-        
-        # Get completed observations in current window
-        buy_data = self.buy_window.get_window_data()
-        sell_data = self.sell_window.get_window_data()
-        
-        # Extract markout values
-        buy_markouts = [obs[1].markout for obs in buy_data if obs[1].markout is not None]
-        sell_markouts = [obs[1].markout for obs in sell_data if obs[1].markout is not None]
+        return self._skew_at(normalize_timestamp_to_ms(current_time_ms))
+    
+    def tick(self, current_time_ms: int, current_mid: float) -> Dict[str, Optional[float]]:
+        """
+        Complete due horizons at the current mid and return the markout skew.
         
-        # Calculate counts (§4)
-        n_buys = len(buy_markouts)
-        n_sells = len(sell_markouts)
+        Equivalent to complete_horizons_clock_time (or _event_time) followed by
+        get_markout_skew at the same time, with the timestamp normalized once
+        and the window purged once.
         
-        # Calculate side-conditional means (§5)
-        m_plus = sum(buy_markouts) / n_buys if n_buys > 0 else None
-        m_minus = sum(sell_markouts) / n_sells if n_sells > 0 else None
+        Args:
+            current_time_ms: Current time, used for completion and as the window boundary
+            current_mid: Current mid-price m(u)
+            
+        Returns:
+            Same dictionary as get_markout_skew
+        """
+        normalized_time_ms = normalize_timestamp_to_ms(current_time_ms)
+        self._complete_due(current_time_ms, normalized_time_ms, current_mid)
+        return self._skew_at(normalized_time_ms)
+    
+    def _complete_due(self, current_time_ms: int, normalized_time_ms: int,
+                      current_mid: float) -> List[MarkoutObservation]:
+        """Complete due horizons and add them to the completion-time window."""
+        completed, completion_times_ms = self._horizon.complete_due(
+            current_time_ms, normalized_time_ms, current_mid
+        )
+        if completed:
+            self._completed.extend(completion_times_ms, completed)
+        return completed
+    
+    def _skew_at(self, window_end_ms: int) -> Dict[str, Optional[float]]:
+        """Purge to a normalized window end and read the skew statistics."""
+        # Purge window to maintain completion-time boundary [T-W, T]
+        window = self._completed
+        window.purge(window_end_ms)
+        
+        # Counts (§4) and side-conditional means (§5) come from the running
+        # sums maintained by the window on add/evict
+        n_buys = window.n_buys
+        n_sells = window.n_sells
+        m_plus = window.buy_sum / n_buys if n_buys > 0 else None
+        m_minus = window.sell_sum / n_sells if n_sells > 0 else None
         
         # Calculate markout skew (§5)
         skew = None
@@ -311,53 +549,230 @@ class MarkoutSkewCalculator:
         }
     
     def get_state(self) -> Dict:
-        """Get serializable state for persistence."""
+        """Get serializable state for persistence.
+        
+        Completed observations are written as column lists and pending
+        observations as plain tuples in MarkoutObservation field order.
+        """
+        horizon = self._horizon
         return {
+            'version': _STATE_VERSION,
             'config': self.config._asdict(),
-            'buy_window_data': [(ts, obs._asdict()) for ts, obs in self.buy_window.get_window_data()],
-            'sell_window_data': [(ts, obs._asdict()) for ts, obs in self.sell_window.get_window_data()],
-            'pending_observations': [obs._asdict() for obs in self.pending_observations],
-            'trade_counter': getattr(self, 'trade_counter', 0),
-            'event_horizon_queue': [(idx, obs._asdict()) for idx, obs in getattr(self, 'event_horizon_queue', [])]
+            'completed': self._completed.get_state(),
+            'pending_observations': [tuple(obs) for obs in horizon.pending()],
+            'trade_counter': getattr(horizon, 'trade_counter', 0),
+            'event_horizon_queue': [(idx, tuple(obs)) for idx, obs in getattr(horizon, 'event_horizon_queue', [])]
         }
     
     def restore_from_state(self, state: Dict):
-        """Restore calculator from saved state."""
+        """Restore calculator from saved state.
+        
+        States without a version tag (per-side window lists of observation
+        dicts) are still accepted. If the saved horizon type differs from
+        this calculator's, the calculator switches to the saved one.
+        """
         config_dict = state['config']
         self.config = MarkoutConfig(**config_dict)
+        version = state.get('version', 1)
         
-        # Recreate windows
-        self.buy_window = SlidingWindow(self.config.window_ms)
-        self.sell_window = SlidingWindow(self.config.window_ms)
-        
-        # Restore window data
-        for ts, obs_data in state.get('buy_window_data', []):
-            if isinstance(obs_data, dict):
-                obs = MarkoutObservation(**obs_data)
+        # Pick the observation reconstruction once from the version tag
+        if version < 2:
+            def rebuild(obs_data) -> MarkoutObservation:
+                return MarkoutObservation(**obs_data)
+        else:
+            def rebuild(obs_data) -> MarkoutObservation:
+                return MarkoutObservation(*obs_data)
+        
+        self._completed = _MarkoutBuffer(self.config.window_ms, self.config.precision)
+        if version < 2:
+            # Merge both per-side windows back into completion order. Entries
+            # are either all dicts (serialized) or all observations (in-memory
+            # state), so the form is checked once rather than per entry.
+            window_data = state.get('buy_window_data', []) + state.get('sell_window_data', [])
+            if window_data and isinstance(window_data[0][1], dict):
+                rows = [(ts, rebuild(obs_data)) for ts, obs_data in window_data]
             else:
-                obs = obs_data  # Already a MarkoutObservation
-            self.buy_window.add(ts, obs)
+                rows = window_data
+            rows = [(normalize_timestamp_to_ms(ts), obs) for ts, obs in rows if obs.markout is not None]
+            rows.sort(key=lambda row: row[0])
+            self._completed.extend([ts for ts, _ in rows], [obs for _, obs in rows])
+        else:
+            # Column lists load straight into the window's arrays
+            self._completed.restore_from_state(state['completed'])
         
-        for ts, obs_data in state.get('sell_window_data', []):
-            if isinstance(obs_data, dict):
-                obs = MarkoutObservation(**obs_data)
-            else:
-                obs = obs_data  # Already a MarkoutObservation
-            self.sell_window.add(ts, obs)
+        self._horizon = _horizon_class(self.config.horizon_type)(self.config)
+        self._horizon.restore(state, rebuild)
+
+
+class _ClockHorizon:
+    """Pending observations of a clock-time calculator (u = t + τ)."""
+    
+    horizon_type = "clock"
+    
+    def __init__(self, config: MarkoutConfig):
+        self.tau_ms = config.tau_ms
+        # Pending observations as a min-heap of (horizon_time_ms, seq, obs);
+        # seq keeps equal horizons in insertion order and avoids comparing
+        # observations
+        self.heap: List[Tuple[int, int, MarkoutObservation]] = []
+        self.seq = 0
+    
+    def add_group(self, timestamp_ms: int, pre_trade_mid: float, has_buy: bool,
+                  has_sell: bool, n_trades: int) -> List[MarkoutObservation]:
+        # Clock-time horizon: u = t + τ
+        horizon_time_ms = timestamp_ms + self.tau_ms
+        created = []
+        if has_buy:
+            created.append(MarkoutObservation(timestamp_ms, horizon_time_ms, 1, pre_trade_mid))
+        if has_sell:
+            created.append(MarkoutObservation(timestamp_ms, horizon_time_ms, -1, pre_trade_mid))
+        for obs in created:
+            heapq.heappush(self.heap, (horizon_time_ms, self.seq, obs))
+            self.seq += 1
+        return created
+    
+    def check_batch(self, trade_counts: Optional[Sequence[int]]) -> None:
+        pass
+    
+    def add_batch(self, timestamps_ms: List[int], pre_trade_mids: Sequence[float],
+                  has_buy: Sequence[bool], has_sell: Sequence[bool],
+                  trade_counts: Optional[Sequence[int]]) -> None:
+        tau_ms = self.tau_ms
+        heap = self.heap
+        heappush = heapq.heappush
+        seq = self.seq
+        for ts, mid, buy, sell in zip(timestamps_ms, pre_trade_mids, has_buy, has_sell):
+            horizon_time_ms = ts + tau_ms
+            if buy:
+                heappush(heap, (horizon_time_ms, seq, MarkoutObservation(ts, horizon_time_ms, 1, mid)))
+                seq += 1
+            if sell:
+                heappush(heap, (horizon_time_ms, seq, MarkoutObservation(ts, horizon_time_ms, -1, mid)))
+                seq += 1
+        self.seq = seq
+    
+    def pending(self) -> List[MarkoutObservation]:
+        return [obs for _, _, obs in sorted(self.heap)]
+    
+    def complete_due(self, current_time_ms: int, normalized_current_time_ms: int,
+                     current_mid: float) -> Tuple[List[MarkoutObservation], List[int]]:
+        heap = self.heap
+        if not heap or heap[0][0] > normalized_current_time_ms:
+            return [], []
+        heappop = heapq.heappop
+        completed = []
         
-        # Restore pending observations
-        self.pending_observations = [
-            MarkoutObservation(**obs_dict) 
-            for obs_dict in state.get('pending_observations', [])
-        ]
+        # Pop due horizons in horizon order; the rest of the heap is untouched
+        while heap and heap[0][0] <= normalized_current_time_ms:
+            completed.append(heappop(heap)[2])
         
-        # Restore event-time state if applicable
-        if self.config.horizon_type == "event":
-            self.trade_counter = state.get('trade_counter', 0)
-            self.event_horizon_queue = [
-                (idx, MarkoutObservation(**obs_dict))
-                for idx, obs_dict in state.get('event_horizon_queue', [])
-            ]
+        # Complete the batch in place: Δm = m(u) - m(t^-)
+        for obs in completed:
+            obs.markout = current_mid - obs.pre_trade_mid
+        # One lazily formatted summary per batch rather than a line per observation
+        logging.debug("Completed %d clock-time observations at t=%d, mid=%.6f",
+                      len(completed), normalized_current_time_ms, current_mid)
+        
+        # Completion times for the window
+        # Note: horizon_time_ms is already in milliseconds, don't normalize again
+        return completed, [obs.horizon_time_ms for obs in completed]
+    
+    def restore(self, state: Dict, rebuild: Callable[[Any], MarkoutObservation]) -> None:
+        heap = self.heap
+        for obs_data in state.get('pending_observations', []):
+            obs = rebuild(obs_data)
+            heap.append((obs.horizon_time_ms, self.seq, obs))
+            self.seq += 1
+        heapq.heapify(heap)
+
+
+class _EventHorizon:
+    """Pending observations of an event-time calculator (K trades)."""
+    
+    horizon_type = "event"
+    
+    def __init__(self, config: MarkoutConfig):
+        self.k_trades = config.k_trades
+        # Target indices are non-decreasing in insertion order, so the queue
+        # is FIFO and is the whole pending set
+        self.trade_counter = 0
+        self.event_horizon_queue: Deque[Tuple[int, MarkoutObservation]] = deque()  # (target_trade_index, obs)
+    
+    def add_group(self, timestamp_ms: int, pre_trade_mid: float, has_buy: bool,
+                  has_sell: bool, n_trades: int) -> List[MarkoutObservation]:
+        # Event-time horizon: u = timestamp of (i+K)th trade, taken before
+        # this group's trades are counted; horizon_time_ms is a placeholder
+        # until the target trade occurs
+        target_trade_index = self.trade_counter + self.k_trades
+        created = []
+        if has_buy:
+            created.append(MarkoutObservation(timestamp_ms, -1, 1, pre_trade_mid))
+        if has_sell:
+            created.append(MarkoutObservation(timestamp_ms, -1, -1, pre_trade_mid))
+        self.event_horizon_queue.extend((target_trade_index, obs) for obs in created)
+        self.trade_counter += n_trades
+        return created
+    
+    def check_batch(self, trade_counts: Optional[Sequence[int]]) -> None:
+        if trade_counts is None:
+            raise ValueError("Event-time horizon requires trade_counts for batch ingest")
+    
+    def add_batch(self, timestamps_ms: List[int], pre_trade_mids: Sequence[float],
+                  has_buy: Sequence[bool], has_sell: Sequence[bool],
+                  trade_counts: Optional[Sequence[int]]) -> None:
+        k_trades = self.k_trades
+        append = self.event_horizon_queue.append
+        trade_counter = self.trade_counter
+        for ts, mid, buy, sell, count in zip(timestamps_ms, pre_trade_mids,
+                                             has_buy, has_sell, trade_counts):
+            # Horizon index is taken before this group's trades are counted
+            target_trade_index = trade_counter + k_trades
+            if buy:
+                append((target_trade_index, MarkoutObservation(ts, -1, 1, mid)))
+            if sell:
+                append((target_trade_index, MarkoutObservation(ts, -1, -1, mid)))
+            trade_counter += count
+        self.trade_counter = trade_counter
+    
+    def pending(self) -> List[MarkoutObservation]:
+        return [obs for _, obs in self.event_horizon_queue]
+    
+    def complete_due(self, current_time_ms: int, completion_time_ms: int,
+                     current_mid: float) -> Tuple[List[MarkoutObservation], List[int]]:
+        queue = self.event_horizon_queue
+        trade_counter = self.trade_counter
+        if not queue or queue[0][0] > trade_counter:
+            return [], []
+        popleft = queue.popleft
+        completed = []
+        
+        # Queue is ordered by target index: pop until the first unreached horizon
+        while queue and queue[0][0] <= trade_counter:
+            completed.append(popleft()[1])
+        
+        # Set horizon time to the current timestamp and complete the batch in place
+        for obs in completed:
+            obs.horizon_time_ms = current_time_ms
+            obs.markout = current_mid - obs.pre_trade_mid
+        # One lazily formatted summary per batch rather than a line per observation
+        logging.debug("Completed %d event-time observations at trade_count=%d, mid=%.6f",
+                      len(completed), trade_counter, current_mid)
+        
+        # The window is keyed by the normalized completion time
+        return completed, [completion_time_ms] * len(completed)
+    
+    def restore(self, state: Dict, rebuild: Callable[[Any], MarkoutObservation]) -> None:
+        # pending_observations in the state only mirrors event_horizon_queue
+        self.trade_counter = state.get('trade_counter', 0)
+        self.event_horizon_queue.extend(
+            (idx, rebuild(obs_data))
+            for idx, obs_data in state.get('event_horizon_queue', [])
+        )
+
+
+def _horizon_class(horizon_type: str) -> type:
+    """Return the pending-observation scheduler for a horizon type."""
+    return _ClockHorizon if horizon_type == "clock" else _EventHorizon
 
 
 # Utility functions for L3 coalescing and cross-stream processing
@@ -374,11 +789,18 @@ def coalesce_l3_trades_by_timestamp(trades: List[L3Trade]) -> Dict[int, List[L3T
     Returns:
         Dictionary mapping timestamp_ms -> list of trades at that timestamp
     """
-    groups = defaultdict(list)
+    groups: Dict[int, List[L3Trade]] = {}
+    # Trades in a group share their raw timestamp, so normalize each distinct
+    # raw value once; distinct raw values may still map to the same ms key
+    group_by_raw: Dict[int, List[L3Trade]] = {}
     for trade in trades:
-        ts_ms = normalize_timestamp_to_ms(trade.timestamp)
-        groups[ts_ms].append(trade)
-    return dict(groups)
+        raw_ts = trade.timestamp
+        group = group_by_raw.get(raw_ts)
+        if group is None:
+            group = groups.setdefault(normalize_timestamp_to_ms(raw_ts), [])
+            group_by_raw[raw_ts] = group
+        group.append(trade)
+    return groups
 
 
 def compute_mid_price(bid: float, ask: float) -> float:
@@ -395,6 +817,26 @@ def compute_mid_price(bid: float, ask: float) -> float:
     return (bid + ask) / 2.0
 
 
+def compute_mid_prices(bids: Sequence[float], asks: Sequence[float]) -> List[float]:
+    """
+    Compute mid-prices for parallel bid/ask sequences.
+    
+    Batch form of compute_mid_price, e.g. for the pre_trade_mids column of
+    add_coalesced_l3_trades_batch; one comprehension avoids a function call
+    per quote and gives bit-identical results.
+    
+    Args:
+        bids: Best bid prices
+        asks: Best ask prices, same length as bids
+        
+    Returns:
+        Mid-prices: (bid + ask) / 2 for each pair
+    """
+    if len(bids) != len(asks):
+        raise ValueError("bids and asks must have equal length")
+    return [(bid + ask) * 0.5 for bid, ask in zip(bids, asks)]
+
+
 def validate_l2_consistency(timestamp_ms: int, 
                            l3_trades_count: int, 
                            l2_updates_count: int) -> bool:
@@ -413,9 +855,40 @@ def validate_l2_consistency(timestamp_ms: int,
         True if consistent, False otherwise (logs warning)
     """
     if l3_trades_count > 0 and l2_updates_count != 1:
-        logging.warning(
-            f"WARN markout_skew: expected combined L2 update at t={timestamp_ms} "
-            f"for coalesced L3 prints; observed {l2_updates_count} L2 updates"
-        )
+        _warn_l2_inconsistent(timestamp_ms, l2_updates_count)
         return False
     return True
+
+
+def validate_l2_consistency_batch(timestamps_ms: Sequence[int],
+                                  l3_trades_counts: Sequence[int],
+                                  l2_updates_counts: Sequence[int]) -> List[bool]:
+    """
+    Validate L2 consistency for many timestamps at once.
+    
+    Batch form of validate_l2_consistency over parallel sequences: the
+    checks run as one comprehension and warnings are only emitted for
+    the inconsistent timestamps.
+    
+    Args:
+        timestamps_ms: Timestamps being validated
+        l3_trades_counts: Number of coalesced L3 trades at each timestamp
+        l2_updates_counts: Number of L2 updates at each timestamp
+        
+    Returns:
+        One flag per timestamp, True if consistent (inconsistent ones log a warning)
+    """
+    results = [l3 <= 0 or l2 == 1 for l3, l2 in zip(l3_trades_counts, l2_updates_counts)]
+    if not all(results):
+        for timestamp_ms, l2_updates_count, ok in zip(timestamps_ms, l2_updates_counts, results):
+            if not ok:
+                _warn_l2_inconsistent(timestamp_ms, l2_updates_count)
+    return results
+
+
+def _warn_l2_inconsistent(timestamp_ms: int, l2_updates_count: int) -> None:
+    logging.warning(
+        "WARN markout_skew: expected combined L2 update at t=%s "
+        "for coalesced L3 prints; observed %s L2 updates",
+        timestamp_ms, l2_updates_count
+    )
@@ -1,11 +1,30 @@
 import logging
-from collections import deque
+import math
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Deque, List, Mapping, Optional, Tuple
+from itertools import repeat
+from operator import mul, sub
+from typing import Dict, Iterable, Iterator, List, Literal, Mapping, MutableSequence, Optional, Sequence, Tuple, Union
 
 from .timestamp import normalize_timestamp_to_ms
 
+# Queue sizes, weights and QI values are all-Decimal or all-float
+Number = Union[Decimal, float]
+
+try:
+    # Python 3.12+: C-level dot product; float terms are accumulated in
+    # extended precision and rounded once, like a chain of fused multiply-adds
+    from math import sumprod as _dot
+except ImportError:  # Python < 3.12
+    def _dot(p: Iterable[Number], q: Iterable[Number]) -> Number:
+        return sum(map(mul, p, q))
+
+# In "ema" mean mode, the default half-life leaves this much weight on
+# values older than window_ms
+_EMA_TAIL_WEIGHT = 0.01
+
 
 def compute_exponential_weights(k_levels: int, half_life_ticks: Decimal) -> List[Decimal]:
     """Compute exponential distance weights with half-life in ticks.
@@ -41,6 +60,27 @@ def compute_exponential_weights(k_levels: int, half_life_ticks: Decimal) -> List
     return weights
 
 
+def _float_exponential_weights(k_levels: int, half_life_ticks: Decimal) -> List[float]:
+    """Float counterpart of compute_exponential_weights.
+
+    Integer steps per tick give exact powers of two via ldexp, so the common
+    half-life path needs no Decimal exponentiation.
+    """
+    if k_levels <= 0:
+        raise ValueError("k_levels must be positive")
+    if half_life_ticks <= Decimal("0"):
+        raise ValueError("half_life_ticks must be positive")
+
+    inv_hl = Decimal(1) / half_life_ticks
+    inv_hl_int = inv_hl.to_integral_value()
+    if inv_hl == inv_hl_int:
+        step = int(inv_hl_int)
+        return [math.ldexp(1.0, -k * step) for k in range(k_levels)]
+
+    rate = math.log(2.0) / float(half_life_ticks)
+    return [math.exp(-k * rate) for k in range(k_levels)]
+
+
 def sizes_on_tick_grid(
     best_bid: Decimal,
     best_ask: Decimal,
@@ -58,92 +98,229 @@ def sizes_on_tick_grid(
     if k_levels <= 0:
         raise ValueError("k_levels must be positive")
 
+    zero = Decimal("0")
     bid_sizes: List[Decimal] = []
     ask_sizes: List[Decimal] = []
-    for i in range(k_levels):
-        bid_px = best_bid - (tick_size * Decimal(i))
-        ask_px = best_ask + (tick_size * Decimal(i))
-        bid_sizes.append(bids.get(bid_px, Decimal("0")))
-        ask_sizes.append(asks.get(ask_px, Decimal("0")))
+    # Step one tick per level rather than multiplying tick_size by the level
+    bid_px = best_bid
+    ask_px = best_ask
+    for _ in range(k_levels):
+        bid_sizes.append(bids.get(bid_px, zero))
+        ask_sizes.append(asks.get(ask_px, zero))
+        bid_px -= tick_size
+        ask_px += tick_size
     return bid_sizes, ask_sizes
 
 
-def compute_ib(
-    bid_sizes: List[Decimal],
-    ask_sizes: List[Decimal],
-    weights: List[Decimal],
-) -> Optional[Decimal]:
-    """Compute instantaneous imbalance IB_t from weighted queues (normalized).
+def price_to_tick(price: Decimal, tick_size: Decimal) -> int:
+    """Return the integer tick index of a price, price / tick_size rounded."""
+    if tick_size <= Decimal("0"):
+        raise ValueError("tick_size must be positive")
+    return int((price / tick_size).to_integral_value())
 
-    IB = (D_bid - D_ask) / (D_bid + D_ask), None if denominator == 0.
+
+def tick_book_from_decimal(
+    book: Mapping[Decimal, Decimal],
+    tick_size: Decimal,
+) -> Dict[int, float]:
+    """Convert one side of a Decimal price -> size book to tick index -> float size.
+
+    Meant for the feed boundary: the result feeds update_from_tick_book, so
+    per-update QI work runs on ints and floats only. Levels that round to
+    the same tick are summed.
+    """
+    if tick_size <= Decimal("0"):
+        raise ValueError("tick_size must be positive")
+    tick_book: Dict[int, float] = {}
+    for price, size in book.items():
+        tick = price_to_tick(price, tick_size)
+        tick_book[tick] = tick_book.get(tick, 0.0) + float(size)
+    return tick_book
+
+
+def sizes_on_tick_index_grid(
+    best_bid_tick: int,
+    best_ask_tick: int,
+    k_levels: int,
+    bids: Mapping[int, Number],
+    asks: Mapping[int, Number],
+) -> Tuple[List[Number], List[Number]]:
+    """Return size arrays on the tick grid for books keyed by tick index.
+
+    Same grid as sizes_on_tick_grid, but levels are integer tick indices
+    (see price_to_tick), so each lookup is a plain int hash. Missing grid
+    levels are padded with zero.
+    """
+    if k_levels <= 0:
+        raise ValueError("k_levels must be positive")
+
+    bid_get = bids.get
+    ask_get = asks.get
+    bid_sizes = [bid_get(best_bid_tick - i, 0) for i in range(k_levels)]
+    ask_sizes = [ask_get(best_ask_tick + i, 0) for i in range(k_levels)]
+    return bid_sizes, ask_sizes
+
+
+def _weighted_depths(
+    bid_sizes: Sequence[Number],
+    ask_sizes: Sequence[Number],
+    weights: Sequence[Number],
+) -> Tuple[Number, Number]:
+    """Return (D_bid, D_ask), the weight-dotted queue sizes.
+
+    Works on all-Decimal or all-float inputs; the dot products run at C
+    level in either case (math.sumprod where available).
     """
     if len(bid_sizes) != len(ask_sizes) or len(bid_sizes) != len(weights):
         raise ValueError("bid_sizes, ask_sizes, and weights must have equal length")
+    return _dot(weights, bid_sizes), _dot(weights, ask_sizes)
 
-    d_bid = Decimal("0")
-    d_ask = Decimal("0")
-    for s_b, s_a, w in zip(bid_sizes, ask_sizes, weights):
-        d_bid += w * s_b
-        d_ask += w * s_a
 
+def compute_ib(
+    bid_sizes: Sequence[Number],
+    ask_sizes: Sequence[Number],
+    weights: Sequence[Number],
+) -> Optional[Number]:
+    """Compute instantaneous imbalance IB_t from weighted queues (normalized).
+
+    IB = (D_bid - D_ask) / (D_bid + D_ask), None if denominator == 0.
+    """
+    d_bid, d_ask = _weighted_depths(bid_sizes, ask_sizes, weights)
     denom = d_bid + d_ask
-    if denom == Decimal("0"):
+    if denom == 0:
         return None
     return (d_bid - d_ask) / denom
 
 
 def compute_queue_diff(
-    bid_sizes: List[Decimal],
-    ask_sizes: List[Decimal],
-    weights: List[Decimal],
-) -> Optional[Decimal]:
+    bid_sizes: Sequence[Number],
+    ask_sizes: Sequence[Number],
+    weights: Sequence[Number],
+) -> Optional[Number]:
     """Compute raw queue imbalance QI_t from weighted queues.
 
     QI = D_bid - D_ask (unbounded). Returns None if both D_bid and D_ask are zero.
     """
-    if len(bid_sizes) != len(ask_sizes) or len(bid_sizes) != len(weights):
-        raise ValueError("bid_sizes, ask_sizes, and weights must have equal length")
-
-    d_bid = Decimal("0")
-    d_ask = Decimal("0")
-    for s_b, s_a, w in zip(bid_sizes, ask_sizes, weights):
-        d_bid += w * s_b
-        d_ask += w * s_a
-
-    if d_bid == Decimal("0") and d_ask == Decimal("0"):
+    d_bid, d_ask = _weighted_depths(bid_sizes, ask_sizes, weights)
+    if d_bid == 0 and d_ask == 0:
         return None
     return d_bid - d_ask
 
 
-@dataclass
+@dataclass(frozen=True)
 class QueueImbalanceConfig:
+    """Configuration for QueueImbalanceCalculator.
+
+    Immutable, so the weights a calculator derives from it once cannot go
+    stale.
+    """
     k_levels: int
     tick_size: Decimal
     half_life_ticks: Decimal
     window_ms: int
+    # Compute QI and its mean in Decimal (exact, for audit) instead of float
+    use_decimal: bool = False
+    # "window": exact time-weighted mean over window_ms (stores segments);
+    # "ema": exponentially time-decayed mean in O(1) memory
+    mean_mode: Literal["window", "ema"] = "window"
+    # EMA half-life; defaults to window_ms / log2(1 / _EMA_TAIL_WEIGHT)
+    ema_half_life_ms: Optional[float] = None
 
 
 class QueueImbalanceCalculator:
     """Maintains instantaneous QI_t and its time-weighted mean over a window.
 
-    QI_t is treated as piecewise-constant between update times.
+    QI_t is treated as piecewise-constant between update times. Values are
+    floats unless config.use_decimal is set, in which case all weights, sizes
+    and means stay Decimal.
+
+    With config.mean_mode "ema" no segments are kept: the mean is the
+    time-decayed average of QI_t, normalized by the decayed weight of the
+    time QI_t was defined.
     """
 
+    # Pruned segments are physically dropped once the dead prefix reaches
+    # this size and makes up at least half of the storage.
+    _COMPACT_MIN = 1024
+
     def __init__(self, config: QueueImbalanceConfig) -> None:
         if config.window_ms <= 0:
             raise ValueError("window_ms must be positive")
         self.config = config
-        self.weights: List[Decimal] = compute_exponential_weights(
-            config.k_levels, config.half_life_ticks
-        )
-        # Closed segments of (start_ms, end_ms, value)
-        self._segments: Deque[Tuple[int, int, Decimal]] = deque()
+        self._set_weights()
+        self._set_ema()
+        self._reset_segments()
+        # Weighted depths (D_bid, D_ask) of the last book, for delta updates
+        self._d_bid: Number = self._value_type(0)
+        self._d_ask: Number = self._value_type(0)
         # Current open segment (start_ms, value), if any
         self._current_start_ms: Optional[int] = None
-        self._current_value: Optional[Decimal] = None
+        self._current_value: Optional[Number] = None
         # Last processed time (ms), for monotonicity checks
         self._last_time_ms: Optional[int] = None
 
+    def _set_weights(self) -> None:
+        """Compute the distance weights in the configured number type."""
+        if self.config.use_decimal:
+            self._value_type = Decimal
+            self.weights: List[Number] = compute_exponential_weights(
+                self.config.k_levels, self.config.half_life_ticks
+            )
+        else:
+            self._value_type = float
+            self.weights = _float_exponential_weights(
+                self.config.k_levels, self.config.half_life_ticks
+            )
+
+    def _set_ema(self) -> None:
+        """Validate the mean mode and reset the EMA state."""
+        config = self.config
+        if config.mean_mode not in ("window", "ema"):
+            raise ValueError(f"Unsupported mean_mode: {config.mean_mode!r}")
+        half_life = config.ema_half_life_ms
+        if half_life is None:
+            half_life = config.window_ms / math.log2(1 / _EMA_TAIL_WEIGHT)
+        elif half_life <= 0:
+            raise ValueError("ema_half_life_ms must be positive")
+        self.ema_half_life_ms = half_life
+        # Decay factor over dt ms is exp(dt * _ema_log_decay)
+        value_type = self._value_type
+        if config.use_decimal:
+            self._ema_log_decay: Number = -Decimal(2).ln() / Decimal(half_life)
+        else:
+            self._ema_log_decay = -math.log(2) / half_life
+        # Decayed weighted sums of QI_t and of the time it was defined,
+        # up to _ema_last_ms
+        self._ema_num: Number = value_type(0)
+        self._ema_den: Number = value_type(0)
+        self._ema_last_ms: Optional[int] = None
+
+    def _ema_at(self, now_ms: int) -> Tuple[Number, Number]:
+        """Return the EMA (num, den) advanced to now_ms over the open value."""
+        num, den = self._ema_num, self._ema_den
+        last = self._ema_last_ms
+        if last is None or now_ms <= last:
+            return num, den
+        x = self._ema_log_decay * (now_ms - last)
+        decay = x.exp() if self.config.use_decimal else math.exp(x)
+        num *= decay
+        den *= decay
+        if self._current_value is not None:
+            num += (1 - decay) * self._current_value
+            den += 1 - decay
+        return num, den
+
+    def _reset_segments(self) -> None:
+        """Clear closed segments, stored column-wise in time order.
+
+        Live segments are [head, len). Values are a float array, or a list
+        when computing in Decimal.
+        """
+        self._seg_start = array("q")
+        self._seg_end = array("q")
+        self._seg_val: MutableSequence[Number] = [] if self.config.use_decimal else array("d")
+        self._seg_head = 0
+
     def update_from_book(
         self,
         t_ms: int,
@@ -151,11 +328,110 @@ class QueueImbalanceCalculator:
         best_ask: Optional[Decimal],
         bids: Mapping[Decimal, Decimal],
         asks: Mapping[Decimal, Decimal],
-    ) -> Optional[Decimal]:
+    ) -> Optional[Number]:
         """Compute QI_t from the provided book snapshot and update segments.
 
         Returns the instantaneous QI_t (or None if undefined).
         """
+        now_ms = self._advance_time(t_ms)
+
+        qi_value: Optional[Number] = None
+        if best_bid is not None and best_ask is not None:
+            bid_sizes, ask_sizes = sizes_on_tick_grid(
+                best_bid=best_bid,
+                best_ask=best_ask,
+                tick_size=self.config.tick_size,
+                k_levels=self.config.k_levels,
+                bids=bids,
+                asks=asks,
+            )
+            qi_value = self._queue_diff(bid_sizes, ask_sizes)
+        else:
+            self._set_depths(self._value_type(0), self._value_type(0))
+
+        self._set_value(now_ms, qi_value)
+        return qi_value
+
+    def update_from_tick_book(
+        self,
+        t_ms: int,
+        best_bid_tick: Optional[int],
+        best_ask_tick: Optional[int],
+        bids: Mapping[int, Number],
+        asks: Mapping[int, Number],
+    ) -> Optional[Number]:
+        """Like update_from_book, for books keyed by integer tick index.
+
+        Tick indices are price / tick_size (see price_to_tick), so grid
+        lookups hash plain ints instead of constructing Decimal prices.
+        Sizes are converted to the configured number type, so a float book
+        from tick_book_from_decimal also works with use_decimal.
+        """
+        now_ms = self._advance_time(t_ms)
+
+        qi_value: Optional[Number] = None
+        if best_bid_tick is not None and best_ask_tick is not None:
+            if self.config.use_decimal:
+                bid_sizes, ask_sizes = sizes_on_tick_index_grid(
+                    best_bid_tick, best_ask_tick, self.config.k_levels, bids, asks
+                )
+                qi_value = self._queue_diff(bid_sizes, ask_sizes)
+            else:
+                # Fused grid lookup and weighted sum per side, without
+                # materializing the size lists
+                k_levels = self.config.k_levels
+                weights = self.weights
+                d_bid = _dot(weights, map(float, map(
+                    bids.get, range(best_bid_tick, best_bid_tick - k_levels, -1), repeat(0.0)
+                )))
+                d_ask = _dot(weights, map(float, map(
+                    asks.get, range(best_ask_tick, best_ask_tick + k_levels), repeat(0.0)
+                )))
+                qi_value = self._set_depths(d_bid, d_ask)
+        else:
+            self._set_depths(self._value_type(0), self._value_type(0))
+
+        self._set_value(now_ms, qi_value)
+        return qi_value
+
+    def update_from_book_delta(
+        self,
+        t_ms: int,
+        bid_diffs: Iterable[Tuple[int, Number, Number]],
+        ask_diffs: Iterable[Tuple[int, Number, Number]],
+    ) -> Optional[Number]:
+        """Update QI_t from changed levels only, in O(changed levels).
+
+        Each diff is (tick_offset, new_size, old_size), where tick_offset is
+        the level's distance in ticks from the best price of its side (0 at
+        the touch, counting away from the spread). Offsets refer to the best
+        prices of the last full book: when a best price moves, every offset
+        shifts, so feed that book through update_from_book or
+        update_from_tick_book instead, which also clears any float drift in
+        the running depths. Levels at offset >= k_levels are ignored.
+
+        Returns the instantaneous QI_t (or None if undefined).
+        """
+        now_ms = self._advance_time(t_ms)
+        qi_value = self._set_depths(
+            self._apply_diffs(self._d_bid, bid_diffs),
+            self._apply_diffs(self._d_ask, ask_diffs),
+        )
+        self._set_value(now_ms, qi_value)
+        return qi_value
+
+    def _apply_diffs(self, depth: Number, diffs: Iterable[Tuple[int, Number, Number]]) -> Number:
+        """Add weight * (new_size - old_size) of each in-grid level to depth."""
+        weights = self.weights
+        k_levels = len(weights)
+        value_type = self._value_type
+        for offset, new_size, old_size in diffs:
+            if 0 <= offset < k_levels:
+                depth += weights[offset] * (value_type(new_size) - value_type(old_size))
+        return depth
+
+    def _advance_time(self, t_ms: int) -> int:
+        """Normalize an update time, clamping it to be non-decreasing."""
         now_ms = normalize_timestamp_to_ms(t_ms)
         if self._last_time_ms is not None and now_ms < self._last_time_ms:
             # Enforce monotonic time progression
@@ -167,21 +443,39 @@ class QueueImbalanceCalculator:
             )
             now_ms = self._last_time_ms
         self._last_time_ms = now_ms
+        return now_ms
 
-        qi_value: Optional[Decimal] = None
-        if best_bid is not None and best_ask is not None:
-            bid_sizes, ask_sizes = sizes_on_tick_grid(
-                best_bid=best_bid,
-                best_ask=best_ask,
-                tick_size=self.config.tick_size,
-                k_levels=self.config.k_levels,
-                bids=bids,
-                asks=asks,
-            )
-            # Use raw queue difference as the instantaneous indicator value
-            qi_value = compute_queue_diff(bid_sizes, ask_sizes, self.weights)
+    def _queue_diff(self, bid_sizes: List[Number], ask_sizes: List[Number]) -> Optional[Number]:
+        """Raw queue difference of grid sizes in the configured number type."""
+        value_type = self._value_type
+        bid_sizes = list(map(value_type, bid_sizes))
+        ask_sizes = list(map(value_type, ask_sizes))
+        # Use raw queue difference as the instantaneous indicator value
+        d_bid, d_ask = _weighted_depths(bid_sizes, ask_sizes, self.weights)
+        return self._set_depths(d_bid, d_ask)
+
+    def _set_depths(self, d_bid: Number, d_ask: Number) -> Optional[Number]:
+        """Record the weighted depths and return QI = D_bid - D_ask.
+
+        Returns None if both depths are zero.
+        """
+        self._d_bid = d_bid
+        self._d_ask = d_ask
+        if d_bid == 0 and d_ask == 0:
+            return None
+        return d_bid - d_ask
+
+    def _set_value(self, now_ms: int, qi_value: Optional[Number]) -> None:
+        """Segment management (piecewise-constant QI)."""
+        if self.config.mean_mode == "ema":
+            # Fold the value held since the last update into the EMA
+            if self._ema_last_ms is None or now_ms > self._ema_last_ms:
+                self._ema_num, self._ema_den = self._ema_at(now_ms)
+                self._ema_last_ms = now_ms
+            self._current_start_ms = None if qi_value is None else now_ms
+            self._current_value = qi_value
+            return
 
-        # Segment management (piecewise-constant QI)
         prev_val = self._current_value
         prev_start = self._current_start_ms
 
@@ -196,44 +490,91 @@ class QueueImbalanceCalculator:
             if qi_value is None:
                 # Close existing segment at now_ms
                 if prev_start is not None and now_ms > prev_start:
-                    self._segments.append((prev_start, now_ms, prev_val))
+                    self._close_segment(prev_start, now_ms, prev_val)
                 self._current_start_ms = None
                 self._current_value = None
             elif qi_value != prev_val:
                 # Close previous and start new segment
                 if prev_start is not None and now_ms > prev_start:
-                    self._segments.append((prev_start, now_ms, prev_val))
+                    self._close_segment(prev_start, now_ms, prev_val)
                 self._current_start_ms = now_ms
                 self._current_value = qi_value
             else:
                 # Value unchanged: keep open segment as-is
                 pass
 
-        return qi_value
+    def _close_segment(self, start_ms: int, end_ms: int, value: Number) -> None:
+        self._seg_start.append(start_ms)
+        self._seg_end.append(end_ms)
+        self._seg_val.append(value)
 
     def _prune(self, window_start_ms: int) -> None:
-        while self._segments and self._segments[0][1] <= window_start_ms:
-            self._segments.popleft()
-
-    def get_time_weighted_mean(self, current_time_ms: int) -> Optional[Decimal]:
-        """Return time-weighted mean of QI over [T - W, T]."""
+        head = self._seg_head
+        ends = self._seg_end
+        # Segment ends are non-decreasing, so the pruned prefix is found by bisection
+        stop = bisect_right(ends, window_start_ms, head)
+        if stop == head:
+            return
+        if stop == len(ends):
+            # Window is empty
+            self._reset_segments()
+            return
+
+        self._seg_head = stop
+        if stop >= self._COMPACT_MIN and 2 * stop >= len(ends):
+            for column in (self._seg_start, self._seg_end, self._seg_val):
+                del column[:stop]
+            self._seg_head = 0
+
+    def _live_segments(self) -> Iterator[Tuple[int, int, Number]]:
+        """Iterate live closed segments as (start_ms, end_ms, value)."""
+        head = self._seg_head
+        return zip(self._seg_start[head:], self._seg_end[head:], self._seg_val[head:])
+
+    def get_time_weighted_mean(self, current_time_ms: int) -> Optional[Number]:
+        """Return time-weighted mean of QI over [T - W, T].
+
+        In "ema" mean mode, returns the time-decayed mean of QI up to T.
+        """
         T = normalize_timestamp_to_ms(current_time_ms)
+        if self.config.mean_mode == "ema":
+            num, den = self._ema_at(T)
+            if den == 0:
+                return None
+            return num / den
+
         window_start = T - self.config.window_ms
         self._prune(window_start)
 
-        num = Decimal("0")
-        den = Decimal("0")
-
-        # Closed segments
-        for seg_start, seg_end, val in self._segments:
-            if seg_end <= window_start or seg_start >= T:
-                continue
-            start = max(seg_start, window_start)
-            end = min(seg_end, T)
-            if end > start:
-                dt = Decimal(end - start)
-                num += val * dt
-                den += dt
+        # Durations are integer ms; num takes the value type from the segments
+        head = self._seg_head
+        ends = self._seg_end
+        if head == len(ends) or ends[-1] <= T:
+            # Usual case: every closed segment ends by T and, after pruning,
+            # only the first can start before the window. Reduce over the
+            # live columns and trim that segment's part outside the window.
+            # The reduction is redone per query rather than kept as a running
+            # total, which would carry roundoff from pruned segments.
+            durations = list(map(sub, ends[head:], self._seg_start[head:]))
+            num = _dot(self._seg_val[head:], durations)
+            den = sum(durations)
+            if head < len(ends) and self._seg_start[head] < window_start:
+                seg_start = self._seg_start[head]
+                num -= self._seg_val[head] * (window_start - seg_start)
+                den -= window_start - seg_start
+        else:
+            # Query time before the latest closed segment: clip each segment
+            num = self._value_type(0)
+            den = 0
+            for seg_start, seg_end, val in self._live_segments():
+                if seg_end <= window_start or seg_start >= T:
+                    continue
+                start = max(seg_start, window_start)
+                end = min(seg_end, T)
+                if end > start:
+                    dt = end - start
+                    num += val * dt
+                    den += dt
 
         # Open segment up to T
         if self._current_value is not None and self._current_start_ms is not None:
@@ -242,29 +583,38 @@ class QueueImbalanceCalculator:
                 start = max(seg_start, window_start)
                 end = T
                 if end > start:
-                    dt = Decimal(end - start)
+                    dt = end - start
                     num += self._current_value * dt
                     den += dt
 
-        if den == Decimal("0"):
+        if den == 0:
             return None
         return num / den
 
     def get_state(self) -> dict:
+        # Segments are stored column-wise; float values stay JSON numbers
+        # (exact round trip), Decimal values are strings
+        head = self._seg_head
+        seg_val = self._seg_val[head:]
         return {
             "config": {
                 "k_levels": self.config.k_levels,
                 "tick_size": str(self.config.tick_size),
                 "half_life_ticks": str(self.config.half_life_ticks),
                 "window_ms": self.config.window_ms,
+                "use_decimal": self.config.use_decimal,
+                "mean_mode": self.config.mean_mode,
+                "ema_half_life_ms": self.config.ema_half_life_ms,
             },
-            "segments": [
-                [int(s), int(e), str(v)] for (s, e, v) in self._segments
-            ],
+            "seg_start": self._seg_start[head:].tolist(),
+            "seg_end": self._seg_end[head:].tolist(),
+            "seg_val": list(map(str, seg_val)) if self.config.use_decimal else seg_val.tolist(),
             "current": None
             if self._current_value is None or self._current_start_ms is None
             else [int(self._current_start_ms), str(self._current_value)],
             "last_time_ms": self._last_time_ms,
+            "depths": [str(self._d_bid), str(self._d_ask)],
+            "ema": [str(self._ema_num), str(self._ema_den), self._ema_last_ms],
         }
 
     def restore_from_state(self, state: dict) -> None:
@@ -274,20 +624,38 @@ class QueueImbalanceCalculator:
             tick_size=Decimal(cfg.get("tick_size", "0.01")),
             half_life_ticks=Decimal(cfg.get("half_life_ticks", "0.5")),
             window_ms=int(cfg.get("window_ms", 30000)),
+            use_decimal=bool(cfg.get("use_decimal", False)),
+            mean_mode=cfg.get("mean_mode", "window"),
+            ema_half_life_ms=cfg.get("ema_half_life_ms"),
         )
-        self.weights = compute_exponential_weights(
-            self.config.k_levels, self.config.half_life_ticks
-        )
-        self._segments.clear()
-        for s, e, v in state.get("segments", []):
-            self._segments.append((int(s), int(e), Decimal(v)))
+        self._set_weights()
+        self._set_ema()
+        value_type = self._value_type
+        self._reset_segments()
+        if "seg_start" in state:
+            starts, ends, vals = state["seg_start"], state["seg_end"], state["seg_val"]
+        else:
+            # Older states store [start, end, str(value)] triples
+            triples = state.get("segments", [])
+            starts, ends, vals = zip(*triples) if triples else ((), (), ())
+        self._seg_start.extend(map(int, starts))
+        self._seg_end.extend(map(int, ends))
+        self._seg_val.extend(map(value_type, vals))
         cur = state.get("current")
         if cur is None:
             self._current_start_ms = None
             self._current_value = None
         else:
             self._current_start_ms = int(cur[0])
-            self._current_value = Decimal(cur[1])
+            self._current_value = value_type(cur[1])
         self._last_time_ms = state.get("last_time_ms")
+        d_bid, d_ask = state.get("depths", ["0", "0"])
+        self._d_bid = value_type(d_bid)
+        self._d_ask = value_type(d_ask)
+        ema = state.get("ema")
+        if ema is not None:
+            self._ema_num = value_type(ema[0])
+            self._ema_den = value_type(ema[1])
+            self._ema_last_ms = ema[2]
 
 
@@ -1,12 +1,19 @@
+from operator import attrgetter, itemgetter
 from typing import List, Tuple
 from .protocols import HasSize
 
+_get_data = itemgetter(1)
+_get_size = attrgetter('size')
+
+
 def compute_total_size(
     data_points: List[Tuple[int, HasSize]],
 ) -> float:
     """
     Compute the total size from a list of (timestamp, data) tuples.
 
+    Data points without a `size` attribute are skipped.
+
     Args:
         data_points: A list of tuples, where each tuple contains a
                      timestamp and an object that conforms to the HasSize protocol.
@@ -17,9 +24,16 @@ def compute_total_size(
     if not data_points:
         return 0.0
 
+    try:
+        # Homogeneous windows (the common case) are summed without a
+        # per-element hasattr check
+        return sum(map(_get_size, map(_get_data, data_points)), 0.0)
+    except AttributeError:
+        pass
+
     total_size = 0.0
     for _, data in data_points:
         if hasattr(data, 'size'):
             total_size += data.size
 
-    return total_size 
\ No newline at end of file
+    return total_size
@@ -1,28 +1,125 @@
-from collections import deque
-from typing import Deque, Tuple, Any, List
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, List, Optional, Protocol, Tuple
 from .timestamp import normalize_timestamp_to_ms
 
+
+class AggregateOp(Protocol):
+    """
+    A monoid describing a window aggregate for SlidingWindow.
+
+    `combine` must be associative with `identity` as its neutral element.
+    It does not need an inverse: the window uses the Two-Stacks scheme, so
+    aggregates such as max/min work as well as sums, and sums never
+    accumulate subtract-on-evict roundoff.
+    """
+    identity: Any
+
+    def lift(self, data: Any) -> Any:
+        """Map a stored data point to an aggregate value."""
+        ...
+
+    def combine(self, left: Any, right: Any) -> Any:
+        """Combine two aggregates; `left` covers older data than `right`."""
+        ...
+
+    def lower(self, aggregate: Any) -> Any:
+        """Map an aggregate to the value returned by SlidingWindow.query()."""
+        ...
+
+
+class MeanOp:
+    """
+    Mean of a numeric value over the window (None when the window is empty).
+
+    The aggregate is a (sum, count) pair.
+    """
+    identity = (0.0, 0)
+
+    def __init__(self, value: Optional[Callable[[Any], float]] = None):
+        """
+        Args:
+            value: Extracts the number to average from a data point. Defaults
+                   to the data point itself.
+        """
+        self._value = value
+
+    def lift(self, data: Any) -> Tuple[float, int]:
+        return (self._value(data) if self._value is not None else data, 1)
+
+    def combine(self, left: Tuple[float, int], right: Tuple[float, int]) -> Tuple[float, int]:
+        return (left[0] + right[0], left[1] + right[1])
+
+    def lower(self, aggregate: Tuple[float, int]) -> Optional[float]:
+        total, count = aggregate
+        return total / count if count else None
+
+
+class SumOp:
+    """
+    Sum of a numeric value over the window (0.0 when the window is empty).
+
+    E.g. `SumOp(attrgetter("size"))` keeps the total size of the window
+    current, so it does not have to be recomputed from get_window_data().
+    """
+    identity = 0.0
+
+    def __init__(self, value: Optional[Callable[[Any], float]] = None):
+        """
+        Args:
+            value: Extracts the number to sum from a data point. Defaults to
+                   the data point itself.
+        """
+        self._value = value
+
+    def lift(self, data: Any) -> float:
+        return self._value(data) if self._value is not None else data
+
+    def combine(self, left: float, right: float) -> float:
+        return left + right
+
+    def lower(self, aggregate: float) -> float:
+        return aggregate
+
+
 class SlidingWindow:
     """
     A generic, time-based sliding window for storing timestamped data.
     
-    This class manages a deque of (timestamp, data) tuples and automatically
+    This class stores (timestamp, data) entries column-wise and automatically
     prunes entries that are older than the specified window duration.
     It automatically normalizes timestamps to milliseconds.
+
+    Optionally maintains an aggregate over the window contents (see
+    AggregateOp), readable in O(1) via query() without copying the window.
     """
 
-    def __init__(self, window_duration_ms: int):
+    # Expired slots are physically dropped once the dead prefix reaches this
+    # size and makes up at least half of the storage.
+    _COMPACT_MIN = 1024
+
+    def __init__(self, window_duration_ms: int, aggregate: Optional[AggregateOp] = None):
         """
         Initializes the sliding window.
         
         Args:
             window_duration_ms: The duration of the window in milliseconds.
+            aggregate: Optional aggregate to maintain over the window data.
         """
         if window_duration_ms <= 0:
             raise ValueError("Window duration must be positive.")
             
         self.window_duration_ms = window_duration_ms
-        self._data: Deque[Tuple[int, Any]] = deque()
+        # Entries in arrival order, stored column-wise; live rows are [head, len)
+        self._ts: array = array("q")
+        self._data: List[Any] = []
+        self._head: int = 0
+        # Two-Stacks aggregate state: _agg_front holds suffix aggregates of
+        # the entries moved over at the last flip (top = all of those still
+        # in the window), _agg_back aggregates everything added since then
+        self._aggregate = aggregate
+        self._agg_front: List[Any] = []
+        self._agg_back: Any = aggregate.identity if aggregate is not None else None
 
     def add(self, timestamp: int, data: Any):
         """
@@ -31,11 +128,19 @@ class SlidingWindow:
         It is assumed that timestamps are monotonically increasing.
         
         Args:
-            timestamp: The Unix timestamp (s, ms, us, or ns).
+            timestamp: The Unix timestamp (s, ms, us, or ns). Float timestamps
+                are accepted; fractional milliseconds are truncated.
             data: The data point to store.
         """
         ts_ms = normalize_timestamp_to_ms(timestamp)
-        self._data.append((ts_ms, data))
+        if type(ts_ms) is not int:
+            # Timestamps are stored in an int64 column
+            ts_ms = int(ts_ms)
+        self._ts.append(ts_ms)
+        self._data.append(data)
+        op = self._aggregate
+        if op is not None:
+            self._agg_back = op.combine(self._agg_back, op.lift(data))
         self._cleanup(ts_ms)
 
     def get_window_data(self) -> List[Tuple[int, Any]]:
@@ -47,35 +152,82 @@ class SlidingWindow:
         Returns:
             A list of (timestamp_ms, data) tuples.
         """
-        if not self._data:
+        if self._head == len(self._ts):
             return []
             
-        latest_timestamp = self._data[-1][0]
-        self._cleanup(latest_timestamp)
-        
-        return list(self._data)
+        self._cleanup(self._ts[-1])
+        head = self._head
+        return list(zip(self._ts[head:], self._data[head:]))
 
     def _cleanup(self, current_timestamp_ms: int):
         """
-        Removes expired data points from the left of the deque.
+        Removes expired data points from the front of the window.
         """
-        if not self._data:
+        head = self._head
+        # Timestamps are non-decreasing, so the expired prefix is found by bisection
+        stop = bisect_left(self._ts, current_timestamp_ms - self.window_duration_ms, head)
+        if stop == head:
             return
-            
-        cutoff_time = current_timestamp_ms - self.window_duration_ms
-        
-        while self._data and self._data[0][0] < cutoff_time:
-            self._data.popleft()
+        if self._aggregate is not None:
+            self._evict_aggregate(stop - head)
+        self._head = stop
+        self._compact()
+
+    def _compact(self):
+        """Drop the expired prefix once it dominates the storage."""
+        head = self._head
+        if head == len(self._ts):
+            del self._ts[:], self._data[:]
+            self._head = 0
+        elif head >= self._COMPACT_MIN and 2 * head >= len(self._ts):
+            del self._ts[:head], self._data[:head]
+            self._head = 0
+
+    def _evict_aggregate(self, count: int):
+        """
+        Drops the `count` oldest entries from the aggregate state (amortized
+        O(1) per entry).
+
+        When the front stack runs empty, every entry still in the window is
+        moved onto it with suffix aggregates computed newest to oldest.
+        """
+        op = self._aggregate
+        front = self._agg_front
+        head = self._head
+        while count:
+            if not front:
+                acc = op.identity
+                for data in reversed(self._data[head:]):
+                    acc = op.combine(op.lift(data), acc)
+                    front.append(acc)
+                self._agg_back = op.identity
+            n = min(count, len(front))
+            del front[-n:]
+            head += n
+            count -= n
+
+    def query(self) -> Any:
+        """
+        Returns the aggregate over the current window contents.
+
+        Raises:
+            ValueError: If the window was created without an aggregate.
+        """
+        op = self._aggregate
+        if op is None:
+            raise ValueError("SlidingWindow was created without an aggregate.")
+        front = self._agg_front[-1] if self._agg_front else op.identity
+        return op.lower(op.combine(front, self._agg_back))
             
     def __len__(self) -> int:
         """Returns the number of items currently in the window."""
-        return len(self._data)
+        return len(self._ts) - self._head
 
     def get_latest(self) -> Any:
         """Returns the most recently added data point, or None if empty."""
-        if not self._data:
+        if self._head == len(self._ts):
             return None
-        return self._data[-1][1]
+        return self._data[-1]
 
     def purge(self, window_end_timestamp_ms: int):
         """
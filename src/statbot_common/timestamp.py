@@ -1,4 +1,7 @@
 import logging
+from itertools import repeat
+from operator import floordiv, mul
+from typing import Iterable, List
 
 def normalize_timestamp_to_ms(ts: int) -> int:
     """
@@ -12,6 +15,19 @@ def normalize_timestamp_to_ms(ts: int) -> int:
     Returns:
         The timestamp normalized to milliseconds.
     """
+    # Fast path: non-negative ints are classified by magnitude, which matches
+    # the digit count without formatting the value. Millisecond timestamps,
+    # the common case on hot paths, are checked first.
+    if type(ts) is int and ts >= 0:
+        if 10**10 <= ts < 10**13:  # 11-13 digits: milliseconds
+            return ts
+        if ts < 10**10:  # Up to 10 digits: seconds
+            return ts * 1000
+        if ts < 10**16:  # 14-16 digits: microseconds
+            return ts // 1000
+        if ts < 10**19:  # 17-19 digits: nanoseconds
+            return ts // 1_000_000
+
     num_digits = len(str(ts))
 
     if num_digits <= 10:  # Assumed to be seconds
@@ -24,4 +40,36 @@ def normalize_timestamp_to_ms(ts: int) -> int:
         return ts // 1_000_000
     else:
         logging.warning(f"Timestamp {ts} has an unexpected number of digits ({num_digits}). Assuming milliseconds.")
-        return ts 
\ No newline at end of file
+        return ts
+
+
+def normalize_timestamps_to_ms(timestamps: Iterable[int]) -> List[int]:
+    """
+    Normalizes a sequence of timestamps to milliseconds.
+
+    Equivalent to applying normalize_timestamp_to_ms to each element. When
+    all timestamps are non-negative ints of the same unit (the usual case
+    for a single feed), the unit is inferred once from the minimum and
+    maximum and the conversion runs as one C-level map.
+
+    Args:
+        timestamps: The timestamps to normalize.
+
+    Returns:
+        A list of the timestamps normalized to milliseconds.
+    """
+    ts = list(timestamps)
+    if ts and set(map(type, ts)) == {int}:
+        lo, hi = min(ts), max(ts)
+        if lo >= 0:
+            if 10**10 <= lo and hi < 10**13:  # Milliseconds
+                return ts
+            if hi < 10**10:  # Seconds
+                return list(map(mul, ts, repeat(1000)))
+            if 10**13 <= lo and hi < 10**16:  # Microseconds
+                return list(map(floordiv, ts, repeat(1000)))
+            if 10**16 <= lo and hi < 10**19:  # Nanoseconds
+                return list(map(floordiv, ts, repeat(1_000_000)))
+
+    # Mixed units or non-int values: classify each timestamp
+    return list(map(normalize_timestamp_to_ms, ts))
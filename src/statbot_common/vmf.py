@@ -1,8 +1,9 @@
 import math
 import logging
-from typing import List, Tuple, Optional, Deque
 from collections import deque
-from .timestamp import normalize_timestamp_to_ms
+from operator import sub
+from typing import Deque, List, Tuple, Optional
+from .timestamp import normalize_timestamp_to_ms, normalize_timestamps_to_ms
 from .protocols import Trade
 
 
@@ -36,62 +37,62 @@ def compute_vmf(
         logging.error("VMF calc: smoothing_period_trades must be positive.")
         return None
     
-    # Step 1: Aggregate trades with same timestamp and extract valid trade data
-    aggregated_trades = {}
+    # Step 1: Extract valid trade data. The tuple timestamp is only used for
+    # window management; calculations use the trade's own timestamp.
+    raw_timestamps = []
+    raw_quantities = []
     for ts, trade_data in data_points:
         if not hasattr(trade_data, 'timestamp') or not hasattr(trade_data, 'quantity'):
             logging.warning("VMF calc: Trade object missing 'timestamp' or 'quantity' attribute. Skipping entry.")
             continue
             
         try:
-            # Normalize timestamp from the tuple (for window management) 
-            # but use the trade's own timestamp for calculations
-            normalized_ts = normalize_timestamp_to_ms(trade_data.timestamp)
+            timestamp = trade_data.timestamp
+            # Coerce anything but int/float here, so a malformed timestamp
+            # skips its entry instead of failing the batch normalization
+            if type(timestamp) is not int and not isinstance(timestamp, float):
+                timestamp = int(timestamp)
             quantity = float(trade_data.quantity)
-            
-            if normalized_ts in aggregated_trades:
-                aggregated_trades[normalized_ts] += quantity
-            else:
-                aggregated_trades[normalized_ts] = quantity
-                
         except (ValueError, TypeError) as e:
             logging.warning(f"VMF calc: Could not process trade data: {e}. Skipping entry.")
             continue
+        raw_timestamps.append(timestamp)
+        raw_quantities.append(quantity)
+
+    # Normalize all timestamps in one pass, then aggregate trades with the
+    # same timestamp
+    aggregated_trades = {}
+    for normalized_ts, quantity in zip(normalize_timestamps_to_ms(raw_timestamps), raw_quantities):
+        aggregated_trades[normalized_ts] = aggregated_trades.get(normalized_ts, 0.0) + quantity
     
     if len(aggregated_trades) < 2:
         logging.debug("VMF calc: Not enough valid trades after aggregation and filtering.")
         return None
     
-    # Step 2: Sort by timestamp and calculate instantaneous velocities
+    # Step 2: Sort by timestamp and calculate instantaneous velocities.
+    # Timestamps are unique after aggregation, so every time delta is positive.
     sorted_trades = sorted(aggregated_trades.items())
-    velocities = []
-    
-    for i in range(1, len(sorted_trades)):
-        ts_prev, _ = sorted_trades[i-1]
-        ts_curr, quantity_curr = sorted_trades[i]
-        
-        time_diff_ms = ts_curr - ts_prev
-        if time_diff_ms == 0:
-            logging.debug(f"VMF calc: Zero time delta ({time_diff_ms} ms). Skipping.")
-        elif time_diff_ms < 0:
-            logging.warning(f"VMF calc: Negative time delta ({time_diff_ms} ms). Skipping.")
-        else:
-            # Convert to seconds for velocity calculation
-            time_diff_s = time_diff_ms / 1000.0
-            velocity = quantity_curr / time_diff_s
-            velocities.append(velocity)
+    timestamps = [ts for ts, _ in sorted_trades]
+    quantities = [quantity for _, quantity in sorted_trades]
+    velocities = [
+        # Convert to seconds for velocity calculation
+        quantity / (time_diff_ms / 1000.0)
+        for quantity, time_diff_ms in zip(quantities[1:], map(sub, timestamps[1:], timestamps))
+    ]
     
     if len(velocities) < smoothing_period_trades:
         logging.debug(f"VMF calc: Not enough velocities ({len(velocities)} < {smoothing_period_trades}).")
         return None
     
-    # Step 3: Calculate smoothed velocities (VMF_raw values)
-    vmf_raw_values = []
-    for i in range(smoothing_period_trades - 1, len(velocities)):
-        # Take the last N velocities for smoothing
-        velocity_window = velocities[i - smoothing_period_trades + 1:i + 1]
-        vmf_raw = sum(velocity_window) / len(velocity_window)
-        vmf_raw_values.append(vmf_raw)
+    # Step 3: Calculate smoothed velocities (VMF_raw values) as a rolling mean
+    # of the last N velocities. The window sum is slid in O(1) per step; adding
+    # the difference (incoming - outgoing) keeps a constant series exact.
+    n = smoothing_period_trades
+    window_sum = sum(velocities[:n])
+    vmf_raw_values = [window_sum / n]
+    for v_in, v_out in zip(velocities[n:], velocities):
+        window_sum += v_in - v_out
+        vmf_raw_values.append(window_sum / n)
     
     if len(vmf_raw_values) < smoothing_period_trades:
         logging.debug(f"VMF calc: Not enough VMF_raw values ({len(vmf_raw_values)} < {smoothing_period_trades}).")
@@ -127,4 +128,144 @@ def compute_vmf(
         return vmf_normalized
     except (ValueError, ZeroDivisionError) as e:
         logging.error(f"VMF calc: Error calculating normalized VMF: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+class VmfCalculator:
+    """
+    Streaming VMF over a trade stream, updated in O(1) per trade.
+
+    Fed the same trades, get_vmf() matches compute_vmf over everything added
+    so far (or over the last `normalization_period` VMF_raw values, if set).
+    Trades sharing a timestamp are aggregated; the latest timestamp group is
+    still open, so its velocity is included provisionally until a later
+    trade closes it.
+
+    The N-velocity window sum is slid exactly as in compute_vmf. The moments
+    of the VMF_raw values are kept as running sums of (x - K) and (x - K)^2,
+    shifted by the first value K so the variance does not suffer
+    catastrophic cancellation.
+    """
+
+    def __init__(self, smoothing_period_trades: int = 20, normalization_period: Optional[int] = None):
+        if smoothing_period_trades <= 0:
+            raise ValueError("smoothing_period_trades must be positive")
+        if normalization_period is not None and normalization_period <= 0:
+            raise ValueError("normalization_period must be positive")
+        self.smoothing_period_trades = smoothing_period_trades
+        self.normalization_period = normalization_period
+        self._n_trades = 0
+        # Open timestamp group and the timestamp of the group before it
+        self._open_ts: Optional[int] = None
+        self._open_qty = 0.0
+        self._prev_ts: Optional[int] = None
+        # Last N closed velocities and their sum
+        self._velocities: Deque[float] = deque(maxlen=smoothing_period_trades)
+        self._window_sum = 0.0
+        # Count and latest of the closed VMF_raw values in the normalization
+        # window, and their shifted sums. The values themselves are only kept
+        # when the window is bounded, for eviction.
+        self._raw_count = 0
+        self._last_raw: Optional[float] = None
+        self._raw: Optional[Deque[float]] = (
+            None if normalization_period is None else deque(maxlen=normalization_period)
+        )
+        self._shift: Optional[float] = None
+        self._raw_sum = 0.0
+        self._raw_sum_sq = 0.0
+        self._n_velocities = 0
+
+    def add_trade(self, timestamp: int, quantity: float) -> None:
+        """Add a trade; trades must arrive in non-decreasing timestamp order."""
+        ts = normalize_timestamp_to_ms(timestamp)
+        if self._open_ts is not None and ts < self._open_ts:
+            logging.warning(f"VMF calc: Out-of-order trade at {ts} < {self._open_ts}. Skipping.")
+            return
+        self._n_trades += 1
+        if ts == self._open_ts:
+            self._open_qty += float(quantity)
+            return
+        if self._open_ts is not None:
+            self._close_group()
+        self._open_ts = ts
+        self._open_qty = float(quantity)
+
+    def _open_velocity(self) -> Optional[float]:
+        """Velocity of the open group, or None before two groups exist."""
+        if self._prev_ts is None:
+            return None
+        return self._open_qty / ((self._open_ts - self._prev_ts) / 1000.0)
+
+    def _close_group(self) -> None:
+        velocity = self._open_velocity()
+        self._prev_ts = self._open_ts
+        if velocity is None:
+            return
+        velocities = self._velocities
+        if len(velocities) == self.smoothing_period_trades:
+            self._window_sum += velocity - velocities[0]
+        else:
+            self._window_sum += velocity
+        velocities.append(velocity)
+        self._n_velocities += 1
+        if len(velocities) == self.smoothing_period_trades:
+            self._push_raw(self._window_sum / self.smoothing_period_trades)
+
+    def _push_raw(self, raw: float) -> None:
+        if self._shift is None:
+            self._shift = raw
+        if self._raw is not None:
+            if self._raw_count == self.normalization_period:
+                evicted = self._raw[0] - self._shift
+                self._raw_sum -= evicted
+                self._raw_sum_sq -= evicted * evicted
+                self._raw_count -= 1
+            self._raw.append(raw)
+        self._raw_count += 1
+        self._last_raw = raw
+        shifted = raw - self._shift
+        self._raw_sum += shifted
+        self._raw_sum_sq += shifted * shifted
+
+    def get_vmf(self) -> Optional[float]:
+        """Return the normalized VMF for the trades added so far, or None."""
+        n = self.smoothing_period_trades
+        if self._n_trades < 2 * n:
+            return None
+
+        # Include the open group's velocity provisionally
+        raw_sum, raw_sum_sq, count = self._raw_sum, self._raw_sum_sq, self._raw_count
+        latest_raw = self._last_raw
+        n_velocities = self._n_velocities
+        velocity = self._open_velocity()
+        if velocity is not None:
+            n_velocities += 1
+            velocities = self._velocities
+            window_sum = None
+            if len(velocities) == n:
+                window_sum = self._window_sum + (velocity - velocities[0])
+            elif len(velocities) == n - 1:
+                window_sum = self._window_sum + velocity
+            if window_sum is not None:
+                latest_raw = window_sum / n
+                shift = latest_raw if self._shift is None else self._shift
+                if self._raw is not None and count == self.normalization_period:
+                    evicted = self._raw[0] - shift
+                    raw_sum -= evicted
+                    raw_sum_sq -= evicted * evicted
+                    count -= 1
+                shifted = latest_raw - shift
+                raw_sum += shifted
+                raw_sum_sq += shifted * shifted
+                count += 1
+
+        if n_velocities < n or count < n:
+            return None
+
+        shift = self._shift if self._shift is not None else latest_raw
+        mean_vmf_raw = shift + raw_sum / count
+        variance = max((raw_sum_sq - raw_sum * raw_sum / count) / count, 0.0)
+        std_vmf_raw = math.sqrt(variance)
+        if math.isclose(std_vmf_raw, 0.0, abs_tol=1e-12):
+            return 0.0
+        return (latest_raw - mean_vmf_raw) / std_vmf_raw
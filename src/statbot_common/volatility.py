@@ -1,11 +1,14 @@
 import math
 import logging
+from itertools import compress
+from operator import itemgetter, mul, sub
 from typing import List, Tuple, Optional
-from .timestamp import normalize_timestamp_to_ms
+from .timestamp import normalize_timestamps_to_ms
 from .protocols import HasLogPrice
 
 def compute_volatility(
     data_points: List[Tuple[int, HasLogPrice]],
+    presorted: bool = False,
 ) -> Optional[float]:
     """
     Compute volatility from a list of (timestamp, data) tuples.
@@ -25,6 +28,9 @@ def compute_volatility(
                      Unix timestamp (s, ms, us, or ns) and an object
                      with a 'log_price' attribute (the log of the price,
                      or log-odds, or any log-transformed coordinate).
+        presorted: Set when the data points are known to be in timestamp
+                   order (e.g. SlidingWindow.get_window_data()) to skip the
+                   ordering check.
 
     Returns:
         The calculated volatility per minute, or None if computation is not possible.
@@ -33,63 +39,65 @@ def compute_volatility(
         logging.debug("Volatility calc: Not enough data points (< 2).")
         return None
 
-    # Extract log-prices and normalize timestamps
-    log_price_data = []
+    # Extract log-prices; timestamps are normalized afterwards in one pass
+    raw_timestamps = []
+    log_prices = []
     for ts, data in data_points:
         if hasattr(data, 'log_price'):
             try:
-                log_price_data.append(
-                    (normalize_timestamp_to_ms(ts), float(data.log_price))
-                )
+                log_price = float(data.log_price)
             except (ValueError, TypeError):
                 logging.warning(f"Could not process log_price: {data.log_price}. Skipping entry.")
+                continue
+            # Coerce anything but int/float here, so a malformed timestamp
+            # skips its entry instead of failing the batch normalization
+            if type(ts) is not int and not isinstance(ts, float):
+                try:
+                    ts = int(ts)
+                except (ValueError, TypeError):
+                    logging.warning(f"Could not process timestamp: {ts!r}. Skipping entry.")
+                    continue
+            log_prices.append(log_price)
+            raw_timestamps.append(ts)
         else:
             logging.warning(f"Data object missing 'log_price' attribute. Skipping entry.")
 
 
-    if len(log_price_data) < 2:
+    if len(log_prices) < 2:
         logging.debug("Volatility calc: Not enough valid data points after filtering.")
         return None
 
 
-    # Ensure data is sorted by timestamp, as it may not be guaranteed.
-    sorted_data = sorted(log_price_data, key=lambda x: x[0])
-
-    delta_values = []
-    delta_times_minutes = []
-
-    for i in range(len(sorted_data) - 1):
-        ts_curr, val_curr = sorted_data[i]
-        ts_next, val_next = sorted_data[i + 1]
-
-        delta_value = val_next - val_curr
-        delta_time_ms = ts_next - ts_curr
-        
-        # Convert time delta from milliseconds to minutes
-        delta_time_min = delta_time_ms / 60000.0
-
-        if delta_time_min == 0:
-            logging.debug(
-                f"Volatility calc: Zero time delta ({delta_time_min} min) "
-                f"between point {i} ({ts_curr}) and {i + 1} ({ts_next}). Skipping."
-            )
-        elif delta_time_min < 0:
-            logging.warning(
-                f"Volatility calc: Negative time delta ({delta_time_min} min) "
-                f"between point {i} ({ts_curr}) and {i + 1} ({ts_next}). Skipping."
-            )
-        else:
-            delta_values.append(delta_value)
-            delta_times_minutes.append(delta_time_min)
-
-    if not delta_values or not delta_times_minutes:
+    timestamps = normalize_timestamps_to_ms(raw_timestamps)
+    values = log_prices
+
+    # Consecutive differences, computed pairwise at C level
+    delta_times_ms = list(map(sub, timestamps[1:], timestamps))
+    # Ensure data is sorted by timestamp, as it may not be guaranteed. Data
+    # in order (the common case) shows no negative time delta and is not
+    # sorted.
+    if not presorted and min(delta_times_ms) < 0:
+        sorted_data = sorted(zip(timestamps, values), key=itemgetter(0))
+        timestamps = [ts for ts, _ in sorted_data]
+        values = [val for _, val in sorted_data]
+        delta_times_ms = list(map(sub, timestamps[1:], timestamps))
+    delta_values = list(map(sub, values[1:], values))
+
+    # Zero time deltas (duplicate timestamps) are skipped
+    if 0 in delta_times_ms:
+        logging.debug(
+            "Volatility calc: Skipping %d zero time deltas.", delta_times_ms.count(0)
+        )
+        delta_values = list(compress(delta_values, delta_times_ms))
+
+    if not delta_values:
         logging.debug("Volatility calc: No valid time intervals found.")
         return None
 
     # Sum of squared log returns
-    numerator = sum(dv**2 for dv in delta_values)
-    # Total time duration in minutes
-    denominator = sum(delta_times_minutes)
+    numerator = sum(map(mul, delta_values, delta_values))
+    # Total time duration in minutes, from the exact integer total in ms
+    denominator = sum(delta_times_ms) / 60000.0
 
     if denominator > 0:
         try:
@@ -10,6 +10,12 @@ Tests cover:
 - State save/restore
 """
 
+import dataclasses
+import io
+import json
+import pickle
+import random
+
 import pytest
 from typing import NamedTuple
 from decimal import Decimal
@@ -507,6 +513,154 @@ class TestSideConditionalVariants:
         assert float(metrics['sell']['V']) == pytest.approx(50.0)
         assert float(metrics['sell']['avci']) == pytest.approx(0.5)
 
+    def test_taker_on_both_sides_combined(self):
+        """Test that combined volume merges a taker's buy and sell fills.
+
+        Manual calculation:
+            Fills: A buys 30, A sells 20, B sells 50
+            combined: v_A = 30 + 20 = 50, v_B = 50, V = 100
+            Σ_2 = 50² + 50² = 5000, AVCI = 0.5, N = 2
+            buy: v_A = 30 -> AVCI = 1.0, N = 1
+            sell: v_A = 20, v_B = 50, V = 70
+            Σ_2 = 400 + 2500 = 2900, AVCI = 2900 / 4900
+        """
+        config = avci.AvciConfig(window_ms=10000)
+        calc = avci.AvciCalculator(config)
+
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=30))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="A", side=-1, qty=20))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1200, taker_order_id="B", side=-1, qty=50))
+
+        metrics = calc.get_metrics()
+
+        assert metrics['combined']['N'] == 2
+        assert float(metrics['combined']['V']) == pytest.approx(100.0)
+        assert float(metrics['combined']['avci']) == pytest.approx(0.5)
+
+        assert metrics['buy']['N'] == 1
+        assert float(metrics['buy']['avci']) == pytest.approx(1.0)
+
+        assert metrics['sell']['N'] == 2
+        assert float(metrics['sell']['avci']) == pytest.approx(2900.0 / 4900.0)
+
+    def test_metrics_cache_invalidation(self):
+        """Test that cached metrics are reused between polls and refreshed on change."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=50))
+
+        first = calc.get_metrics()
+        second = calc.get_metrics()
+        assert first is second
+        assert first['buy'] is second['buy']
+        assert first['combined'] is second['combined']
+        with pytest.raises(TypeError):
+            first['buy'] = None
+
+        # Evicting nothing keeps the cached result
+        calc.evict_to(BASE_TS + 1000)
+        assert calc.get_metrics() is first
+
+        # A buy-only change must refresh both buy and the derived combined view
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="B", side=1, qty=50))
+        third = calc.get_metrics()
+        assert third['buy']['N'] == 2
+        assert third['combined']['N'] == 2
+        assert third['sell'] is first['sell']
+
+        # Restoring an older state must not serve the newer cached result
+        state = calc.get_state()
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1200, taker_order_id="C", side=1, qty=50))
+        assert calc.get_metrics()['buy']['N'] == 3
+        calc.restore_from_state(state)
+        assert calc.get_metrics()['buy']['N'] == 2
+
+    def test_scalar_accessors(self):
+        """Test that the scalar accessors match get_metrics()."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        assert calc.avci_combined() is None
+        assert calc.volume() == 0.0
+
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=80))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="B", side=1, qty=20))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1200, taker_order_id="A", side=-1, qty=50))
+
+        metrics = calc.get_metrics()
+        assert calc.avci_combined() == metrics['combined'].avci
+        assert calc.avci_buy() == metrics['buy'].avci == pytest.approx(0.68)
+        assert calc.avci_sell() == metrics['sell'].avci == 1.0
+        assert calc.volume() == 150.0
+        assert calc.volume(1) == 100.0
+        assert calc.volume(-1) == 50.0
+        with pytest.raises(ValueError):
+            calc.volume(0)
+
+    def test_metrics_record_access(self):
+        """Test that AvciMetrics supports attribute, dict-style and pickled access."""
+
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=80))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="B", side=1, qty=20))
+
+        buy = calc.get_metrics()['buy']
+        assert isinstance(buy, avci.AvciMetrics)
+        assert buy.avci == buy['avci'] == pytest.approx(0.68)
+        assert buy.as_dict()['N'] == 2
+        assert pickle.loads(pickle.dumps(buy)) == buy
+
+        with pytest.raises(KeyError):
+            buy['missing']
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            buy.N = 5
+
+    def test_side_lookup_survives_restore(self):
+        """Test that fills after a restore land in the restored side buckets."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=10))
+        calc.restore_from_state(calc.get_state())
+
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="B", side=1.0, qty=10))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1200, taker_order_id="C", side=-1, qty=5))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1300, taker_order_id="D", side=0, qty=5))
+
+        metrics = calc.get_metrics()
+        assert metrics['buy']['V'] == 20.0
+        assert metrics['sell']['V'] == 5.0
+        assert metrics['combined']['N'] == 3
+
+    def test_zero_qty_fill_counts_taker_once(self):
+        """Test that a taker whose first fill has zero quantity is counted once."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=0))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="A", side=1, qty=10))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 1200, taker_order_id="B", side=1, qty=10))
+
+        assert calc.get_metrics()['buy']['N'] == 2
+
+    def test_add_fills_batch_matches_add_fill(self):
+        """Test that the columnar batch API matches per-fill ingestion."""
+        fills = [
+            MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=30),
+            MockFill(timestamp=BASE_TS + 1100, taker_order_id="B", side=-1, qty=20),
+            MockFill(timestamp=BASE_TS + 1200, taker_order_id="A", side=-1, qty=10),
+            MockFill(timestamp=BASE_TS + 1300, taker_order_id="C", side=1, qty=40),
+        ]
+        single = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        for f in fills:
+            single.add_fill(f)
+
+        batch = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        batch.add_fills(
+            [f.timestamp for f in fills],
+            [f.taker_order_id for f in fills],
+            [f.side for f in fills],
+            [f.qty for f in fills],
+        )
+
+        assert batch.get_metrics() == single.get_metrics()
+
+        with pytest.raises(ValueError):
+            batch.add_fills([BASE_TS], ["A"], [1], [])
+
     def test_no_sells_returns_none_for_sell(self):
         """Test that sell-only metrics return None when no sells exist."""
         config = avci.AvciConfig(window_ms=10000)
@@ -560,6 +714,165 @@ class TestStateManagement:
         assert metrics1['buy']['avci'] == metrics2['buy']['avci']
         assert metrics1['sell']['avci'] == metrics2['sell']['avci']
 
+    def test_state_json_round_trip(self):
+        """Test that state survives JSON serialization (int dict keys become str)."""
+
+        config = avci.AvciConfig(window_ms=10000)
+        calc1 = avci.AvciCalculator(config)
+        calc1.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=60))
+        calc1.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="B", side=-1, qty=40))
+
+        calc2 = avci.AvciCalculator(config)
+        calc2.restore_from_state(json.loads(json.dumps(calc1.get_state())))
+
+        # Continue the stream on both calculators with a known and a new taker
+        for calc in (calc1, calc2):
+            calc.add_fill(MockFill(timestamp=BASE_TS + 1200, taker_order_id="A", side=1, qty=20))
+            calc.add_fill(MockFill(timestamp=BASE_TS + 1300, taker_order_id="C", side=-1, qty=10))
+
+        assert calc1.get_metrics() == calc2.get_metrics()
+        assert calc2.get_metrics()['combined']['N'] == 3
+
+    def test_restore_row_wise_state(self):
+        """Test that states with row-wise fills and a vol_by_taker dict still restore."""
+
+        calc1 = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc1.add_fill(MockFill(timestamp=BASE_TS + 1000, taker_order_id="A", side=1, qty=60))
+        calc1.add_fill(MockFill(timestamp=BASE_TS + 1100, taker_order_id="B", side=1, qty=40))
+        calc1.add_fill(MockFill(timestamp=BASE_TS + 1200, taker_order_id="A", side=-1, qty=10))
+
+        state = json.loads(json.dumps(calc1.get_state()))
+        for side in ("buy", "sell"):
+            bucket = state[side]
+            bucket["fills"] = [
+                [ts, tid, str(qty)]
+                for ts, tid, qty in zip(bucket.pop("ts"), bucket.pop("tid"), bucket.pop("qty"))
+            ]
+            bucket["vol_by_taker"] = {
+                str(k): str(v) for k, v in zip(bucket.pop("takers"), bucket.pop("vols"))
+            }
+
+        calc2 = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc2.restore_from_state(state)
+        assert calc2.get_metrics() == calc1.get_metrics()
+        calc2.evict_to(BASE_TS + 11150)
+        assert calc2.get_metrics()['buy']['N'] == 0
+        assert calc2.get_metrics()['sell']['N'] == 1
+
+    def test_evict_on_read(self):
+        """Test that get_metrics evicts relative to the latest fill when configured."""
+
+        config = avci.AvciConfig(window_ms=1000, evict_on_read=True)
+        lazy = avci.AvciCalculator(config)
+        eager = avci.AvciCalculator(avci.AvciConfig(window_ms=1000))
+        for i in range(20):
+            side = 1 if i % 3 else -1
+            fill = MockFill(timestamp=BASE_TS + i * 150, taker_order_id=f"T{i % 4}", side=side, qty=i + 0.5)
+            lazy.add_fill(fill)
+            eager.add_fill(fill)
+            eager.evict_to(fill.timestamp)
+            # No explicit evict_to on the lazy calculator
+            assert lazy.get_metrics() == eager.get_metrics()
+
+        restored = avci.AvciCalculator(avci.AvciConfig(window_ms=1))
+        restored.restore_from_state(lazy.get_state())
+        assert restored.config == config
+        buf = io.BytesIO()
+        lazy.dump_binary(buf)
+        buf.seek(0)
+        restored.restore_from_binary(buf)
+        assert restored.config == config
+
+    def test_binary_round_trip(self):
+        """Test that binary state restores identical metrics and continues the stream."""
+
+        config = avci.AvciConfig(window_ms=1000)
+        calc1 = avci.AvciCalculator(config)
+        for i in range(20):
+            side = 1 if i % 3 else -1
+            calc1.add_fill(MockFill(timestamp=BASE_TS + i * 100, taker_order_id=f"T{i % 4}", side=side, qty=i + 0.5))
+        calc1.evict_to(BASE_TS + 1900)
+
+        buf = io.BytesIO()
+        calc1.dump_binary(buf)
+        buf.seek(0)
+        calc2 = avci.AvciCalculator(avci.AvciConfig(window_ms=1))
+        calc2.restore_from_binary(buf)
+
+        assert calc2.config.window_ms == 1000
+        assert calc2.get_metrics() == calc1.get_metrics()
+
+        for calc in (calc1, calc2):
+            calc.add_fill(MockFill(timestamp=BASE_TS + 2000, taker_order_id="T1", side=1, qty=3))
+            calc.add_fill(MockFill(timestamp=BASE_TS + 2100, taker_order_id="NEW", side=-1, qty=2))
+            calc.evict_to(BASE_TS + 2600)
+
+        assert calc2.get_metrics() == calc1.get_metrics()
+
+        with pytest.raises(ValueError):
+            calc2.restore_from_binary(io.BytesIO(buf.getvalue()[:-8]))
+        with pytest.raises(ValueError):
+            calc2.restore_from_binary(io.BytesIO(b"JUNK" + buf.getvalue()[4:]))
+
+    def test_taker_table_released_on_eviction(self):
+        """Test that taker ids no longer in the window are forgotten."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=1000))
+        for i in range(100):
+            calc.add_fill(MockFill(timestamp=BASE_TS + i * 100, taker_order_id=f"T{i}", side=1, qty=1))
+            calc.evict_to(BASE_TS + i * 100)
+
+        # Fills at t >= BASE+8900 remain: 11 takers
+        assert calc.get_metrics()['combined']['N'] == 11
+        assert len(calc.get_state()['taker_ids']) == 11
+
+    def test_taker_ids_keyed_as_given(self):
+        """Test that ids equal only as strings stay distinct takers, also after restore."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc.add_fill(MockFill(timestamp=BASE_TS, taker_order_id=1, side=1, qty=1))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 100, taker_order_id="1", side=1, qty=1))
+        metrics = calc.get_metrics()['buy']
+        assert metrics['N'] == 2
+        assert float(metrics['V']) == pytest.approx(2.0)
+
+        calc2 = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc2.restore_from_state(calc.get_state())
+        calc2.add_fill(MockFill(timestamp=BASE_TS + 200, taker_order_id=1, side=1, qty=1))
+        assert calc2.get_metrics()['buy']['N'] == 2
+
+        # The binary header stores ids as strings
+        buf = io.BytesIO()
+        calc.dump_binary(buf)
+        buf.seek(0)
+        calc3 = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc3.restore_from_binary(buf)
+        calc3.add_fill(MockFill(timestamp=BASE_TS + 200, taker_order_id="X", side=1, qty=1))
+        assert calc3.get_metrics()['buy']['N'] == 3
+
+    def test_restore_legacy_decimal_state(self):
+        """Test that state saved with Decimal strings restores into float math."""
+        legacy_bucket = {
+            "fills": [(BASE_TS + 1000, "A", "60.0"), (BASE_TS + 1100, "B", "40")],
+            "vol_by_taker": {"A": "60.0", "B": "40"},
+            "V": "100.0",
+            "sigma_2": "5200.00",
+            "N": 2,
+        }
+        state = {
+            "config": {"window_ms": 10000},
+            "combined": legacy_bucket,
+            "buy": legacy_bucket,
+            "sell": {},
+        }
+
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=10000))
+        calc.restore_from_state(state)
+
+        combined = calc.get_metrics()['combined']
+        assert isinstance(combined['avci'], float)
+        assert combined['N'] == 2
+        assert combined['V'] == pytest.approx(100.0)
+        assert combined['avci'] == pytest.approx(0.52)
+
     def test_config_validation_zero_window(self):
         """Test that zero window_ms raises ValueError."""
         with pytest.raises(ValueError):
@@ -572,6 +885,17 @@ class TestStateManagement:
             config = avci.AvciConfig(window_ms=-1000)
             avci.AvciCalculator(config)
 
+    def test_config_validated_on_construction(self):
+        """Test that AvciConfig validates itself and cannot be changed afterwards."""
+
+        with pytest.raises(ValueError):
+            avci.AvciConfig(window_ms=0)
+        config = avci.AvciConfig(window_ms=1000)
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.window_ms = 0
+        with pytest.raises(ValueError):
+            avci.AvciCalculator(config).restore_from_state({"config": {"window_ms": -5}})
+
 
 # =============================================================================
 # 6. Complex Integration Test
@@ -672,6 +996,129 @@ class TestIntegration:
         assert metrics['combined']['N'] == 0
         assert metrics['combined']['V'] == 0
 
+    def test_eviction_with_fractional_quantities(self):
+        """Test that a taker is removed even when float residue remains.
+
+        0.1 + 0.2 evicted in one batch leaves 0.30000000000000004 - 0.3 > 0
+        in naive float arithmetic; the taker must still drop out of N.
+        """
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=1000))
+
+        calc.add_fill(MockFill(timestamp=BASE_TS + 100, taker_order_id="A", side=1, qty=0.1))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 200, taker_order_id="A", side=1, qty=0.2))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 900, taker_order_id="B", side=1, qty=0.5))
+
+        calc.evict_to(BASE_TS + 1500)
+
+        combined = calc.get_metrics()['combined']
+        assert combined['N'] == 1
+        assert float(combined['V']) == pytest.approx(0.5)
+        assert float(combined['avci']) == pytest.approx(1.0)
+
+    def test_small_fills_under_large_total_do_not_drift(self):
+        """Test that V stays exact when small fills are added under a large fill."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=100000))
+        calc.add_fill(MockFill(timestamp=BASE_TS, taker_order_id="A", side=1, qty=1e8))
+        for i in range(1, 10001):
+            calc.add_fill(MockFill(timestamp=BASE_TS + i, taker_order_id="B", side=1, qty=0.1))
+
+        # Evict the large fill; only the 10000 * 0.1 fills remain
+        calc.evict_to(BASE_TS + 100001)
+
+        buy = calc.get_metrics()['buy']
+        assert buy['V'] == pytest.approx(1000.0, abs=1e-9)
+        assert buy['avci'] == pytest.approx(1.0, abs=1e-12)
+
+    def test_evict_to_ms_matches_evict_to(self):
+        """Test that evict_to_ms behaves like evict_to for millisecond input,
+        and that second-resolution fill timestamps are still normalized."""
+        calc_a = avci.AvciCalculator(avci.AvciConfig(window_ms=5000))
+        calc_b = avci.AvciCalculator(avci.AvciConfig(window_ms=5000))
+        for calc in (calc_a, calc_b):
+            # 10-digit timestamp in seconds -> BASE_TS + 1000 ms
+            calc.add_fill(MockFill(timestamp=1_700_000_001, taker_order_id="A", side=1, qty=50))
+            calc.add_fill(MockFill(timestamp=BASE_TS + 4000, taker_order_id="B", side=1, qty=50))
+
+        calc_a.evict_to(BASE_TS + 7000)
+        calc_b.evict_to_ms(BASE_TS + 7000)
+
+        assert calc_a.get_metrics() == calc_b.get_metrics()
+        assert calc_b.get_metrics()['combined']['N'] == 1
+        assert float(calc_b.get_metrics()['combined']['V']) == pytest.approx(50.0)
+
+    def test_long_stream_incremental_eviction(self):
+        """Test a long fill stream evicted in small steps against a brute-force recompute.
+
+        Exercises storage compaction: far more fills pass through the window
+        than it ever holds at once.
+        """
+        window_ms = 500
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=window_ms))
+        takers = ["A", "B", "C", "D", "E"]
+        fills = []
+
+        for i in range(5000):
+            ts = BASE_TS + i * 10
+            fill = MockFill(timestamp=ts, taker_order_id=takers[(i * 7) % 5],
+                            side=1 if i % 3 else -1, qty=1 + (i % 4))
+            fills.append(fill)
+            calc.add_fill(fill)
+            calc.evict_to(ts)
+
+        cutoff = fills[-1].timestamp - window_ms
+        vols = {}
+        for f in fills:
+            if f.timestamp >= cutoff:
+                vols[f.taker_order_id] = vols.get(f.taker_order_id, 0) + f.qty
+        V = sum(vols.values())
+        expected_avci = sum(v * v for v in vols.values()) / (V * V)
+
+        combined = calc.get_metrics()['combined']
+        assert combined['N'] == len(vols)
+        assert float(combined['V']) == pytest.approx(V)
+        assert float(combined['avci']) == pytest.approx(expected_avci)
+
+    def test_recompute_matches_incremental(self):
+        """Test that metrics recomputed from the live fills match the running totals."""
+
+        rng = random.Random(5)
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=2000))
+        ts = BASE_TS
+        for _ in range(500):
+            ts += rng.randint(0, 120)
+            calc.add_fill(MockFill(
+                timestamp=ts,
+                taker_order_id=f"T{rng.randint(0, 12)}",
+                side=rng.choice((1, -1)),
+                qty=rng.randint(1, 1000) / 10,
+            ))
+            calc.evict_to(ts)
+
+        incremental = calc.get_metrics()
+        recomputed = calc.recompute_metrics()
+        for key in ("combined", "buy", "sell"):
+            assert recomputed[key].N == incremental[key].N
+            assert recomputed[key].V == pytest.approx(incremental[key].V, rel=1e-12)
+            assert recomputed[key].avci == pytest.approx(incremental[key].avci, rel=1e-12)
+
+    def test_small_live_fill_keeps_taker_after_large_eviction(self):
+        """Test that a taker with live fills stays counted however small they are."""
+        calc = avci.AvciCalculator(avci.AvciConfig(window_ms=1000))
+        calc.add_fill(MockFill(timestamp=BASE_TS, taker_order_id="T1", side=1, qty=1e6))
+        calc.add_fill(MockFill(timestamp=BASE_TS + 500, taker_order_id="T1", side=1, qty=1e-4))
+
+        calc.evict_to(BASE_TS + 1200)
+        buy = calc.get_metrics()['buy']
+        recomputed = calc.recompute_metrics()['buy']
+        assert buy.N == recomputed.N == 1
+        assert buy.V == pytest.approx(recomputed.V, rel=1e-6)
+        assert recomputed.V == pytest.approx(1e-4)
+
+        # Evicting the remaining fill releases the taker cleanly
+        calc.evict_to(BASE_TS + 1600)
+        assert calc.get_metrics()['buy'].N == 0
+        assert calc.get_metrics()['buy'].V == 0.0
+
 
 # =============================================================================
 # 7. Normalized AVCI Tests
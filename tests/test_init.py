@@ -0,0 +1,33 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import statbot_common
+
+
+def test_all_public_names_resolve():
+    """Test that every name in __all__ is importable from the package."""
+    for name in statbot_common.__all__:
+        assert getattr(statbot_common, name) is not None
+
+
+def test_unknown_name_raises_attribute_error():
+    """Test that unknown attributes still raise AttributeError."""
+    with pytest.raises(AttributeError):
+        statbot_common.does_not_exist
+
+
+def test_submodules_load_lazily():
+    """Test that importing one name does not import unrelated submodules."""
+    code = (
+        "import sys\n"
+        "from statbot_common import SlidingWindow\n"
+        "assert 'statbot_common.sliding_window' in sys.modules\n"
+        "assert 'statbot_common.markout_skew' not in sys.modules\n"
+        "assert 'statbot_common.avci' not in sys.modules\n"
+    )
+    src_dir = os.path.dirname(os.path.dirname(statbot_common.__file__))
+    env = dict(os.environ, PYTHONPATH=src_dir)
+    subprocess.run([sys.executable, "-c", code], check=True, env=env)
@@ -11,18 +11,22 @@ the specification in markout.md. Tests cover:
 - Edge cases and NaN handling (§7)
 """
 
+import json
+import logging
 import pytest
 import math
 from typing import NamedTuple, List
-from unittest.mock import patch
 from statbot_common import (
     MarkoutSkewCalculator, 
     MarkoutObservation, 
     MarkoutConfig,
     coalesce_l3_trades_by_timestamp,
     compute_mid_price,
-    validate_l2_consistency
+    compute_mid_prices,
+    validate_l2_consistency,
+    validate_l2_consistency_batch
 )
+from statbot_common.markout_skew import _MarkoutBuffer
 
 
 class MockL3Trade(NamedTuple):
@@ -34,6 +38,15 @@ class MockL3Trade(NamedTuple):
     side: str = None  # Optional for Trade protocol compatibility
 
 
+@pytest.fixture(scope="class")
+def shared_calculator(request):
+    """One calculator per test class built from its CONFIG; reset before every test.
+
+    Only for classes that never restore states into self.calculator.
+    """
+    return MarkoutSkewCalculator(request.cls.CONFIG)
+
+
 class TestUtilityFunctions:
     """Test utility functions for markout skew calculations."""
     
@@ -42,6 +55,15 @@ class TestUtilityFunctions:
         assert compute_mid_price(100.0, 102.0) == 101.0
         assert compute_mid_price(99.5, 100.5) == 100.0
         assert compute_mid_price(0.0, 10.0) == 5.0
+
+    def test_compute_mid_prices(self):
+        """Test that the batch mid-price matches the scalar one exactly."""
+        bids = [100.0, 99.5, 0.0, 100.1]
+        asks = [102.0, 100.5, 10.0, 100.3]
+        assert compute_mid_prices(bids, asks) == [101.0, 100.0, 5.0, compute_mid_price(100.1, 100.3)]
+        assert compute_mid_prices([], []) == []
+        with pytest.raises(ValueError):
+            compute_mid_prices([100.0, 99.5], [102.0])
     
     def test_coalesce_l3_trades_by_timestamp(self):
         """Test L3 trade coalescing by timestamp."""
@@ -67,30 +89,63 @@ class TestUtilityFunctions:
         assert len(buy_trades_t1000) == 2  # Two buy trades at t=1000
         assert len(sell_trades_t1000) == 1  # One sell trade at t=1000
     
-    @patch('statbot_common.markout_skew.logging')
-    def test_validate_l2_consistency_warning(self, mock_logging):
-        """Test L2 consistency validation and warning."""
-        # Should warn when coalesced L3 trades but L2 updates != 1
-        result = validate_l2_consistency(1000, l3_trades_count=2, l2_updates_count=0)
-        assert result is False
-        mock_logging.warning.assert_called_once()
-        
-        mock_logging.reset_mock()
-        
-        result = validate_l2_consistency(1000, l3_trades_count=2, l2_updates_count=2)
-        assert result is False
-        mock_logging.warning.assert_called_once()
+    def test_coalesce_merges_raw_timestamps_in_same_ms(self):
+        """Test that distinct raw timestamps normalizing to the same ms share a group."""
+        trades = [
+            MockL3Trade(timestamp=1700000000000123, quantity=1, price=101.0, aggressor_sign=1),  # us
+            MockL3Trade(timestamp=1700000000000456, quantity=2, price=101.0, aggressor_sign=-1),
+            MockL3Trade(timestamp=1700000000000, quantity=3, price=101.0, aggressor_sign=1),  # ms
+        ]
         
-        # Should not warn when consistent
-        mock_logging.reset_mock()
-        result = validate_l2_consistency(1000, l3_trades_count=2, l2_updates_count=1)
-        assert result is True
-        mock_logging.warning.assert_not_called()
+        coalesced = coalesce_l3_trades_by_timestamp(trades)
         
-        # Should not warn when no L3 trades
-        result = validate_l2_consistency(1000, l3_trades_count=0, l2_updates_count=5)
-        assert result is True
-        mock_logging.warning.assert_not_called()
+        assert list(coalesced) == [1700000000000]
+        assert [t.quantity for t in coalesced[1700000000000]] == [1, 2, 3]
+    
+    def test_validate_l2_consistency_warning(self, caplog):
+        """Test L2 consistency validation and warning."""
+        with caplog.at_level(logging.WARNING):
+            # Should warn when coalesced L3 trades but L2 updates != 1
+            result = validate_l2_consistency(1000, l3_trades_count=2, l2_updates_count=0)
+            assert result is False
+            assert len(caplog.records) == 1
+            assert "t=1000" in caplog.records[0].getMessage()
+            
+            caplog.clear()
+            result = validate_l2_consistency(1000, l3_trades_count=2, l2_updates_count=2)
+            assert result is False
+            assert len(caplog.records) == 1
+            
+            # Should not warn when consistent
+            caplog.clear()
+            result = validate_l2_consistency(1000, l3_trades_count=2, l2_updates_count=1)
+            assert result is True
+            assert caplog.records == []
+            
+            # Should not warn when no L3 trades
+            result = validate_l2_consistency(1000, l3_trades_count=0, l2_updates_count=5)
+            assert result is True
+            assert caplog.records == []
+
+    def test_validate_l2_consistency_batch(self, caplog):
+        """Test that the batch validation matches the scalar one and warns per bad timestamp."""
+        timestamps = [1000, 2000, 3000, 4000]
+        l3_counts = [2, 2, 2, 0]
+        l2_counts = [0, 2, 1, 5]
+        with caplog.at_level(logging.WARNING):
+            results = validate_l2_consistency_batch(timestamps, l3_counts, l2_counts)
+            assert results == [False, False, True, True]
+            assert [record.getMessage() for record in caplog.records] == [
+                "WARN markout_skew: expected combined L2 update at t=1000 "
+                "for coalesced L3 prints; observed 0 L2 updates",
+                "WARN markout_skew: expected combined L2 update at t=2000 "
+                "for coalesced L3 prints; observed 2 L2 updates",
+            ]
+
+            caplog.clear()
+            assert validate_l2_consistency_batch([1000], [2], [1]) == [True]
+            assert validate_l2_consistency_batch([], [], []) == []
+            assert caplog.records == []
 
 
 class TestMarkoutConfig:
@@ -130,18 +185,30 @@ class TestMarkoutConfig:
             config = MarkoutConfig(horizon_type="event", window_ms=30000)
             MarkoutSkewCalculator(config)
 
+    def test_invalid_precision(self):
+        """Test that an unknown storage precision is rejected."""
+        with pytest.raises(ValueError, match="Unsupported precision"):
+            MarkoutSkewCalculator(MarkoutConfig(horizon_type="clock", tau_ms=1000, precision="f16"))
+
 
 class TestMarkoutSkewCalculatorClockTime:
     """Test markout skew calculator with clock-time horizons."""
     
-    def setup_method(self):
+    CONFIG = MarkoutConfig(
+        horizon_type="clock",
+        tau_ms=1000,  # 1 second horizon
+        window_ms=5000  # 5 second window
+    )
+
+    @pytest.fixture(autouse=True)
+    def reset_calculator(self, shared_calculator):
         """Set up test fixtures."""
-        self.config = MarkoutConfig(
-            horizon_type="clock",
-            tau_ms=1000,  # 1 second horizon
-            window_ms=5000  # 5 second window
-        )
-        self.calculator = MarkoutSkewCalculator(self.config)
+        # reset() keeps the config, so a test that restored a different one
+        # into the shared calculator would leak it into later tests
+        assert shared_calculator.config == self.CONFIG
+        shared_calculator.reset()
+        self.config = self.CONFIG
+        self.calculator = shared_calculator
     
     def test_add_coalesced_trades_single_side(self):
         """Test adding coalesced trades with single side."""
@@ -172,8 +239,9 @@ class TestMarkoutSkewCalculatorClockTime:
         
         assert len(observations) == 2  # Both buy and sell sides
         
-        buy_obs = next(obs for obs in observations if obs.side == 1)
-        sell_obs = next(obs for obs in observations if obs.side == -1)
+        # Buy observation comes first, then sell
+        buy_obs, sell_obs = observations
+        assert (buy_obs.side, sell_obs.side) == (1, -1)
         
         # Both should have same start time and pre-trade mid
         assert buy_obs.start_time_ms == sell_obs.start_time_ms == 1700000000000
@@ -198,7 +266,7 @@ class TestMarkoutSkewCalculatorClockTime:
         for obs in completed:
             assert obs.markout is not None
             expected_markout = 101.2 - 100.5  # current_mid - pre_trade_mid
-            assert obs.markout == pytest.approx(expected_markout)
+            assert obs.markout == pytest.approx(expected_markout, abs=1e-12, rel=0)
     
     def test_complete_horizons_partial(self):
         """Test completing only some horizons."""
@@ -215,6 +283,21 @@ class TestMarkoutSkewCalculatorClockTime:
         assert len(completed) == 1  # Only first observation completed
         assert len(self.calculator.pending_observations) == 1  # One still pending
     
+    def test_clock_horizons_complete_in_horizon_order(self):
+        """Test that out-of-order inputs still complete by horizon time."""
+        for ts, mid in [(1700000002000, 102.0), (1700000000000, 100.0), (1700000001000, 101.0)]:
+            trades = [MockL3Trade(timestamp=ts, quantity=1, price=mid, aggressor_sign=1)]
+            self.calculator.add_coalesced_l3_trades(ts, trades, pre_trade_mid=mid)
+
+        assert [obs.start_time_ms for obs in self.calculator.pending_observations] == [
+            1700000000000, 1700000001000, 1700000002000
+        ]
+
+        completed = self.calculator.complete_horizons_clock_time(1700000002000, current_mid=103.0)
+
+        assert [obs.start_time_ms for obs in completed] == [1700000000000, 1700000001000]
+        assert [obs.start_time_ms for obs in self.calculator.pending_observations] == [1700000002000]
+    
     def test_markout_skew_calculation_basic(self):
         """Test basic markout skew calculation."""
         # Use proper 13-digit millisecond timestamps
@@ -235,9 +318,9 @@ class TestMarkoutSkewCalculatorClockTime:
         
         assert skew_data['n_buys'] == 1
         assert skew_data['n_sells'] == 1
-        assert skew_data['mplus'] == pytest.approx(101.0 - 100.5)  # Buy markout
-        assert skew_data['mminus'] == pytest.approx(100.5 - 100.8)  # Sell markout
-        assert skew_data['skew'] == pytest.approx(skew_data['mplus'] - skew_data['mminus'])
+        assert skew_data['mplus'] == pytest.approx(101.0 - 100.5, abs=1e-12, rel=0)  # Buy markout
+        assert skew_data['mminus'] == pytest.approx(100.5 - 100.8, abs=1e-12, rel=0)  # Sell markout
+        assert skew_data['skew'] == pytest.approx(skew_data['mplus'] - skew_data['mminus'], abs=1e-12, rel=0)
     
     def test_markout_skew_zero_counts(self):
         """Test markout skew with zero counts (NaN handling)."""
@@ -262,7 +345,7 @@ class TestMarkoutSkewCalculatorClockTime:
         
         assert skew_data['n_buys'] == 1
         assert skew_data['n_sells'] == 0
-        assert skew_data['mplus'] == pytest.approx(101.2 - 100.5)
+        assert skew_data['mplus'] == pytest.approx(101.2 - 100.5, abs=1e-12, rel=0)
         assert skew_data['mminus'] is None
         assert skew_data['skew'] is None  # Can't compute skew with only one side
     
@@ -283,18 +366,132 @@ class TestMarkoutSkewCalculatorClockTime:
         skew_data = self.calculator.get_markout_skew(1700000008000)
         assert skew_data['n_buys'] == 0
 
+    def test_running_means_track_window_contents(self):
+        """Test that means stay equal to a recomputation as the window slides."""
+        base = 1700000000000
+        completed = []
+        for i in range(20):
+            side = 1 if i % 3 else -1
+            trades = [MockL3Trade(timestamp=base + i * 1000, quantity=1, price=100.0, aggressor_sign=side)]
+            self.calculator.add_coalesced_l3_trades(base + i * 1000, trades, pre_trade_mid=100.0 + 0.1 * i)
+            completed += self.calculator.complete_horizons_clock_time(base + i * 1000, current_mid=100.0 + 0.07 * i)
+
+        now = base + 19000
+        skew_data = self.calculator.get_markout_skew(now)
+        in_window = [obs for obs in completed if obs.horizon_time_ms >= now - self.config.window_ms]
+        buys = [obs.markout for obs in in_window if obs.side == 1]
+        sells = [obs.markout for obs in in_window if obs.side == -1]
+
+        assert skew_data['n_buys'] == len(buys)
+        assert skew_data['n_sells'] == len(sells)
+        assert skew_data['mplus'] == pytest.approx(sum(buys) / len(buys))
+        assert skew_data['mminus'] == pytest.approx(sum(sells) / len(sells))
+
+    def test_batch_ingest_matches_per_group_calls(self):
+        """Test that batch ingest schedules the same observations as per-group calls."""
+        base = 1700000000000
+        groups = [(base, 100.0, True, False), (base + 500, 100.5, True, True), (base + 900, 101.0, False, True)]
+        batch_calculator = MarkoutSkewCalculator(self.config)
+        batch_calculator.add_coalesced_l3_trades_batch(
+            [g[0] for g in groups], [g[1] for g in groups], [g[2] for g in groups], [g[3] for g in groups]
+        )
+        for ts, mid, buy, sell in groups:
+            trades = ([MockL3Trade(timestamp=ts, quantity=1, price=mid, aggressor_sign=1)] if buy else []) + \
+                     ([MockL3Trade(timestamp=ts, quantity=1, price=mid, aggressor_sign=-1)] if sell else [])
+            self.calculator.add_coalesced_l3_trades(ts, trades, pre_trade_mid=mid)
+
+        assert batch_calculator.pending_observations == self.calculator.pending_observations
+        batch_calculator.complete_horizons_clock_time(base + 2000, current_mid=101.0)
+        self.calculator.complete_horizons_clock_time(base + 2000, current_mid=101.0)
+        assert batch_calculator.get_markout_skew(base + 2000) == self.calculator.get_markout_skew(base + 2000)
+
+    def test_window_wraps_and_grows(self, monkeypatch):
+        """Test that the ring buffer keeps completion order across wraparound and growth."""
+        monkeypatch.setattr(_MarkoutBuffer, '_INITIAL_CAPACITY', 4)
+        calculator = MarkoutSkewCalculator(self.config)
+        base = 1700000000000
+        completed = []
+        for i in range(40):
+            # Bursts of 1-3 groups per second make the live window size vary
+            for j in range(i % 3 + 1):
+                ts = base + i * 1000 + j
+                side = 1 if (i + j) % 2 else -1
+                trades = [MockL3Trade(timestamp=ts, quantity=1, price=100.0, aggressor_sign=side)]
+                calculator.add_coalesced_l3_trades(ts, trades, pre_trade_mid=100.0 + 0.01 * i)
+            completed += calculator.complete_horizons_clock_time(base + i * 1000 + 2, current_mid=100.0 + 0.02 * i)
+
+        now = base + 39002
+        in_window = [obs for obs in completed if obs.horizon_time_ms >= now - self.config.window_ms]
+        # More live observations than the initial capacity, so the buffer grew
+        assert len(in_window) > 4
+        assert calculator.get_state()['completed']['horizon_time_ms'] == [obs.horizon_time_ms for obs in in_window]
+        skew_data = calculator.get_markout_skew(now)
+        buys = [obs.markout for obs in in_window if obs.side == 1]
+        assert skew_data['n_buys'] == len(buys)
+        assert skew_data['mplus'] == pytest.approx(sum(buys) / len(buys))
+
+    def test_batch_completion_sums_sides_separately(self):
+        """Test that a small sell markout survives a huge buy markout completed alongside it."""
+        base = 1700000000000
+        buy = [MockL3Trade(timestamp=base, quantity=1, price=1.0, aggressor_sign=1)]
+        sell = [MockL3Trade(timestamp=base + 1, quantity=1, price=1.0, aggressor_sign=-1)]
+        self.calculator.add_coalesced_l3_trades(base, buy, pre_trade_mid=-1e16)
+        self.calculator.add_coalesced_l3_trades(base + 1, sell, pre_trade_mid=-1.0)
+
+        skew = self.calculator.tick(base + 2000, current_mid=0.0)
+        assert skew['mplus'] == 1e16
+        assert skew['mminus'] == 1.0
+
+    def test_float32_precision_matches_float64(self):
+        """Test that f32 storage tracks the f64 side-conditional means."""
+        calculators = [
+            MarkoutSkewCalculator(self.config._replace(precision=precision)) for precision in ("f32", "f64")
+        ]
+        base = 1700000000000
+        for i in range(30):
+            ts = base + i * 400
+            trades = [MockL3Trade(timestamp=ts, quantity=1, price=100.0, aggressor_sign=1 if i % 2 else -1)]
+            for calculator in calculators:
+                calculator.add_coalesced_l3_trades(ts, trades, pre_trade_mid=100.0 + 0.013 * i)
+                calculator.complete_horizons_clock_time(ts, current_mid=100.0 + 0.017 * i)
+
+        f32_skew, f64_skew = (calculator.get_markout_skew(base + 12000) for calculator in calculators)
+        assert f32_skew['n_buys'] == f64_skew['n_buys']
+        assert f32_skew['mplus'] == pytest.approx(f64_skew['mplus'], abs=1e-5)
+        assert f32_skew['mminus'] == pytest.approx(f64_skew['mminus'], abs=1e-5)
+
+    def test_tick_matches_complete_then_skew(self):
+        """Test that tick gives the same result as completing and then querying."""
+        reference = MarkoutSkewCalculator(self.config)
+        base = 1700000000000
+        for i in range(12):
+            ts = base + i * 700
+            trades = [MockL3Trade(timestamp=ts, quantity=1, price=100.0, aggressor_sign=1 if i % 3 else -1)]
+            for calculator in (self.calculator, reference):
+                calculator.add_coalesced_l3_trades(ts, trades, pre_trade_mid=100.0 + 0.05 * i)
+            mid = 100.0 + 0.04 * i
+            reference.complete_horizons_clock_time(ts, current_mid=mid)
+            assert self.calculator.tick(ts, current_mid=mid) == reference.get_markout_skew(ts)
+
 
 class TestMarkoutSkewCalculatorEventTime:
     """Test markout skew calculator with event-time horizons."""
     
-    def setup_method(self):
+    CONFIG = MarkoutConfig(
+        horizon_type="event",
+        k_trades=3,  # 3-trade horizon
+        window_ms=10000  # 10 second window
+    )
+
+    @pytest.fixture(autouse=True)
+    def reset_calculator(self, shared_calculator):
         """Set up test fixtures."""
-        self.config = MarkoutConfig(
-            horizon_type="event",
-            k_trades=3,  # 3-trade horizon
-            window_ms=10000  # 10 second window
-        )
-        self.calculator = MarkoutSkewCalculator(self.config)
+        # reset() keeps the config, so a test that restored a different one
+        # into the shared calculator would leak it into later tests
+        assert shared_calculator.config == self.CONFIG
+        shared_calculator.reset()
+        self.config = self.CONFIG
+        self.calculator = shared_calculator
     
     def test_add_trades_updates_counter(self):
         """Test that adding trades updates the trade counter."""
@@ -341,8 +538,10 @@ class TestMarkoutSkewCalculatorEventTime:
         
         # First observation (target=3) and two from second batch (target=4) should be completed
         assert len(completed) == 3  # Three observations completed when counter reaches 4
-        # Check that first observation is from the first batch
-        first_obs = next(obs for obs in completed if obs.start_time_ms == 1000000)  # Normalized timestamp
+        # Completion is in insertion order, so the first batch comes first
+        first_obs = completed[0]
+        assert first_obs.start_time_ms == 1000000  # Normalized timestamp
+        assert [obs.side for obs in completed[1:]] == [1, -1]
         assert first_obs.horizon_time_ms == 3000  # Set to current time
         assert first_obs.markout == pytest.approx(103.0 - 100.5)
     
@@ -360,10 +559,11 @@ class TestMarkoutSkewCalculatorEventTime:
         target_indices = [idx for idx, _ in self.calculator.event_horizon_queue]
         assert all(idx == 3 for idx in target_indices)  # 0 + 3 = 3
         
-        # Add 3 more trades to complete horizons
-        for i in range(3):
-            trade = [MockL3Trade(timestamp=2000 + i * 100, quantity=25, price=102.0, aggressor_sign=1)]
-            self.calculator.add_coalesced_l3_trades(2000 + i * 100, trade, pre_trade_mid=101.0)
+        # Add 3 more single-buy trade groups in one batch to complete horizons
+        self.calculator.add_coalesced_l3_trades_batch(
+            [2000, 2100, 2200], [101.0] * 3, [True] * 3, [False] * 3, trade_counts=[1, 1, 1]
+        )
+        assert self.calculator.trade_counter == 5
         
         # Complete horizons
         completed = self.calculator.complete_horizons_event_time(2300, current_mid=102.5)
@@ -371,6 +571,59 @@ class TestMarkoutSkewCalculatorEventTime:
         # Both initial observations (target=3) plus one from added trades should be completed
         assert len(completed) == 3  # Three observations completed
 
+    def test_event_horizons_complete_in_fifo_order(self):
+        """Test that only reached horizons leave the queue, oldest first."""
+        for i in range(6):
+            trade = [MockL3Trade(timestamp=1000 + i * 100, quantity=1, price=101.0, aggressor_sign=1)]
+            self.calculator.add_coalesced_l3_trades(1000 + i * 100, trade, pre_trade_mid=100.0 + i)
+
+        # trade_counter is 6: targets 3..6 are reached, 7 and 8 are not
+        completed = self.calculator.complete_horizons_event_time(1500, current_mid=110.0)
+
+        assert [obs.pre_trade_mid for obs in completed] == [100.0, 101.0, 102.0, 103.0]
+        assert [idx for idx, _ in self.calculator.event_horizon_queue] == [7, 8]
+        assert [obs.pre_trade_mid for obs in self.calculator.pending_observations] == [104.0, 105.0]
+
+    def test_batch_ingest_counts_trades(self):
+        """Test that batch ingest advances the trade counter after each group."""
+        self.calculator.add_coalesced_l3_trades_batch(
+            [1000, 1100, 1200], [100.0, 101.0, 102.0], [True, False, True], [True, True, False], [2, 1, 4]
+        )
+
+        assert self.calculator.trade_counter == 7
+        assert [idx for idx, _ in self.calculator.event_horizon_queue] == [3, 3, 5, 6]
+        assert [obs.side for obs in self.calculator.pending_observations] == [1, -1, -1, 1]
+
+    def test_batch_ingest_requires_trade_counts(self):
+        """Test that event-time batch ingest rejects missing trade counts."""
+        with pytest.raises(ValueError):
+            self.calculator.add_coalesced_l3_trades_batch([1000], [100.0], [True], [False])
+
+    def test_batch_ingest_rejects_length_mismatch(self):
+        """Test that batch ingest refuses parallel sequences of different lengths."""
+        with pytest.raises(ValueError):
+            self.calculator.add_coalesced_l3_trades_batch(
+                [1000, 2000], [100.0], [True, True], [False, False], trade_counts=[1, 1]
+            )
+        with pytest.raises(ValueError):
+            self.calculator.add_coalesced_l3_trades_batch(
+                [1000, 2000], [100.0, 100.0], [True, True], [False, False], trade_counts=[1]
+            )
+        assert self.calculator.pending_observations == []
+        assert self.calculator.trade_counter == 0
+
+    def test_tick_completes_event_horizons(self):
+        """Test that tick completes reached event horizons before reading the skew."""
+        trades = [MockL3Trade(timestamp=1000, quantity=1, price=101.0, aggressor_sign=1)] * 3
+        self.calculator.add_coalesced_l3_trades(1000, trades, pre_trade_mid=100.5)
+        self.calculator.add_coalesced_l3_trades(1001, trades[:1], pre_trade_mid=100.7)
+
+        skew_data = self.calculator.tick(1001, current_mid=101.0)
+
+        assert skew_data['n_buys'] == 1
+        assert skew_data['mplus'] == pytest.approx(0.5)
+        assert len(self.calculator.pending_observations) == 1
+
 
 class TestMarkoutObservation:
     """Test MarkoutObservation data structure."""
@@ -406,12 +659,28 @@ class TestMarkoutObservation:
         assert completed_obs.start_time_ms == 1000  # Other fields unchanged
         assert obs.markout is None  # Original unchanged
 
+    def test_completion_updates_observation_in_place(self):
+        """Test that completing a horizon fills in the created observation."""
+        calculator = MarkoutSkewCalculator(MarkoutConfig(horizon_type="clock", tau_ms=1000, window_ms=5000))
+        trades = [MockL3Trade(timestamp=1700000000000, quantity=1, price=101.0, aggressor_sign=1)]
+        (created,) = calculator.add_coalesced_l3_trades(1700000000000, trades, pre_trade_mid=100.5)
+
+        (completed,) = calculator.complete_horizons_clock_time(1700000001000, current_mid=101.0)
+
+        assert completed is created
+        assert created.markout == pytest.approx(0.5)
+        assert tuple(created) == (1700000000000, 1700000001000, 1, 100.5, created.markout)
+
 
 class TestMarkoutSkewStateManagement:
     """Test state saving and restoration."""
     
     def setup_method(self):
-        """Set up test fixtures."""
+        """Set up test fixtures.
+        
+        Restores replace the calculator's config, so every test gets a fresh
+        calculator rather than the class-shared one.
+        """
         self.config = MarkoutConfig(
             horizon_type="clock",
             tau_ms=1000,
@@ -460,3 +729,150 @@ class TestMarkoutSkewStateManagement:
         # Verify event-time state restored
         assert new_calculator.trade_counter == 1
         assert len(new_calculator.event_horizon_queue) == 1
+
+    def test_long_stream_state_round_trip(self):
+        """Test a long sliding stream, then restore and continue on both calculators."""
+        base = 1700000000000
+        for i in range(3000):
+            side = 1 if i % 2 else -1
+            trades = [MockL3Trade(timestamp=base + i * 10, quantity=1, price=100.0, aggressor_sign=side)]
+            self.calculator.add_coalesced_l3_trades(base + i * 10, trades, pre_trade_mid=100.0 + (i % 7) * 0.01)
+            self.calculator.complete_horizons_clock_time(base + i * 10, current_mid=100.0 + (i % 5) * 0.01)
+
+        new_calculator = MarkoutSkewCalculator(self.config)
+        new_calculator.restore_from_state(self.calculator.get_state())
+
+        for calc in (self.calculator, new_calculator):
+            calc.complete_horizons_clock_time(base + 31000, current_mid=100.02)
+
+        original_skew = self.calculator.get_markout_skew(base + 31000)
+        restored_skew = new_calculator.get_markout_skew(base + 31000)
+        assert original_skew['n_buys'] + original_skew['n_sells'] == 500
+        assert restored_skew['n_buys'] == original_skew['n_buys']
+        assert restored_skew['n_sells'] == original_skew['n_sells']
+        assert restored_skew['mplus'] == pytest.approx(original_skew['mplus'])
+        assert restored_skew['mminus'] == pytest.approx(original_skew['mminus'])
+
+    def test_reset_clears_pending_and_completed(self):
+        """Test that reset leaves a calculator equivalent to a fresh one."""
+        trades = [MockL3Trade(timestamp=1700000000000, quantity=100, price=101.0, aggressor_sign=1)]
+        self.calculator.add_coalesced_l3_trades(1700000000000, trades, pre_trade_mid=100.5)
+        self.calculator.complete_horizons_clock_time(1700000001000, current_mid=101.0)
+        self.calculator.add_coalesced_l3_trades(1700000001500, trades, pre_trade_mid=101.0)
+
+        self.calculator.reset()
+
+        assert self.calculator.pending_observations == []
+        assert self.calculator.get_state() == MarkoutSkewCalculator(self.config).get_state()
+        # Earlier timestamps are accepted again after a reset
+        self.calculator.add_coalesced_l3_trades(1000, trades, pre_trade_mid=100.0)
+        assert len(self.calculator.pending_observations) == 1
+
+        event_calculator = MarkoutSkewCalculator(MarkoutConfig(horizon_type="event", k_trades=2))
+        event_calculator.add_coalesced_l3_trades(1000, trades, pre_trade_mid=100.0)
+        event_calculator.reset()
+        assert event_calculator.trade_counter == 0
+        assert len(event_calculator.event_horizon_queue) == 0
+
+    def test_restore_legacy_state(self):
+        """Test that states written before the version tag still restore."""
+        state = {
+            'config': self.config._asdict(),
+            'buy_window_data': [(1700000001000, {
+                'start_time_ms': 1700000000000, 'horizon_time_ms': 1700000001000,
+                'side': 1, 'pre_trade_mid': 100.5, 'markout': 0.5,
+            })],
+            'sell_window_data': [(1700000001500, {
+                'start_time_ms': 1700000000500, 'horizon_time_ms': 1700000001500,
+                'side': -1, 'pre_trade_mid': 100.8, 'markout': -0.3,
+            })],
+            'pending_observations': [{
+                'start_time_ms': 1700000001000, 'horizon_time_ms': 1700000002000,
+                'side': 1, 'pre_trade_mid': 101.0, 'markout': None,
+            }],
+            'trade_counter': 0,
+            'event_horizon_queue': [],
+        }
+
+        self.calculator.restore_from_state(state)
+
+        skew_data = self.calculator.get_markout_skew(1700000002000)
+        assert skew_data['n_buys'] == 1
+        assert skew_data['n_sells'] == 1
+        assert skew_data['mplus'] == pytest.approx(0.5)
+        assert skew_data['mminus'] == pytest.approx(-0.3)
+        assert len(self.calculator.pending_observations) == 1
+
+    def test_restore_legacy_state_with_observation_objects(self):
+        """Test that unversioned in-memory states holding observations still restore."""
+        state = {
+            'config': self.config._asdict(),
+            'buy_window_data': [(1700000001000, MarkoutObservation(1700000000000, 1700000001000, 1, 100.5, 0.5))],
+            'sell_window_data': [],
+            'pending_observations': [],
+        }
+
+        self.calculator.restore_from_state(state)
+
+        skew_data = self.calculator.get_markout_skew(1700000002000)
+        assert skew_data['n_buys'] == 1
+        assert skew_data['mplus'] == pytest.approx(0.5)
+
+    def test_state_json_round_trip(self):
+        """Test that the state survives JSON serialization."""
+        trades = [MockL3Trade(timestamp=1700000000000, quantity=100, price=101.0, aggressor_sign=1)]
+        self.calculator.add_coalesced_l3_trades(1700000000000, trades, pre_trade_mid=100.5)
+        self.calculator.complete_horizons_clock_time(1700000001000, current_mid=101.0)
+        self.calculator.add_coalesced_l3_trades(1700000001500, trades, pre_trade_mid=101.0)
+
+        new_calculator = MarkoutSkewCalculator(self.config)
+        new_calculator.restore_from_state(json.loads(json.dumps(self.calculator.get_state())))
+
+        assert new_calculator.pending_observations == self.calculator.pending_observations
+        assert new_calculator.get_markout_skew(1700000002000) == self.calculator.get_markout_skew(1700000002000)
+
+    def test_restore_switches_horizon_type(self):
+        """Test that restoring an event-time state into a clock calculator switches its horizon type."""
+        event_config = MarkoutConfig(horizon_type="event", k_trades=1, window_ms=5000)
+        event_calculator = MarkoutSkewCalculator(event_config)
+        assert type(event_calculator) is MarkoutSkewCalculator
+
+        trades = [MockL3Trade(timestamp=1000, quantity=100, price=101.0, aggressor_sign=1)]
+        event_calculator.add_coalesced_l3_trades(1000, trades, pre_trade_mid=100.5)
+
+        calculator = self.calculator
+        calculator.restore_from_state(event_calculator.get_state())
+        assert type(calculator) is MarkoutSkewCalculator
+        assert calculator.config == event_config
+
+        calculator.add_coalesced_l3_trades(2000, trades, pre_trade_mid=101.0)
+        completed = calculator.complete_horizons_event_time(2000, current_mid=101.0)
+        assert [obs.markout for obs in completed] == [pytest.approx(0.5), pytest.approx(0.0)]
+        assert calculator.complete_horizons_clock_time(10000, current_mid=101.0) == []
+
+    def test_subclass_works_and_survives_restore(self):
+        """Test that user subclasses construct normally and keep their type across restores."""
+        class CountingCalculator(MarkoutSkewCalculator):
+            def __init__(self, config):
+                self.ticks = 0
+                super().__init__(config)
+
+            def tick(self, current_time_ms, current_mid):
+                self.ticks += 1
+                return super().tick(current_time_ms, current_mid)
+
+        trades = [MockL3Trade(timestamp=1700000000000, quantity=100, price=101.0, aggressor_sign=1)]
+        calculator = CountingCalculator(self.config)
+        calculator.add_coalesced_l3_trades(1700000000000, trades, pre_trade_mid=100.5)
+        skew = calculator.tick(1700000001000, current_mid=101.0)
+        assert skew['mplus'] == pytest.approx(0.5)
+        assert calculator.ticks == 1
+
+        event_calculator = MarkoutSkewCalculator(MarkoutConfig(horizon_type="event", k_trades=1))
+        event_calculator.add_coalesced_l3_trades(1000, trades, pre_trade_mid=100.5)
+        calculator.restore_from_state(event_calculator.get_state())
+        assert type(calculator) is CountingCalculator
+        assert calculator.trade_counter == 1
+        calculator.add_coalesced_l3_trades(2000, trades, pre_trade_mid=101.0)
+        assert calculator.tick(2000, current_mid=101.0)['n_buys'] == 2
+        assert calculator.ticks == 2
@@ -1,3 +1,7 @@
+import dataclasses
+import json
+import random
+
 import pytest
 from decimal import Decimal
 
@@ -374,3 +378,364 @@ def test_calculator_config_validation():
     )
     with pytest.raises(ValueError):
         qi.QueueImbalanceCalculator(invalid_config)
+
+
+def test_calculator_config_is_frozen():
+    """Test that the config cannot change under the weights derived from it."""
+    config = qi.QueueImbalanceConfig(
+        k_levels=3,
+        tick_size=Decimal("0.01"),
+        half_life_ticks=Decimal("0.5"),
+        window_ms=10_000,
+    )
+    calc = qi.QueueImbalanceCalculator(config)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        config.k_levels = 5
+    assert calc.weights == [1.0, 0.25, 0.0625]
+
+
+def test_calculator_float_default_and_decimal_option():
+    """Test that QI is a float by default and an exact Decimal with use_decimal."""
+    base = 1_700_000_000_000
+    bids = {Decimal("100.00"): Decimal("0.1"), Decimal("99.99"): Decimal("0.2")}
+    asks = {Decimal("100.01"): Decimal("0.3")}
+    results = {}
+    for use_decimal in (False, True):
+        config = qi.QueueImbalanceConfig(
+            k_levels=3,
+            tick_size=Decimal("0.01"),
+            half_life_ticks=Decimal("1.0"),
+            window_ms=10_000,
+            use_decimal=use_decimal,
+        )
+        calc = qi.QueueImbalanceCalculator(config)
+        calc.update_from_book(base, Decimal("100.00"), Decimal("100.01"), bids, asks)
+        restored = qi.QueueImbalanceCalculator(config)
+        restored.restore_from_state(calc.get_state())
+        results[use_decimal] = restored.get_time_weighted_mean(base + 1000)
+
+    # QI = 0.1 + 0.5*0.2 - 0.3 = -0.1
+    assert isinstance(results[False], float)
+    assert results[False] == pytest.approx(-0.1)
+    assert results[True] == Decimal("-0.1")
+
+
+def test_tick_index_book_matches_decimal_book():
+    """Test that a tick-index keyed book gives the same grid and QI as a Decimal-keyed book."""
+    tick = Decimal("0.01")
+    bids = {Decimal("100.00"): Decimal("10"), Decimal("99.98"): Decimal("7")}
+    asks = {Decimal("100.01"): Decimal("4"), Decimal("100.03"): Decimal("6")}
+    tick_bids = {qi.price_to_tick(px, tick): float(sz) for px, sz in bids.items()}
+    tick_asks = {qi.price_to_tick(px, tick): float(sz) for px, sz in asks.items()}
+    best_bid_tick = qi.price_to_tick(Decimal("100.00"), tick)
+    best_ask_tick = qi.price_to_tick(Decimal("100.01"), tick)
+    assert (best_bid_tick, best_ask_tick) == (10000, 10001)
+
+    b_sizes, a_sizes = qi.sizes_on_tick_index_grid(best_bid_tick, best_ask_tick, 3, tick_bids, tick_asks)
+    assert b_sizes == [10.0, 0, 7.0]
+    assert a_sizes == [4.0, 0, 6.0]
+
+    config = qi.QueueImbalanceConfig(
+        k_levels=3, tick_size=tick, half_life_ticks=Decimal("1.0"), window_ms=10_000
+    )
+    base = 1_700_000_000_000
+    decimal_calc = qi.QueueImbalanceCalculator(config)
+    tick_calc = qi.QueueImbalanceCalculator(config)
+    expected = decimal_calc.update_from_book(base, Decimal("100.00"), Decimal("100.01"), bids, asks)
+    assert tick_calc.update_from_tick_book(base, best_bid_tick, best_ask_tick, tick_bids, tick_asks) == expected
+    assert tick_calc.update_from_tick_book(base + 1000, None, best_ask_tick, tick_bids, tick_asks) is None
+
+
+def test_decimal_mode_accepts_float_tick_book():
+    """Test that Decimal mode converts float tick-book sizes instead of raising TypeError."""
+    tick = Decimal("0.01")
+    bids = {Decimal("100.00"): Decimal("10.5"), Decimal("99.98"): Decimal("7.25")}
+    asks = {Decimal("100.01"): Decimal("4"), Decimal("100.03"): Decimal("6.75")}
+    config = qi.QueueImbalanceConfig(
+        k_levels=3, tick_size=tick, half_life_ticks=Decimal("1.0"), window_ms=10_000,
+        use_decimal=True,
+    )
+    base = 1_700_000_000_000
+    expected = qi.QueueImbalanceCalculator(config).update_from_book(
+        base, Decimal("100.00"), Decimal("100.01"), bids, asks
+    )
+    got = qi.QueueImbalanceCalculator(config).update_from_tick_book(
+        base, 10000, 10001, qi.tick_book_from_decimal(bids, tick), qi.tick_book_from_decimal(asks, tick)
+    )
+    assert isinstance(got, Decimal)
+    assert got == expected
+
+
+def test_time_weighted_mean_matches_recomputation(monkeypatch):
+    """Test that the windowed mean matches a direct recomputation over segments."""
+    # Compact pruned segments often so compaction is exercised too
+    monkeypatch.setattr(qi.QueueImbalanceCalculator, "_COMPACT_MIN", 4)
+
+    config = qi.QueueImbalanceConfig(
+        k_levels=1,
+        tick_size=Decimal("0.01"),
+        half_life_ticks=Decimal("1.0"),
+        window_ms=3_000,
+        use_decimal=True,
+    )
+    calc = qi.QueueImbalanceCalculator(config)
+    rng = random.Random(7)
+    base = 1_700_000_000_000
+    t = base
+    history = []  # (time, value) of each update
+    query_t = base
+    for _ in range(200):
+        t += rng.randint(1, 900)
+        size = Decimal(rng.randint(0, 3))
+        best_bid = None if rng.random() < 0.1 else Decimal("100.00")
+        value = calc.update_from_book(t, best_bid, Decimal("100.01"), {Decimal("100.00"): size}, {})
+        history.append((t, value))
+
+        # Query at the latest update time or a little later; pruning is
+        # destructive, so query times never go backwards
+        query_t = max(t + rng.choice([0, 0, 250]), query_t)
+        window_start = query_t - config.window_ms
+        num = Decimal(0)
+        den = 0
+        for (start, val), (end, _) in zip(history, history[1:] + [(query_t, None)]):
+            lo, hi = max(start, window_start), min(end, query_t)
+            if val is not None and hi > lo:
+                num += val * (hi - lo)
+                den += hi - lo
+        expected = num / den if den else None
+        assert calc.get_time_weighted_mean(query_t) == expected
+
+
+def test_float_mean_does_not_drift_after_large_values():
+    """Test that pruned large segments leave no roundoff in the float window mean."""
+    def config(use_decimal):
+        return qi.QueueImbalanceConfig(
+            k_levels=2, tick_size=Decimal("0.01"), half_life_ticks=Decimal("0.3"),
+            window_ms=5_000, use_decimal=use_decimal,
+        )
+
+    float_calc = qi.QueueImbalanceCalculator(config(False))
+    decimal_calc = qi.QueueImbalanceCalculator(config(True))
+    rng = random.Random(3)
+    t = 1_700_000_000_000
+    for i in range(400):
+        t += rng.randint(1, 500)
+        # QI around 1e8 first, then around 1 once the large values left the window
+        big = i < 200
+        size = Decimal(rng.randint(1, 10**8)) if big else Decimal(rng.randint(0, 2))
+        bids = {Decimal("100.00"): size, Decimal("99.99"): Decimal(rng.randint(0, 3))}
+        asks = {Decimal("100.01"): Decimal(rng.randint(0, 3))}
+        for calc in (float_calc, decimal_calc):
+            calc.update_from_book(t, Decimal("100.00"), Decimal("100.01"), bids, asks)
+        if not big:
+            exact = decimal_calc.get_time_weighted_mean(t)
+            got = float_calc.get_time_weighted_mean(t)
+            assert got == pytest.approx(float(exact), rel=1e-12, abs=1e-9)
+
+
+def test_float_weights_match_decimal_weights():
+    """Test that the calculator's float weights match the Decimal weights."""
+    for hl in ("0.5", "1.0", "2", "0.3"):
+        float_weights = qi._float_exponential_weights(8, Decimal(hl))
+        decimal_weights = qi.compute_exponential_weights(8, Decimal(hl))
+        assert float_weights == pytest.approx([float(w) for w in decimal_weights], rel=1e-14)
+    # Integer steps per tick are exact powers of two
+    assert qi._float_exponential_weights(4, Decimal("0.5")) == [1.0, 0.25, 0.0625, 0.015625]
+
+
+@pytest.mark.parametrize("use_decimal", [False, True])
+def test_book_delta_matches_full_book(use_decimal):
+    """Test that level-diff updates track the QI of the full book."""
+    rng = random.Random(7)
+    num = Decimal if use_decimal else float
+    config = qi.QueueImbalanceConfig(
+        k_levels=4,
+        tick_size=Decimal("0.01"),
+        half_life_ticks=Decimal("1.5"),
+        window_ms=10_000,
+        use_decimal=use_decimal,
+    )
+    base = 1_700_000_000_000
+    best_bid, best_ask = 1000, 1001
+    bids = {best_bid - i: num(rng.randint(1, 9)) for i in range(6)}
+    asks = {best_ask + i: num(rng.randint(1, 9)) for i in range(6)}
+
+    delta_calc = qi.QueueImbalanceCalculator(config)
+    full_calc = qi.QueueImbalanceCalculator(config)
+    delta_calc.update_from_tick_book(base, best_bid, best_ask, bids, asks)
+
+    for step in range(1, 50):
+        bid_diffs, ask_diffs = [], []
+        for book, diffs, best, sign in ((bids, bid_diffs, best_bid, -1), (asks, ask_diffs, best_ask, 1)):
+            # Offsets past k_levels are applied to the book but do not move QI
+            offset = rng.randrange(6)
+            tick = best + sign * offset
+            new_size = num(rng.randint(1, 9))
+            diffs.append((offset, new_size, book[tick]))
+            book[tick] = new_size
+        got = delta_calc.update_from_book_delta(base + step, bid_diffs, ask_diffs)
+        expected = full_calc.update_from_tick_book(base + step, best_bid, best_ask, bids, asks)
+        # Running sums round differently from the one-shot dot product
+        assert got == pytest.approx(expected, abs=num("1e-9"))
+
+    restored = qi.QueueImbalanceCalculator(config)
+    restored.restore_from_state(delta_calc.get_state())
+    assert restored.update_from_book_delta(base + 50, [(0, num(1), bids[best_bid])], []) == \
+        delta_calc.update_from_book_delta(base + 50, [(0, num(1), bids[best_bid])], [])
+
+
+@pytest.mark.parametrize("use_decimal", [False, True])
+def test_ema_mean_mode(use_decimal):
+    """Test the O(1) exponentially time-decayed mean."""
+    num = Decimal if use_decimal else float
+    config = qi.QueueImbalanceConfig(
+        k_levels=1,
+        tick_size=Decimal("0.01"),
+        half_life_ticks=Decimal("1.0"),
+        window_ms=10_000,
+        use_decimal=use_decimal,
+        mean_mode="ema",
+        ema_half_life_ms=1_000,
+    )
+    calc = qi.QueueImbalanceCalculator(config)
+    base = 1_700_000_000_000
+    assert calc.get_time_weighted_mean(base) is None
+
+    # QI = 3 held for one half-life, then QI = -1 for one half-life
+    calc.update_from_tick_book(base, 100, 101, {100: num(3)}, {})
+    assert calc.get_time_weighted_mean(base + 1_000) == pytest.approx(num(3))
+    calc.update_from_tick_book(base + 1_000, 100, 101, {}, {101: num(1)})
+    # Weights 1/4 (first, decayed) and 1/2 (second) over a total of 3/4
+    expected = (num("0.25") * 3 - num("0.5")) / num("0.75")
+    assert calc.get_time_weighted_mean(base + 2_000) == pytest.approx(expected)
+    assert calc._seg_head == len(calc._seg_end) == 0
+
+    # Undefined time decays the weights but leaves the mean unchanged
+    calc.update_from_tick_book(base + 2_000, None, 101, {}, {})
+    assert calc.get_time_weighted_mean(base + 5_000) == pytest.approx(expected)
+
+    restored = qi.QueueImbalanceCalculator(config)
+    restored.restore_from_state(calc.get_state())
+    assert restored.get_time_weighted_mean(base + 5_000) == calc.get_time_weighted_mean(base + 5_000)
+
+
+def test_ema_default_half_life_and_validation():
+    """Test the half-life derived from window_ms and mean_mode validation."""
+    config = qi.QueueImbalanceConfig(
+        k_levels=1, tick_size=Decimal("0.01"), half_life_ticks=Decimal("1.0"),
+        window_ms=10_000, mean_mode="ema",
+    )
+    calc = qi.QueueImbalanceCalculator(config)
+    # Values older than window_ms keep 1% of the weight
+    assert 0.5 ** (config.window_ms / calc.ema_half_life_ms) == pytest.approx(0.01)
+
+    with pytest.raises(ValueError):
+        qi.QueueImbalanceCalculator(qi.QueueImbalanceConfig(
+            k_levels=1, tick_size=Decimal("0.01"), half_life_ticks=Decimal("1.0"),
+            window_ms=10_000, mean_mode="median",
+        ))
+    with pytest.raises(ValueError):
+        qi.QueueImbalanceCalculator(qi.QueueImbalanceConfig(
+            k_levels=1, tick_size=Decimal("0.01"), half_life_ticks=Decimal("1.0"),
+            window_ms=10_000, mean_mode="ema", ema_half_life_ms=0,
+        ))
+
+
+@pytest.mark.parametrize("use_decimal", [False, True])
+def test_restore_from_legacy_segment_triples(use_decimal):
+    """Test that states with [start, end, value] segment triples still restore."""
+    config = qi.QueueImbalanceConfig(
+        k_levels=1,
+        tick_size=Decimal("0.01"),
+        half_life_ticks=Decimal("1.0"),
+        window_ms=10_000,
+        use_decimal=use_decimal,
+    )
+    calc = qi.QueueImbalanceCalculator(config)
+    base = 1_700_000_000_000
+    for i, size in enumerate([3, 1, 4, 1, 5]):
+        calc.update_from_tick_book(base + i * 1000, 100, 101, {100: size}, {101: 2})
+
+    state = json.loads(json.dumps(calc.get_state()))
+    legacy = dict(state)
+    legacy["segments"] = [
+        [s, e, str(v)] for s, e, v in zip(legacy.pop("seg_start"), legacy.pop("seg_end"), legacy.pop("seg_val"))
+    ]
+
+    expected = calc.get_time_weighted_mean(base + 6_000)
+    for saved in (state, legacy):
+        restored = qi.QueueImbalanceCalculator(config)
+        restored.restore_from_state(saved)
+        assert restored.get_time_weighted_mean(base + 6_000) == expected
+
+
+def test_float_tick_book_matches_decimal_within_tolerance():
+    """Test that float QI on a converted tick book matches Decimal QI to 1e-12 relative."""
+    rng = random.Random(11)
+    tick = Decimal("0.01")
+    k_levels = 10
+    base = 1_700_000_000_000
+    float_calc = qi.QueueImbalanceCalculator(qi.QueueImbalanceConfig(
+        k_levels=k_levels, tick_size=tick, half_life_ticks=Decimal("2.5"), window_ms=10_000,
+    ))
+    decimal_calc = qi.QueueImbalanceCalculator(qi.QueueImbalanceConfig(
+        k_levels=k_levels, tick_size=tick, half_life_ticks=Decimal("2.5"), window_ms=10_000,
+        use_decimal=True,
+    ))
+    for step in range(50):
+        best_bid = Decimal(rng.randint(9_000, 11_000)) * tick
+        best_ask = best_bid + tick * rng.randint(1, 3)
+        bids = {best_bid - tick * i: Decimal(rng.randint(1, 10**6)) / 1000 for i in range(12) if rng.random() < 0.8}
+        asks = {best_ask + tick * i: Decimal(rng.randint(1, 10**6)) / 1000 for i in range(12) if rng.random() < 0.8}
+
+        exact = decimal_calc.update_from_book(base + step, best_bid, best_ask, bids, asks)
+        got = float_calc.update_from_tick_book(
+            base + step,
+            qi.price_to_tick(best_bid, tick),
+            qi.price_to_tick(best_ask, tick),
+            qi.tick_book_from_decimal(bids, tick),
+            qi.tick_book_from_decimal(asks, tick),
+        )
+        scale = max(map(abs, list(bids.values()) + list(asks.values())))
+        assert abs(got - float(exact)) <= 1e-12 * float(scale)
+
+    with pytest.raises(ValueError):
+        qi.tick_book_from_decimal({}, Decimal("0"))
+
+
+def test_tiny_weight_levels_still_count():
+    """Test that deep levels with tiny weights still contribute to the float QI."""
+    def config(use_decimal):
+        return qi.QueueImbalanceConfig(
+            k_levels=10, tick_size=Decimal("1"), half_life_ticks=Decimal("0.1"),
+            window_ms=10_000, use_decimal=use_decimal,
+        )
+
+    # Only levels 6 ticks from the touch are populated; their weight is 2**-60
+    bids = {Decimal("94"): Decimal("5")}
+    asks = {Decimal("107"): Decimal("1")}
+    float_calc = qi.QueueImbalanceCalculator(config(False))
+    got = float_calc.update_from_book(1000, Decimal("100"), Decimal("101"), bids, asks)
+    assert got == 4 * 2.0 ** -60
+    exact = qi.QueueImbalanceCalculator(config(True)).update_from_book(
+        1000, Decimal("100"), Decimal("101"), bids, asks
+    )
+    assert got == pytest.approx(float(exact), rel=1e-12)
+
+    # Deep levels of a 40-level book agree with the exact Decimal result
+    def deep_config(use_decimal):
+        return qi.QueueImbalanceConfig(
+            k_levels=40, tick_size=Decimal("0.01"), half_life_ticks=Decimal("0.5"),
+            window_ms=10_000, use_decimal=use_decimal,
+        )
+
+    best_bid, best_ask = Decimal("100.00"), Decimal("100.01")
+    bids = {best_bid - Decimal("0.01") * i: Decimal(i + 1) for i in range(40)}
+    asks = {best_ask + Decimal("0.01") * i: Decimal(2 * i + 1) for i in range(40)}
+    exact = qi.QueueImbalanceCalculator(deep_config(True)).update_from_book(
+        1_700_000_000_000, best_bid, best_ask, bids, asks
+    )
+    got = qi.QueueImbalanceCalculator(deep_config(False)).update_from_book(
+        1_700_000_000_000, best_bid, best_ask, bids, asks
+    )
+    assert got == pytest.approx(float(exact), rel=1e-12)
@@ -1,5 +1,6 @@
 import pytest
-from statbot_common import SlidingWindow
+from operator import attrgetter
+from statbot_common import SlidingWindow, MeanOp, SumOp, compute_total_size
 from dataclasses import dataclass
 
 @dataclass
@@ -56,8 +57,10 @@ def test_get_window_data_pruning():
     """Test that get_window_data() correctly triggers pruning."""
     window = SlidingWindow(10000)
     # Manually add raw data to bypass the `add` method's normalization for this test
-    window._data.append((1678886401000, DataPoint(value="a"))) # Expired
-    window._data.append((1678886412000, DataPoint(value="b"))) # Not expired
+    window._ts.append(1678886401000)  # Expired
+    window._data.append(DataPoint(value="a"))
+    window._ts.append(1678886412000)  # Not expired
+    window._data.append(DataPoint(value="b"))
     
     # Calling get_window_data() should prune the expired item
     # because the latest timestamp is 1678886412000, making the cutoff 1678886402000.
@@ -84,6 +87,16 @@ def test_timestamp_normalization_in_window():
     assert data[1][1].value == "c"
     assert data[2][1].value == "d"
 
+def test_float_timestamp_is_stored():
+    """Test that float timestamps are accepted and stored as whole milliseconds."""
+    window = SlidingWindow(10000)
+    window.add(1700000000.5, DataPoint(value="a"))
+    data = window.get_window_data()
+    assert len(data) == 1
+    # "1700000000.5" has 12 characters, so it is read as milliseconds
+    assert data[0][0] == 1700000000
+    assert data[0][1].value == "a"
+
 def test_empty_window():
     """Test behavior with an empty window."""
     window = SlidingWindow(1000)
@@ -216,4 +229,77 @@ def test_purge_deterministic_behavior():
     assert len(data1_without_e) == len(data2)
     for i in range(len(data2)):
         assert data1_without_e[i][0] == data2[i][0]  # Same timestamps
-        assert data1_without_e[i][1].value == data2[i][1].value  # Same values 
\ No newline at end of file
+        assert data1_without_e[i][1].value == data2[i][1].value  # Same values 
+
+
+def test_mean_aggregate_tracks_window():
+    """Test that query() returns the mean of the values currently in the window."""
+    window = SlidingWindow(10000, aggregate=MeanOp())
+    assert window.query() is None
+
+    values = []
+    for i in range(50):
+        ts = 1678886400000 + i * 1000
+        window.add(ts, float(i % 7))
+        values.append((ts, float(i % 7)))
+        live = [v for t, v in values if t >= ts - 10000]
+        assert window.query() == pytest.approx(sum(live) / len(live))
+
+    window.purge(1678886400000 + 100000)
+    assert len(window) == 0
+    assert window.query() is None
+
+def test_non_invertible_aggregate():
+    """Test an aggregate without an inverse (max) across evictions."""
+    class MaxOp:
+        identity = float("-inf")
+        def lift(self, data):
+            return data
+        def combine(self, left, right):
+            return max(left, right)
+        def lower(self, aggregate):
+            return aggregate
+
+    window = SlidingWindow(3000, aggregate=MaxOp())
+    for i, v in enumerate([5.0, 1.0, 4.0, 2.0, 3.0, 0.0]):
+        window.add(1678886400000 + i * 1000, v)
+    # Window holds the last four points: 4, 2, 3, 0
+    assert window.query() == 4.0
+    window.purge(1678886400000 + 6000)
+    # Cutoff 1678886403000 drops the 4
+    assert window.query() == 3.0
+
+def test_query_without_aggregate_raises():
+    """Test that query() requires an aggregate."""
+    with pytest.raises(ValueError):
+        SlidingWindow(1000).query()
+
+def test_compaction_keeps_window_and_aggregate(monkeypatch):
+    """Test that dropping the expired prefix preserves contents and aggregate."""
+    monkeypatch.setattr(SlidingWindow, "_COMPACT_MIN", 4)
+    window = SlidingWindow(5000, aggregate=MeanOp())
+    base = 1678886400000
+    added = []
+    for i in range(60):
+        ts = base + i * 700 + (i % 3) * 100
+        window.add(ts, float(i % 7))
+        added.append((ts, float(i % 7)))
+        live = [(t, v) for t, v in added if t >= ts - 5000]
+        assert window.get_window_data() == live
+        assert window.query() == pytest.approx(sum(v for _, v in live) / len(live))
+    # The dead prefix was dropped rather than kept forever
+    assert len(window._ts) < len(added)
+
+def test_sum_aggregate_matches_total_size():
+    """Test that a SumOp over sizes tracks compute_total_size on the window."""
+    @dataclass
+    class Sized:
+        size: float
+
+    window = SlidingWindow(3000, aggregate=SumOp(attrgetter("size")))
+    assert window.query() == 0.0
+    for i, size in enumerate([1.5, 0.5, 2.0, 0.25, 3.0]):
+        window.add(1678886400000 + i * 1000, Sized(size))
+        assert window.query() == pytest.approx(compute_total_size(window.get_window_data()))
+    window.purge(1678886400000 + 100000)
+    assert window.query() == 0.0
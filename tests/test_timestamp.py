@@ -0,0 +1,39 @@
+import pytest
+from statbot_common import normalize_timestamp_to_ms, normalize_timestamps_to_ms
+
+def test_normalize_units_by_digit_count():
+    """Test seconds, milliseconds, microseconds and nanoseconds inputs."""
+    assert normalize_timestamp_to_ms(1700000000) == 1700000000000
+    assert normalize_timestamp_to_ms(1700000000123) == 1700000000123
+    assert normalize_timestamp_to_ms(1700000000123456) == 1700000000123
+    assert normalize_timestamp_to_ms(1700000000123456789) == 1700000000123
+
+def test_normalize_digit_boundaries():
+    """Test that the integer fast path matches the digit-count rules at each boundary."""
+    assert normalize_timestamp_to_ms(9_999_999_999) == 9_999_999_999_000  # 10 digits
+    assert normalize_timestamp_to_ms(10_000_000_000) == 10_000_000_000  # 11 digits
+    assert normalize_timestamp_to_ms(10**13 - 1) == 10**13 - 1  # 13 digits
+    assert normalize_timestamp_to_ms(10**13) == 10**10  # 14 digits
+    assert normalize_timestamp_to_ms(10**16) == 10**10  # 17 digits
+    assert normalize_timestamp_to_ms(10**19 - 1) == (10**19 - 1) // 1_000_000  # 19 digits
+
+def test_normalize_unexpected_digits_assumes_ms():
+    """Test that over-long timestamps are returned unchanged."""
+    assert normalize_timestamp_to_ms(10**19) == 10**19
+
+def test_normalize_negative_uses_digit_count():
+    """Test that negative inputs keep the string digit-count classification."""
+    assert normalize_timestamp_to_ms(-1000) == -1000000  # '-1000' has 5 characters
+
+@pytest.mark.parametrize("timestamps", [
+    [1700000000, 1700000001, 9_999_999_999],  # Seconds
+    [10**10, 1700000000123, 10**13 - 1],  # Milliseconds
+    [10**13, 1700000000123456],  # Microseconds
+    [10**16, 1700000000123456789, 10**19 - 1],  # Nanoseconds
+    [1700000000, 1700000000123, 1700000000123456],  # Mixed units
+    [10**19, -1000, 1700000000],  # Unexpected digits and negative
+    [],
+])
+def test_batch_normalize_matches_scalar(timestamps):
+    """Test that batch normalization matches element-wise normalization."""
+    assert normalize_timestamps_to_ms(timestamps) == [normalize_timestamp_to_ms(ts) for ts in timestamps]
@@ -1,7 +1,9 @@
 import unittest
 import math
+import random
+import tracemalloc
 from typing import NamedTuple
-from src.statbot_common.vmf import compute_vmf
+from src.statbot_common.vmf import compute_vmf, VmfCalculator
 
 
 class MockTrade(NamedTuple):
@@ -206,6 +208,20 @@ class TestVMF(unittest.TestCase):
         result = compute_vmf(trades, smoothing_period_trades=3)
         self.assertIsNotNone(result)
     
+    def test_malformed_timestamps_skipped(self):
+        """Test that trades with unusable timestamps are skipped, not fatal."""
+        valid = []
+        for i in range(1, 50):
+            timestamp = 1700000000000 + i * 1000
+            valid.append((timestamp, MockTrade(timestamp=timestamp, quantity=100.0 + i % 7)))
+        trades = list(valid)
+        trades.insert(10, (1700000010500, MockTrade(timestamp=None, quantity=100.0)))
+        trades.insert(20, (1700000020500, MockTrade(timestamp="not-a-time", quantity=100.0)))
+        
+        with self.assertLogs(level="WARNING"):
+            result = compute_vmf(trades, smoothing_period_trades=3)
+        self.assertEqual(result, compute_vmf(valid, smoothing_period_trades=3))
+    
     def test_zero_time_difference(self):
         """Test handling of zero time differences (edge case)."""
         trades = [
@@ -289,6 +305,99 @@ class TestVMF(unittest.TestCase):
         self.assertFalse(math.isnan(result))
         self.assertFalse(math.isinf(result))
 
+    
+    def test_rolling_mean_matches_direct_window_means(self):
+        """Test that the sliding window sum matches recomputing each window mean."""
+        rng = random.Random(11)
+        trades = []
+        timestamp = 1_700_000_000_000
+        for _ in range(300):
+            timestamp += rng.randint(1, 2000)
+            trades.append((timestamp, MockTrade(timestamp=timestamp, quantity=rng.uniform(0.1, 50.0))))
+        n = 7
+        
+        # Direct computation: mean of each window of n velocities
+        velocities = [
+            t.quantity / ((t.timestamp - prev.timestamp) / 1000.0)
+            for (_, prev), (_, t) in zip(trades, trades[1:])
+        ]
+        raw = [sum(velocities[i - n + 1:i + 1]) / n for i in range(n - 1, len(velocities))]
+        mean = sum(raw) / len(raw)
+        std = math.sqrt(sum((x - mean) ** 2 for x in raw) / len(raw))
+        
+        self.assertAlmostEqual(compute_vmf(trades, smoothing_period_trades=n), (raw[-1] - mean) / std, places=9)
+
+
+class TestVmfCalculator(unittest.TestCase):
+    """Test cases for the streaming VmfCalculator."""
+    
+    def test_matches_compute_vmf_after_every_trade(self):
+        """Test that the streaming value equals compute_vmf over the same trades."""
+        rng = random.Random(3)
+        for n in (1, 3, 7):
+            calculator = VmfCalculator(smoothing_period_trades=n)
+            trades = []
+            timestamp = 1_700_000_000_000
+            for _ in range(200):
+                timestamp += rng.choice([0, 0, 5, 100, 1000])  # Includes same-timestamp trades
+                quantity = rng.uniform(1.0, 10.0)
+                trades.append((timestamp, MockTrade(timestamp=timestamp, quantity=quantity)))
+                calculator.add_trade(timestamp, quantity)
+                
+                expected = compute_vmf(trades, smoothing_period_trades=n)
+                result = calculator.get_vmf()
+                if expected is None:
+                    self.assertIsNone(result)
+                else:
+                    self.assertAlmostEqual(result, expected, places=7)
+    
+    def test_constant_velocity_normalization(self):
+        """Test that constant velocity produces exactly zero."""
+        calculator = VmfCalculator(smoothing_period_trades=3)
+        for i in range(50):
+            calculator.add_trade(1000 + i * 1000, 100.0)
+        self.assertEqual(calculator.get_vmf(), 0.0)
+    
+    def test_normalization_period(self):
+        """Test normalization over only the most recent VMF_raw values.
+        
+        Velocities 200..800 with N = 3 give VMF_raw = [300, 400, 500, 600, 700];
+        normalizing over the last 3 gives μ = 600, σ = sqrt(20000 / 3).
+        """
+        calculator = VmfCalculator(smoothing_period_trades=3, normalization_period=3)
+        for i, qty in enumerate(range(100, 900, 100)):
+            calculator.add_trade(1000 + i * 1000, qty)
+        self.assertAlmostEqual(calculator.get_vmf(), 100 / math.sqrt(20000 / 3), places=9)
+    
+    def test_unbounded_normalization_memory_stays_constant(self):
+        """Test that without a normalization period memory does not grow with the stream."""
+        calculator = VmfCalculator(smoothing_period_trades=5)
+        timestamp = 1_700_000_000_000
+
+        def feed(count):
+            nonlocal timestamp
+            for i in range(count):
+                timestamp += 100 + i % 7
+                calculator.add_trade(timestamp, 1.0 + i % 3)
+
+        feed(1000)
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            feed(20000)
+            grown = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        # Keeping every VMF_raw value would take several hundred KB here
+        self.assertLess(grown, 20000)
+        self.assertIsNotNone(calculator.get_vmf())
+    
+    def test_invalid_parameters(self):
+        """Test that non-positive periods raise ValueError."""
+        with self.assertRaises(ValueError):
+            VmfCalculator(smoothing_period_trades=0)
+        with self.assertRaises(ValueError):
+            VmfCalculator(smoothing_period_trades=3, normalization_period=0)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -108,3 +108,40 @@ def test_volatility_with_missing_log_price():
         (1678886460000, BadData(value=101.0)),
     ]
     assert compute_volatility(data_one_valid) is None
+
+def test_volatility_skips_malformed_timestamps():
+    """Test that entries with unusable timestamps are skipped, not fatal."""
+    valid = [
+        (1678886400000, LogPriceData(log_price=math.log(100.0))),
+        (1678886520000, LogPriceData(log_price=math.log(100.5))),
+        (1678886580000, LogPriceData(log_price=math.log(100.2))),
+    ]
+    data = [valid[0], (None, LogPriceData(log_price=math.log(101.0))), valid[1],
+            ("not-a-time", LogPriceData(log_price=math.log(99.0))), valid[2]]
+    assert compute_volatility(data) == compute_volatility(valid)
+
+def test_volatility_skips_duplicate_timestamps():
+    """Test that intervals with zero time delta are excluded from the calculation."""
+    base_time_ms = 1678886400000
+    data = [
+        (base_time_ms,          LogPriceData(log_price=math.log(100.0))),
+        (base_time_ms + 60000,  LogPriceData(log_price=math.log(100.5))),
+        (base_time_ms + 60000,  LogPriceData(log_price=math.log(100.5))),  # Duplicate timestamp
+        (base_time_ms + 120000, LogPriceData(log_price=math.log(100.0))),
+    ]
+    # Two 1-minute intervals, each with |d_log_price| = log(100.5/100)
+    d = math.log(100.5 / 100.0)
+    assert compute_volatility(data) == pytest.approx(math.sqrt(2 * d * d / 2))
+
+    # Only duplicate timestamps => no valid interval
+    assert compute_volatility(data[1:3]) is None
+
+def test_volatility_presorted_matches_default():
+    """Test that presorted=True gives the same result on ordered data."""
+    base_time_ms = 1234567890000
+    data = [
+        (base_time_ms + i * 1000, LogPriceData(log_price=math.log(250.0 + (i * 7 % 5) * 0.25)))
+        for i in range(20)
+    ]
+    assert compute_volatility(data, presorted=True) == compute_volatility(data)
+    assert compute_volatility(data) == compute_volatility(data[::-1])